@@ -1,5 +1,6 @@
 -- Drop Tables --------------------------------------------
 
+DROP TABLE IF EXISTS fbref.fixture_sync_watermarks;
 DROP TABLE IF EXISTS fbref.fixtures;
 DROP TABLE IF EXISTS fbref.competition_seasons;
 DROP TABLE IF EXISTS fbref.competitions;
@@ -108,6 +109,18 @@ CREATE INDEX idx_fixtures_competition_seasons_id  ON fbref.fixtures(competition_
 CREATE INDEX idx_fixtures_competition_home_team_id  ON fbref.fixtures(home_team_id);
 CREATE INDEX idx_fixtures_competition_away_team_id ON fbref.fixtures(away_team_id);
 
+-- Fixture sync watermarks table, latest persisted kickoff per competition season for incremental syncs
+CREATE TABLE IF NOT EXISTS fbref.fixture_sync_watermarks (
+    competition_seasons_id INT NOT NULL,
+    last_kickoff TIMESTAMP,
+    last_fixture_ids TEXT,
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY(competition_seasons_id),
+    CONSTRAINT fk_fixture_sync_watermarks_competition_seasons_id
+        FOREIGN KEY(competition_seasons_id)
+            REFERENCES fbref.competition_seasons(competition_seasons_id)
+);
+
 -- Players table
 CREATE TABLE IF NOT EXISTS fbref.players (
     player_id VARCHAR(8) NOT NULL,
@@ -2,6 +2,7 @@
 
 import math
 
+import numpy as np
 import pandas as pd
 
 
@@ -12,27 +13,136 @@ def get_percentile(rank, no_values):
     return rounded_percentile
 
 
-def get_player_percentile_df(stats_list, input_df):
-    """Function used to output percentile values of certain stats for each player."""
-    no_values = len(input_df)
+def get_group_ranks(stat_matrix, group_codes, no_groups):
+    """Function used to rank every column of a stat matrix within groups in one pass.
+
+    Each stat is sorted once by value to get integer dense ranks, then once by (group, dense rank). In that order the
+    rank of a value, counting the values of its group that are greater or equal (descending rank, ties given the max
+    rank), is the end of its group run minus the start of its equal values run. Missing values are put in their own
+    group so they are not counted.
+
+    Args:
+        stat_matrix (np.array): players x stats
+        group_codes (np.array): group of each player, 0 to no_groups - 1
+        no_groups (int): number of groups
+
+    Returns:
+        rank_matrix (np.array): players x stats ranks, nan where the stat is missing
+    """
+    # one row per stat so every sort runs over contiguous memory
+    stat_rows = np.ascontiguousarray(stat_matrix.T)
+    no_players = stat_rows.shape[1]
+    is_missing = np.isnan(stat_rows)
+    positions = np.broadcast_to(np.arange(no_players), stat_rows.shape)
+
+    # dense ascending rank of each value within its stat, missing values sort last
+    value_order = np.argsort(stat_rows, axis=1)
+    sorted_values = np.take_along_axis(stat_rows, value_order, axis=1)
+    is_value_start = np.ones(stat_rows.shape, dtype=bool)
+    next_values = sorted_values[:, 1:]
+    previous_values = sorted_values[:, :-1]
+    is_value_start[:, 1:] = next_values != previous_values
+    dense_ranks = np.empty(stat_rows.shape, dtype=np.int64)
+    np.put_along_axis(dense_ranks, value_order, np.cumsum(is_value_start, axis=1), axis=1)
+
+    # sort by (group, dense rank) and find the runs of equal keys and of equal groups
+    group_keys = np.where(is_missing, no_groups, group_codes.reshape(1, -1))
+    key_order = np.argsort(group_keys * (no_players + 1) + dense_ranks, axis=1)
+    sorted_group_keys = np.take_along_axis(group_keys, key_order, axis=1)
+    sorted_dense_ranks = np.take_along_axis(dense_ranks, key_order, axis=1)
+
+    is_group_start = np.ones(stat_rows.shape, dtype=bool)
+    is_group_start[:, 1:] = sorted_group_keys[:, 1:] != sorted_group_keys[:, :-1]
+    is_key_start = is_group_start.copy()
+    is_key_start[:, 1:] |= sorted_dense_ranks[:, 1:] != sorted_dense_ranks[:, :-1]
+
+    key_run_starts = np.maximum.accumulate(np.where(is_key_start, positions, 0), axis=1)
+    is_group_end = np.ones(stat_rows.shape, dtype=bool)
+    is_group_end[:, :-1] = is_group_start[:, 1:]
+    group_run_ends = np.minimum.accumulate(np.where(is_group_end, positions + 1, no_players)[:, ::-1], axis=1)[:, ::-1]
+
+    rank_rows = np.empty(stat_rows.shape)
+    np.put_along_axis(rank_rows, key_order, group_run_ends - key_run_starts, axis=1)
+    rank_rows[is_missing] = np.nan
+    return rank_rows.T
+
+
+def get_percentile_matrix(stat_matrix, group_codes=None):
+    """Function used to get the percentile of every value of a stat matrix against the players of its group.
+
+    Percentiles match get_percentile: floor((1 - rank / no_players_in_group) * 100) with a descending max rank.
+
+    Args:
+        stat_matrix (np.array): players x stats
+        group_codes (np.array): group of each player, 0 to no_groups - 1, None to rank every player together
+
+    Returns:
+        percentile_matrix (np.array): players x stats percentiles, nan where the stat is missing
+    """
+    stat_matrix = np.asarray(stat_matrix, dtype=float)
+    if group_codes is None:
+        group_codes = np.zeros(len(stat_matrix), dtype=np.int64)
+    group_codes = np.asarray(group_codes, dtype=np.int64)
+    no_groups = int(group_codes.max()) + 1 if len(group_codes) else 1
+
+    rank_matrix = get_group_ranks(stat_matrix, group_codes, no_groups)
+    group_sizes = np.bincount(group_codes, minlength=no_groups)[group_codes].reshape(-1, 1)
+    return np.floor((1 - rank_matrix / group_sizes) * 100)
+
+
+def get_player_percentile_df(
+    stats_list,
+    input_df,
+    group_columns=None,
+    min_nineties=None,
+    nineties_bucket_edges=None,
+):
+    """Function used to output percentile values of certain stats for each player.
+
+    All stats are ranked together on one stat matrix and the stat_score (mean percentile) is computed from the same
+    matrix.
+
+    Args:
+        stats_list (List): stat columns to get percentiles for
+        input_df (pandas.DataFrame): one row per player, with player_name, position, age and no_of_nineties columns
+        group_columns (List): players are only compared within groups, e.g. ["position"] or ["competition"]
+        min_nineties (float): players with fewer nineties are left out before ranking
+        nineties_bucket_edges (List): edges of no_of_nineties buckets, e.g. [10, 20], adds a nineties_bucket column
+            and ranks within buckets
+
+    Returns:
+        percentile_df (pandas.DataFrame): player columns, {stat}_percentile columns and stat_score
+    """
+    if min_nineties is not None:
+        input_df = input_df.loc[input_df.no_of_nineties >= min_nineties]
+
+    group_columns = list(group_columns or [])
+    if nineties_bucket_edges is not None:
+        input_df = input_df.assign(nineties_bucket=np.digitize(input_df.no_of_nineties, nineties_bucket_edges))
+        group_columns.append("nineties_bucket")
+
+    group_codes = None
+    if group_columns:
+        group_codes = input_df.groupby(group_columns, sort=False, dropna=False).ngroup().to_numpy()
+
+    percentile_matrix = get_percentile_matrix(input_df[stats_list].to_numpy(dtype=float), group_codes)
 
     percentile_dict = {}
-    percentile_dict["player_name"] = input_df.player_name
-    percentile_dict["position"] = input_df.position
-    percentile_dict["age"] = input_df.age
-    percentile_dict["no_of_nineties"] = input_df.no_of_nineties
+    for column in ["player_name", "position", "age", "no_of_nineties"] + group_columns:
+        percentile_dict[column] = input_df[column]
 
-    for stat in stats_list:
-        rank_list = list(input_df[stat].rank(ascending=False, method="max"))
-        percentile_list = [get_percentile(rank, no_values) for rank in rank_list]
-        percentile_dict[f"{stat}_percentile"] = percentile_list
+    for stat_index, stat in enumerate(stats_list):
+        stat_percentiles = percentile_matrix[:, stat_index]
+        if not np.isnan(stat_percentiles).any():
+            stat_percentiles = stat_percentiles.astype(np.int64)
+        percentile_dict[f"{stat}_percentile"] = pd.Series(stat_percentiles, index=input_df.index)
 
     percentile_df = pd.DataFrame(percentile_dict)
 
     # add aggregated rank
-    percentile_df = percentile_df.assign(
-        stat_score=percentile_df.drop(["no_of_nineties", "age"], axis=1)
-        .select_dtypes(include=["float", "int"])
-        .mean(axis=1)
+    no_percentiles = (~np.isnan(percentile_matrix)).sum(axis=1)
+    percentile_sums = np.nansum(percentile_matrix, axis=1)
+    percentile_df["stat_score"] = np.divide(
+        percentile_sums, no_percentiles, out=np.full(len(percentile_df), np.nan), where=no_percentiles > 0
     )
     return percentile_df
@@ -0,0 +1,189 @@
+"""Script used to find players with similar stat profiles"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.fbref.config.fbref_config import (
+    PLAYER_SIMILARITY_INDEX_DIR,
+    PLAYER_SIMILARITY_INFO_COLUMNS,
+)
+
+SIMILARITY_METRICS = ["cosine", "euclidean"]
+
+
+class PlayerSimilarityIndex:
+    """Class used to answer "players like X" queries over standardised player stat vectors.
+
+    Stats are standardised to z-scores, missing stats count as the average. A query is a single matrix-vector product
+    over the whole float32 stat matrix with the position, age and nineties filters applied as precomputed boolean
+    masks, which keeps queries over tens of thousands of player seasons to a few milliseconds without a tree.
+    """
+
+    def __init__(self, info_df, stat_matrix, stat_columns, stat_means, stat_stds):
+        self.info_df = info_df.reset_index(drop=True)
+        self.stat_matrix = np.ascontiguousarray(stat_matrix, dtype=np.float32)
+        self.stat_columns = list(stat_columns)
+        self.stat_means = np.asarray(stat_means, dtype=float)
+        self.stat_stds = np.asarray(stat_stds, dtype=float)
+
+        stat_norms = np.linalg.norm(self.stat_matrix, axis=1)
+        self.squared_norms = stat_norms**2
+        self.unit_matrix = self.stat_matrix / np.where(stat_norms > 0, stat_norms, 1).reshape(-1, 1)
+
+        # filter columns as arrays so queries never touch pandas
+        self.player_rows = self.info_df.groupby("player_name", sort=False).indices
+        self.ages = self.get_info_values("age")
+        self.no_of_nineties = self.get_info_values("no_of_nineties")
+        self.position_masks = {}
+        if "position" in self.info_df.columns:
+            for position in ["GK", "DF", "MF", "FW"]:
+                self.position_masks[position] = self.info_df.position.str.contains(position, na=False).to_numpy()
+
+    @classmethod
+    def from_player_df(cls, player_df, stat_columns, info_columns=PLAYER_SIMILARITY_INFO_COLUMNS):
+        """Function used to build the index from a dataframe with one row per player season, e.g. per 90 columns of
+        get_big5_player_stats tables"""
+        raw_stat_matrix = player_df[stat_columns].to_numpy(dtype=float)
+        stat_means = np.nanmean(raw_stat_matrix, axis=0)
+        stat_stds = np.nanstd(raw_stat_matrix, axis=0)
+
+        # constant stats carry no information, they are left at 0 rather than divided by 0
+        stat_matrix = (raw_stat_matrix - stat_means) / np.where(stat_stds > 0, stat_stds, 1)
+        stat_matrix = np.nan_to_num(stat_matrix, nan=0.0)
+
+        info_df = player_df[[column for column in info_columns if column in player_df.columns]]
+        return cls(info_df, stat_matrix, stat_columns, stat_means, stat_stds)
+
+    @classmethod
+    def load(cls, index_dir=PLAYER_SIMILARITY_INDEX_DIR):
+        """Function used to load an index written with save"""
+        with np.load(os.path.join(index_dir, "stat_matrix.npz")) as index_arrays:
+            return cls(
+                pd.read_parquet(os.path.join(index_dir, "player_info.parquet")),
+                index_arrays["stat_matrix"],
+                index_arrays["stat_columns"].tolist(),
+                index_arrays["stat_means"],
+                index_arrays["stat_stds"],
+            )
+
+    def save(self, index_dir=PLAYER_SIMILARITY_INDEX_DIR):
+        """Function used to write the index to index_dir, a standardised stat matrix and a player info parquet file"""
+        os.makedirs(index_dir, exist_ok=True)
+        np.savez(
+            os.path.join(index_dir, "stat_matrix.npz"),
+            stat_matrix=self.stat_matrix,
+            stat_columns=np.array(self.stat_columns),
+            stat_means=self.stat_means,
+            stat_stds=self.stat_stds,
+        )
+        self.info_df.to_parquet(os.path.join(index_dir, "player_info.parquet"), index=False)
+
+    def get_info_values(self, column):
+        """Function used to get an info column as a float array, nan when the column is missing"""
+        if column not in self.info_df.columns:
+            return np.full(len(self.info_df), np.nan)
+        return self.info_df[column].to_numpy(dtype=float, na_value=np.nan)
+
+    def get_player_row(self, player_name, season_name=None, team=None):
+        """Function used to get the index row of a player, season_name and team pick one of several player seasons"""
+        player_rows = self.player_rows.get(player_name, np.array([], dtype=np.int64))
+        for column, value in [("season_name", season_name), ("team", team)]:
+            if value is not None:
+                player_rows = player_rows[self.info_df[column].to_numpy()[player_rows] == value]
+
+        if len(player_rows) == 0:
+            raise Exception(f"No player season found for {player_name}.")
+        elif len(player_rows) > 1:
+            raise Exception(f"{len(player_rows)} player seasons found for {player_name}, pass season_name or team.")
+        return int(player_rows[0])
+
+    def get_filter_mask(self, positions=None, min_age=None, max_age=None, min_nineties=None):
+        """Function used to get the player seasons a query can return
+
+        Args:
+            positions (List): e.g. ["MF", "FW"], players with any of them are kept
+            min_age (float): minimum age
+            max_age (float): maximum age
+            min_nineties (float): minimum number of nineties played
+        """
+        filter_mask = np.ones(len(self.info_df), dtype=bool)
+        if positions is not None:
+            filter_mask &= np.logical_or.reduce([self.position_masks[position] for position in positions])
+        if min_age is not None:
+            filter_mask &= self.ages >= min_age
+        if max_age is not None:
+            filter_mask &= self.ages <= max_age
+        if min_nineties is not None:
+            filter_mask &= self.no_of_nineties >= min_nineties
+        return filter_mask
+
+    def query_vector(self, stat_vector, k=10, metric="cosine", filter_mask=None):
+        """Function used to find the k player seasons closest to a standardised stat vector.
+
+        Returns:
+            player_rows (np.array): index rows of the closest player seasons, closest first
+            scores (np.array): cosine similarity (higher is closer) or euclidean distance (lower is closer)
+        """
+        if metric not in SIMILARITY_METRICS:
+            raise Exception(f"Unknown metric {metric}, use cosine or euclidean.")
+        stat_vector = np.asarray(stat_vector, dtype=np.float32)
+
+        if metric == "cosine":
+            vector_norm = np.linalg.norm(stat_vector)
+            scores = self.unit_matrix @ (stat_vector / (vector_norm if vector_norm > 0 else 1))
+            # rank on negative similarity so the closest player is always the smallest value
+            ranking_values = -scores
+        else:
+            squared_distances = self.squared_norms - 2 * (self.stat_matrix @ stat_vector) + stat_vector @ stat_vector
+            scores = np.sqrt(np.maximum(squared_distances, 0))
+            ranking_values = scores
+
+        if filter_mask is not None:
+            ranking_values = np.where(filter_mask, ranking_values, np.inf)
+            k = min(k, int(filter_mask.sum()))
+        k = min(k, len(ranking_values))
+        if k == 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=scores.dtype)
+
+        player_rows = np.argpartition(ranking_values, k - 1)[:k]
+        player_rows = player_rows[np.argsort(ranking_values[player_rows], kind="stable")]
+        return player_rows, scores[player_rows]
+
+    def query(
+        self,
+        player_name,
+        k=10,
+        metric="cosine",
+        season_name=None,
+        team=None,
+        positions=None,
+        min_age=None,
+        max_age=None,
+        min_nineties=None,
+    ):
+        """Function used to find the k player seasons most similar to a player season.
+
+        Args:
+            player_name (str): player to find similar players for
+            k (int): number of similar player seasons
+            metric (str): cosine or euclidean
+            season_name (str): season of the player, needed when the index holds several of their seasons
+            team (str): team of the player, needed when they played for several teams in a season
+            positions, min_age, max_age, min_nineties: filters on the returned player seasons, see get_filter_mask
+
+        Returns:
+            similar_df (pandas.DataFrame): player info of the similar player seasons with a similarity or distance
+                column, closest first, the player season itself is left out
+        """
+        player_row = self.get_player_row(player_name, season_name, team)
+
+        filter_mask = self.get_filter_mask(positions, min_age, max_age, min_nineties)
+        filter_mask[player_row] = False
+
+        player_rows, scores = self.query_vector(self.stat_matrix[player_row], k, metric, filter_mask)
+
+        similar_df = self.info_df.iloc[player_rows].reset_index(drop=True)
+        similar_df["similarity" if metric == "cosine" else "distance"] = scores
+        return similar_df
@@ -0,0 +1,68 @@
+"""CLI script used to benchmark the html.parser and lxml table backends on saved FBref HTML.
+
+Example:
+    python -m src.fbref.cli.benchmark_table_parsers saved_big5_standard.html stats_standard --expected-attribute-no 0
+"""
+
+import time
+from typing import Optional
+
+import pandas as pd
+import typer
+
+from src.fbref.etl.page import FBrefPage
+from src.fbref.etl.table_parser import PARSER_BACKENDS
+from src.fbref.fbref_class import FBref
+
+app = typer.Typer()
+
+
+def time_table_extraction(html_content, table_id, parser_backend, expected_attribute_no=None, repeats=5):
+    """Function used to time parsing a page and extracting one table into a dataframe.
+
+    Returns:
+        best_seconds (float): fastest of the repeated runs
+        fbref_df (pandas.DataFrame): extracted table
+    """
+    fb = FBref()
+    run_times = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        page = FBrefPage("benchmark", html_content, parser_backend)
+        fbref_df = fb.get_fbref_df(page.get_parsed_table(table_id), expected_attribute_no)
+        run_times.append(time.perf_counter() - start_time)
+    return min(run_times), fbref_df
+
+
+@app.command()
+def main(
+    html_path: str,
+    table_id: str,
+    expected_attribute_no: Optional[int] = typer.Option(None),
+    repeats: int = typer.Option(5),
+):
+    """
+    CLI script used to compare table extraction time for each parser backend on a saved FBref page.
+    """
+    with open(html_path, "rb") as html_file:
+        html_content = html_file.read()
+
+    results = {}
+    for parser_backend in PARSER_BACKENDS:
+        results[parser_backend] = time_table_extraction(
+            html_content, table_id, parser_backend, expected_attribute_no, repeats
+        )
+
+    baseline_seconds, baseline_df = results["html.parser"]
+    for parser_backend, (best_seconds, fbref_df) in results.items():
+        print(
+            f"{parser_backend:>12}: {best_seconds * 1000:8.1f} ms "
+            f"({baseline_seconds / best_seconds:4.1f}x) for {fbref_df.shape[0]} rows x {fbref_df.shape[1]} columns"
+        )
+
+    pd.testing.assert_frame_equal(results["lxml"][1], baseline_df)
+    print("Both backends returned identical dataframes.")
+
+
+if __name__ == """__main__""":
+    app()
@@ -0,0 +1,58 @@
+"""CLI script used to write cleaned FBref tables to the local parquet lake.
+
+Example:
+    python -m src.fbref.cli.build_fbref_lake --competition-ids 9 --season-names 2021-2022 --season-names 2022-2023
+"""
+
+from typing import List, Optional
+
+import typer
+from tqdm import tqdm
+
+from src.fbref.config.fbref_config import (
+    BIG5_PLAYER_TABLE_SCHEMAS,
+    CURRENT_SEASON,
+    FBREF_LAKE_DIR,
+)
+from src.fbref.etl.lake import write_lake_table
+from src.fbref.fbref_class import FBref, season_table_dict
+
+app = typer.Typer()
+
+fb = FBref()
+
+
+@app.command()
+def main(
+    competition_ids: List[int] = typer.Option(...),
+    season_names: Optional[List[str]] = typer.Option(None),
+    big5_player_stats: bool = typer.Option(True, help="Also write the big 5 player stat tables of each season."),
+    lake_dir: str = typer.Option(FBREF_LAKE_DIR),
+):
+    """
+    CLI script used to write season tables, fixtures and big 5 player stats to the lake.
+    Match report stats are written with harvest_match_stats --lake.
+    """
+    season_name_list = season_names or [CURRENT_SEASON]
+    no_tables_written = 0
+
+    for season_name in tqdm(season_name_list):
+        for competition_id in competition_ids:
+            season_tables_dict = fb.get_season_tables(str(competition_id), season_name, list(season_table_dict))
+            season_tables_dict["fixtures"] = fb.get_fixtures_and_results(str(competition_id), season_name)
+
+            for table_type, table_df in season_tables_dict.items():
+                write_lake_table(table_df, table_type, competition_id, season_name, lake_dir=lake_dir)
+                no_tables_written += 1
+
+        if big5_player_stats:
+            for table_type in BIG5_PLAYER_TABLE_SCHEMAS:
+                big5_df = fb.get_big5_player_stats(table_type, season_name)
+                write_lake_table(big5_df, f"big5_{table_type}", "Big5", season_name, lake_dir=lake_dir)
+                no_tables_written += 1
+
+    print(f"Wrote {no_tables_written} tables to {lake_dir}.")
+
+
+if __name__ == """__main__""":
+    app()
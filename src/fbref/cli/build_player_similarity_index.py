@@ -0,0 +1,62 @@
+"""CLI script used to build the player similarity index from the big 5 player stat tables in the lake.
+
+Example:
+    python -m src.fbref.cli.build_player_similarity_index --season-names 2021-2022 --season-names 2022-2023
+"""
+
+from typing import List, Optional
+
+import typer
+
+from src.fbref.analysis.similarity import PlayerSimilarityIndex
+from src.fbref.config.fbref_config import (
+    FBREF_LAKE_DIR,
+    PLAYER_SIMILARITY_INDEX_DIR,
+    PLAYER_SIMILARITY_INFO_COLUMNS,
+)
+from src.fbref.etl.lake import read_lake_table
+
+app = typer.Typer()
+
+# columns identifying a player season in every big 5 table
+PLAYER_SEASON_KEY_COLUMNS = ["player_name", "team", "competition", "season_name", "born"]
+
+
+@app.command()
+def main(
+    table_types: List[str] = typer.Option(["passing", "defense", "possession", "shooting", "miscellaneous"]),
+    season_names: Optional[List[str]] = typer.Option(None),
+    min_nineties: float = typer.Option(5.0, help="Player seasons with fewer nineties are left out of the index."),
+    lake_dir: str = typer.Option(FBREF_LAKE_DIR),
+    index_dir: str = typer.Option(PLAYER_SIMILARITY_INDEX_DIR),
+):
+    """
+    CLI script used to join the per 90 columns of the chosen big 5 tables into one row per player season and write
+    the similarity index. The tables are written to the lake with build_fbref_lake.
+    """
+    # typer passes an empty list when no season is given, read every season then
+    season_name_list = season_names or None
+
+    player_df = None
+    for table_type in table_types:
+        big5_df = read_lake_table(f"big5_{table_type}", ["Big5"], season_name_list, lake_dir=lake_dir)
+        per_90_columns = [column for column in big5_df.columns if column.endswith("_per_90")]
+
+        if player_df is None:
+            info_columns = [column for column in PLAYER_SIMILARITY_INFO_COLUMNS if column in big5_df.columns]
+            key_columns = [column for column in PLAYER_SEASON_KEY_COLUMNS if column in big5_df.columns]
+            player_df = big5_df[list(dict.fromkeys(key_columns + info_columns + per_90_columns))]
+        else:
+            new_columns = [column for column in per_90_columns if column not in player_df.columns]
+            player_df = player_df.merge(big5_df[key_columns + new_columns], on=key_columns, how="left")
+
+    player_df = player_df.loc[player_df.no_of_nineties >= min_nineties]
+    stat_columns = [column for column in player_df.columns if column.endswith("_per_90")]
+
+    similarity_index = PlayerSimilarityIndex.from_player_df(player_df, stat_columns)
+    similarity_index.save(index_dir)
+    print(f"Indexed {len(player_df)} player seasons on {len(stat_columns)} stats in {index_dir}.")
+
+
+if __name__ == """__main__""":
+    app()
@@ -0,0 +1,72 @@
+"""CLI script used to harvest match report stats for every played fixture of a competition season."""
+
+import glob
+import os
+from typing import Optional
+
+import typer
+
+from src.fbref.config.fbref_config import FBREF_LAKE_DIR
+from src.fbref.etl.harvest import csv_directory_sink, harvest_season_match_stats
+from src.fbref.etl.lake import (
+    compact_lake_partition,
+    get_lake_harvest_progress_path,
+    lake_sink,
+)
+from src.fbref.fbref_class import FBref
+
+app = typer.Typer()
+
+fb = FBref()
+
+
+@app.command()
+def main(
+    competition_id: str,
+    season_name: str,
+    output_dir: str = typer.Option("data/fbref_match_stats"),
+    max_workers: Optional[int] = typer.Option(None),
+    lake: bool = typer.Option(False, help="Write stat tables to the parquet lake instead of csv files."),
+    lake_dir: str = typer.Option(FBREF_LAKE_DIR),
+):
+    """
+    CLI script used to write match report stats of a season to output_dir/{season_name}_{competition_id}/,
+    or to the match_{stat_type} tables of the parquet lake with --lake.
+    Re-running after a crash skips the fixtures already harvested.
+    """
+    # the progress file is kept with the stat tables, a lake harvest leaves nothing under output_dir
+    if lake:
+        sink = lake_sink(competition_id, season_name, lake_dir)
+        progress_path = get_lake_harvest_progress_path(competition_id, season_name, lake_dir)
+    else:
+        season_output_dir = os.path.join(output_dir, f"{season_name.replace('-', '_')}_{competition_id}")
+        sink = csv_directory_sink(season_output_dir)
+        progress_path = os.path.join(season_output_dir, "harvested_fixture_ids.txt")
+    os.makedirs(os.path.dirname(progress_path), exist_ok=True)
+
+    fixtures_df = fb.get_fixtures_and_results(competition_id, season_name)
+
+    harvest_summary = harvest_season_match_stats(
+        fixtures_df,
+        sink=sink,
+        progress_path=progress_path,
+        fb=fb,
+        max_workers=max_workers,
+    )
+
+    # one file per fixture while harvesting, one file per stat table once done
+    if lake:
+        for stat_dir in glob.glob(os.path.join(lake_dir, "table_type=match_*")):
+            stat_table_type = os.path.basename(stat_dir).split("=", 1)[1]
+            compact_lake_partition(stat_table_type, competition_id, season_name, lake_dir)
+
+    print(
+        f"Harvested {harvest_summary['harvested']} fixtures, "
+        f"skipped {harvest_summary['skipped']} already harvested, {len(harvest_summary['failed'])} failed."
+    )
+    for fixture_id, error in harvest_summary["failed"].items():
+        print(f"{fixture_id}: {error}")
+
+
+if __name__ == """__main__""":
+    app()
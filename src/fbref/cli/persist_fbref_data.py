@@ -5,9 +5,15 @@ import typer
 from tqdm import tqdm
 
 from src.fbref.config.fbref_config import CURRENT_SEASON
-from src.fbref.etl.db.clean import clean_competition_seasons_df, clean_fixtures_df
+from src.fbref.etl.db.clean import (
+    clean_competition_seasons_df,
+    clean_fixtures_df,
+    filter_fixtures_after_watermark,
+    get_fixture_watermarks,
+)
 from src.fbref.etl.db.fetch import (
     fetch_competition_seasons,
+    fetch_fixture_watermarks,
     fetch_fixtures,
     fetch_players,
 )
@@ -23,6 +29,7 @@ fb = FBref()
 def main(
     competition_ids: Optional[List[int]] = typer.Option(None),
     season_names: Optional[List[str]] = typer.Option(None),
+    incremental: bool = typer.Option(False, help="Only persist fixtures played since the last sync watermark."),
 ):
     """
     CLI script used to persist football data from FBref.
@@ -63,6 +70,10 @@ def main(
 
     competition_season_data_list = []
     fixtures_df_list = []
+    season_fixtures_df_list = []
+
+    if incremental:
+        watermarks_df = fetch_fixture_watermarks(competition_seasons_id_to_persist_data_for)
 
     for competition_season_id in tqdm(competition_seasons_id_to_persist_data_for):
         competition_id = str(competition_season_id)[8:]
@@ -77,11 +88,16 @@ def main(
         fixtures_df = clean_fixtures_df(fixtures_df)
 
         # filter fixtures data
-        fixtures_in_db = fetch_fixtures(competition_season_id)
-        if len(fixtures_in_db) > 0:
-            fixtures_to_persist_df = fixtures_df[~fixtures_df.fixture_id.isin(list(fixtures_in_db.fixture_id))]
+        if incremental:
+            # fixtures already in the db are updated on insert, so corrected scores reach the db
+            fixtures_to_persist_df = filter_fixtures_after_watermark(fixtures_df, watermarks_df)
+            season_fixtures_df_list.append(fixtures_df)
         else:
-            fixtures_to_persist_df = fixtures_df
+            fixtures_in_db = fetch_fixtures(competition_season_id)
+            if len(fixtures_in_db) > 0:
+                fixtures_to_persist_df = fixtures_df[~fixtures_df.fixture_id.isin(list(fixtures_in_db.fixture_id))]
+            else:
+                fixtures_to_persist_df = fixtures_df
 
         fixtures_df_list.append(fixtures_to_persist_df)
 
@@ -111,9 +127,23 @@ def main(
             df_to_persist=df_to_persist,
             table_name=table_name,
             schema_name="fbref",
+            on_conflict="update" if incremental and table_name == "fixtures" else None,
+            conflict_columns=["fixture_id"] if incremental and table_name == "fixtures" else None,
         )
         print(f"Persisted {len(df_to_persist)} rows for table {table_name}.")
 
+    if incremental:
+        # the watermark stops before fixtures still missing their score, so they are synced once scored
+        new_watermarks_df = get_fixture_watermarks(pd.concat(season_fixtures_df_list))
+        persist_to_db(
+            df_to_persist=new_watermarks_df,
+            table_name="fixture_sync_watermarks",
+            schema_name="fbref",
+            on_conflict="update",
+            conflict_columns=["competition_seasons_id"],
+        )
+        print(f"Moved sync watermark for {len(new_watermarks_df)} competition seasons.")
+
 
 if __name__ == """__main__""":
     app()
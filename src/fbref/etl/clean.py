@@ -1,32 +1,25 @@
 """Clean script for data extracted from FBref"""
 
+from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
+
 import numpy as np
 import pandas as pd
 
 from src.fbref.config.fbref_config import (
+    BIG5_PLAYER_TABLE_SCHEMAS,
     LEAGUE_TABLE_RENAME_COL_DICT,
-    PLAYER_DEFENSE_FLOAT_COLUMNS,
-    PLAYER_DEFENSE_RENAME_COL_DICT,
-    PLAYER_DEFENSE_TOTAL_COUNT_COLUMNS,
-    PLAYER_MISCELLANEOUS_FLOAT_COLUMNS,
-    PLAYER_MISCELLANEOUS_RENAME_COL_DICT,
-    PLAYER_MISCELLANEOUS_TOTAL_COUNT_COLUMNS,
-    PLAYER_PASSING_FLOAT_COLUMNS,
-    PLAYER_PASSING_RENAME_COL_DICT,
-    PLAYER_PASSING_TOTAL_COUNT_COLUMNS,
-    PLAYER_POSSESSION_FLOAT_COLUMNS,
-    PLAYER_POSSESSION_RENAME_COL_DICT,
-    PLAYER_POSSESSION_TOTAL_COUNT_COLUMNS,
-    PLAYER_SHOOTING_FLOAT_COLUMNS,
-    PLAYER_SHOOTING_RENAME_COL_DICT,
-    PLAYER_SHOOTING_TOTAL_COUNT_COLUMNS,
-    PLAYER_STANDARD_FLOAT_COLUMNS,
-    PLAYER_STANDARD_RENAME_COL_DICT,
     TEAM_DEFENSE_RENAME_COL_DICT,
     TEAM_POSSESSION_RENAME_COL_DICT,
 )
 from src.fbref.etl.db.fetch import fetch_countries
 
+PlayerStatCleanPlan = namedtuple(
+    "PlayerStatCleanPlan",
+    ["rename_col_dict", "thousands_separator_columns", "column_dtypes", "float_columns", "total_count_columns"],
+)
+
 
 def clean_fb_ref_column_names(fbref_df):
     """Function used to clean column names for fbref dataframes.
@@ -59,18 +52,75 @@ def clean_fb_ref_column_names(fbref_df):
 
 def clean_fb_ref_column_dtypes(fbref_df, integer_columns, float_columns, category_columns):
     """Function used to change fbref columns to correct data type"""
-    # change column types
-    for column in integer_columns:
-        fbref_df = fbref_df.astype({column: "int32"})
+    # change column types in one pass, later lists win for columns listed twice
+    column_dtypes = {column: "int32" for column in integer_columns}
+    column_dtypes.update({column: "float32" for column in float_columns})
+    column_dtypes.update({column: "category" for column in category_columns})
+
+    if column_dtypes:
+        fbref_df = fbref_df.astype(column_dtypes)
+    return fbref_df
+
+
+def round_values(values, decimals=2):
+    """Function used to round a float64 numpy array to the same values as Python's round.
+
+    numpy rounds values * 10**decimals half to even, which differs from round for values such as 34.5 / 20 that
+    sit just above a tie and land on it once scaled. Only those values are rounded again with round.
+    """
+    scaled_values = values * 10.0**decimals
+    rounded_values = np.round(scaled_values) / 10.0**decimals
+
+    ties = np.abs(scaled_values - np.floor(scaled_values)) == 0.5
+    if ties.any():
+        rounded_values[ties] = [round(value, decimals) for value in values[ties].tolist()]
+    return rounded_values
+
 
-    for column in float_columns:
-        fbref_df = fbref_df.astype({column: "float32"})
+def round_columns(fbref_df, columns, decimals=2):
+    """Function used to round columns in one go.
 
-    for column in category_columns:
-        fbref_df = fbref_df.astype({column: "category"})
+    Columns come back as float64, the same values and dtype as rounding each value with Python's round.
+    """
+    # column by column, fbref tables can repeat a column name
+    for column in dict.fromkeys(columns):
+        column_values = fbref_df[column].astype("float64")
+        column_values.iloc[:] = round_values(column_values.to_numpy(), decimals)
+        fbref_df[column] = column_values
     return fbref_df
 
 
+def get_rate_columns(fbref_df, total_count_columns, nineties_column, suffix):
+    """Function used to divide total count columns by the number of 90s played with one matrix divide.
+
+    Args:
+        fbref_df (pandas.DataFrame): fbref dataframe
+        total_count_columns (List): columns with total counts
+        nineties_column (str): column with the number of 90s played
+        suffix (str): suffix of the new columns, e.g. per_90
+
+    Returns:
+        rate_df (pandas.DataFrame): one {column}_{suffix} column per total count column rounded to 2 decimals,
+        NaN where no 90s were played
+    """
+    total_counts = fbref_df[list(total_count_columns)].to_numpy(dtype="float64")
+    nineties = fbref_df[nineties_column].to_numpy(dtype="float64")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = round_values(total_counts / nineties[:, np.newaxis])
+    rates[nineties == 0] = np.nan
+
+    rate_df = pd.DataFrame(
+        rates, columns=[f"{column}_{suffix}" for column in total_count_columns], index=fbref_df.index
+    )
+    return rate_df
+
+
+def get_split_part(fbref_series, sep=None, position=0, maxsplit=-1):
+    """Function used to split strings in a column and keep one part, non strings become NaN"""
+    return fbref_series.astype("object").str.split(sep, n=maxsplit).str[position]
+
+
 def clean_league_table_df(league_table_df):
     """Function used to clean league table data"""
 
@@ -82,11 +132,10 @@ def clean_league_table_df(league_table_df):
     league_table_df = clean_fb_ref_column_dtypes(league_table_df, integer_columns, float_columns, category_columns)
 
     # round up dataframe
-    for float_column in float_columns:
-        league_table_df[float_column] = league_table_df[float_column].apply(lambda x: round(x, 2))
+    league_table_df = round_columns(league_table_df, float_columns)
 
-    # clean columns
-    league_table_df["Squad"] = league_table_df["Squad"].apply(lambda x: x.strip())
+    # clean columns, mapping a categorical only strips each category once
+    league_table_df["Squad"] = league_table_df["Squad"].map(str.strip)
 
     # Clean column names
     league_table_df = clean_fb_ref_column_names(league_table_df)
@@ -151,8 +200,7 @@ def clean_home_away_league_table(home_away_league_table_df):
     )
 
     # round up dataframe
-    home_away_league_table_df["Home xG"] = home_away_league_table_df["Home xG"].apply(lambda x: round(x, 1))
-    home_away_league_table_df["Away xG"] = home_away_league_table_df["Away xG"].apply(lambda x: round(x, 1))
+    home_away_league_table_df = round_columns(home_away_league_table_df, ["Home xG", "Away xG"], decimals=1)
 
     # Clean column names
     home_away_league_table_df = clean_fb_ref_column_names(home_away_league_table_df)
@@ -184,8 +232,8 @@ def clean_fixtures_df(fixtures_df):
     ]
 
     # change xg columns to float type
-    fixtures_df["home_xg"] = fixtures_df["home_xg"].apply(lambda x: float(x) if x != "" else np.nan)
-    fixtures_df["away_xg"] = fixtures_df["away_xg"].apply(lambda x: float(x) if x != "" else np.nan)
+    fixtures_df["home_xg"] = pd.to_numeric(fixtures_df["home_xg"].replace("", np.nan))
+    fixtures_df["away_xg"] = pd.to_numeric(fixtures_df["away_xg"].replace("", np.nan))
 
     # change column types
     integer_columns = ["Wk"]
@@ -200,14 +248,10 @@ def clean_fixtures_df(fixtures_df):
         kickoff=pd.to_datetime(fixtures_df["Date"] + " " + fixtures_df["Time"]),
     )
     # add columns
-    fixtures_df["Score"] = fixtures_df["Score"].apply(lambda x: np.nan if x == "" else x)
+    fixtures_df["Score"] = fixtures_df["Score"].replace("", np.nan)
 
-    fixtures_df["home_score"] = fixtures_df["Score"].apply(
-        lambda x: int(x.split("–")[0]) if isinstance(x, str) else np.nan
-    )
-    fixtures_df["away_score"] = fixtures_df["Score"].apply(
-        lambda x: int(x.split("–")[1]) if isinstance(x, str) else np.nan
-    )
+    fixtures_df["home_score"] = pd.to_numeric(get_split_part(fixtures_df["Score"], "–", 0))
+    fixtures_df["away_score"] = pd.to_numeric(get_split_part(fixtures_df["Score"], "–", 1))
 
     # Clean column names
     fixtures_df = clean_fb_ref_column_names(fixtures_df)
@@ -243,11 +287,10 @@ def clean_defense_table(defense_df, per_match_columns=True):
     defense_df = clean_fb_ref_column_dtypes(defense_df, integer_columns, float_columns, category_columns)
 
     # round up dataframe
-    for float_column in float_columns:
-        defense_df[float_column] = defense_df[float_column].apply(lambda x: round(x, 2))
+    defense_df = round_columns(defense_df, float_columns)
 
-    # clean columns
-    defense_df["Squad"] = defense_df["Squad"].apply(lambda x: x.strip())
+    # clean columns, mapping a categorical only strips each category once
+    defense_df["Squad"] = defense_df["Squad"].map(str.strip)
 
     # columns with total counts
     total_count_columns = [
@@ -269,8 +312,7 @@ def clean_defense_table(defense_df, per_match_columns=True):
     ]
 
     # add additional columns
-    for column in total_count_columns:
-        defense_df[f"{column}_per_match"] = defense_df.apply(lambda x: round(x[column] / x["90s"], 2), axis=1)
+    defense_df = defense_df.assign(**get_rate_columns(defense_df, total_count_columns, "90s", "per_match"))
 
     # Clean column names
     defense_df = clean_fb_ref_column_names(defense_df)
@@ -322,92 +364,79 @@ def clean_possession_table(possession_df, per_match_columns=True):
     stats_df = clean_fb_ref_column_dtypes(stats_df, integer_columns, float_columns, category_columns)
 
     # add additional columns
-    for column in total_count_columns:
-        stats_df[f"{column}_per_match"] = stats_df.apply(
-            lambda x: round(x[column] / x["no_of_nineties"], 2) if x["no_of_nineties"] != 0 else np.nan, axis=1
-        )
-
-    # per match
-    per_match_columns = [column for column in stats_df.columns if "per_match" in column]
-
-    if per_match_columns:
-        stats_df.drop(total_count_columns, axis=1)
+    stats_df = pd.concat(
+        [stats_df, get_rate_columns(stats_df, total_count_columns, "no_of_nineties", "per_match")], axis=1
+    )
 
     # round up dataframe
-    for float_column in float_columns:
-        stats_df[float_column] = stats_df[float_column].apply(lambda x: round(x, 2))
+    stats_df = round_columns(stats_df, float_columns)
 
     return stats_df
 
 
+@lru_cache(maxsize=None)
+def get_player_stat_clean_plan(stat_type):
+    """Function used to work out how to clean a big5 player stat table once per table type.
+
+    Args:
+        stat_type (str): table type in BIG5_PLAYER_TABLE_SCHEMAS
+
+    Returns:
+        clean_plan (PlayerStatCleanPlan): rename map, dtypes and columns to round and divide by 90s, read only as the
+            plan is cached and shared by every caller
+    """
+    if stat_type not in BIG5_PLAYER_TABLE_SCHEMAS:
+        raise Exception("Input stat_type invalid.")
+    table_schema = BIG5_PLAYER_TABLE_SCHEMAS[stat_type]
+
+    column_dtypes = {column: "float32" for column in table_schema["float_columns"]}
+    column_dtypes.update({column: "category" for column in table_schema["category_columns"]})
+
+    clean_plan = PlayerStatCleanPlan(
+        rename_col_dict=MappingProxyType(dict(table_schema["rename_col_dict"])),
+        thousands_separator_columns=tuple(table_schema["thousands_separator_columns"]),
+        column_dtypes=MappingProxyType(column_dtypes),
+        float_columns=tuple(table_schema["float_columns"]),
+        total_count_columns=tuple(table_schema["total_count_columns"]),
+    )
+    return clean_plan
+
+
 def clean_player_stat_table(player_table_df, stat_type, per_match_columns=True):
     """Function used to clean player_stat_table_df data from fbref"""
-    if stat_type == "standard":
-        player_rename_dict = PLAYER_STANDARD_RENAME_COL_DICT
-        float_columns = PLAYER_STANDARD_FLOAT_COLUMNS
-        total_count_columns = []
-
-        player_table_df["Playing Time Min"] = player_table_df["Playing Time Min"].apply(lambda x: x.replace(",", ""))
-    elif stat_type == "passing":
-        player_rename_dict = PLAYER_PASSING_RENAME_COL_DICT
-        float_columns = PLAYER_PASSING_FLOAT_COLUMNS
-        total_count_columns = PLAYER_PASSING_TOTAL_COUNT_COLUMNS
-    elif stat_type == "defense":
-        player_rename_dict = PLAYER_DEFENSE_RENAME_COL_DICT
-        float_columns = PLAYER_DEFENSE_FLOAT_COLUMNS
-        total_count_columns = PLAYER_DEFENSE_TOTAL_COUNT_COLUMNS
-    elif stat_type == "possession":
-        player_rename_dict = PLAYER_POSSESSION_RENAME_COL_DICT
-        float_columns = PLAYER_POSSESSION_FLOAT_COLUMNS
-        total_count_columns = PLAYER_POSSESSION_TOTAL_COUNT_COLUMNS
-    elif stat_type == "shooting":
-        player_rename_dict = PLAYER_SHOOTING_RENAME_COL_DICT
-        float_columns = PLAYER_SHOOTING_FLOAT_COLUMNS
-        total_count_columns = PLAYER_SHOOTING_TOTAL_COUNT_COLUMNS
-    elif stat_type == "miscellaneous":
-        player_rename_dict = PLAYER_MISCELLANEOUS_RENAME_COL_DICT
-        float_columns = PLAYER_MISCELLANEOUS_FLOAT_COLUMNS
-        total_count_columns = PLAYER_MISCELLANEOUS_TOTAL_COUNT_COLUMNS
+    clean_plan = get_player_stat_clean_plan(stat_type)
+
+    for column in clean_plan.thousands_separator_columns:
+        player_table_df[column] = player_table_df[column].str.replace(",", "", regex=False)
 
     # replace blanks with NaN
     player_table_df = player_table_df.replace("", np.nan)
 
     # rename columns
-    player_table_df.rename(columns=player_rename_dict, inplace=True)
+    player_table_df.rename(columns=clean_plan.rename_col_dict, inplace=True)
 
     # add columns
     player_table_df = player_table_df.assign(
-        country=player_table_df.country.apply(lambda x: x.split(" ")[1] if isinstance(x, str) else x),
+        country=get_split_part(player_table_df.country, " ", 1),
         goalkeeper=player_table_df.position.str.contains("GK"),
         defender=player_table_df.position.str.contains("DF"),
         midfielder=player_table_df.position.str.contains("MF"),
         attacker=player_table_df.position.str.contains("FW"),
-        competition=player_table_df.competition.apply(lambda x: x.split(maxsplit=1)[1]),
-        age=player_table_df.age.apply(lambda x: x.split("-")[0] if isinstance(x, str) else np.nan),
+        competition=get_split_part(player_table_df.competition, position=1, maxsplit=1),
+        age=get_split_part(player_table_df.age, "-", 0),
     )
 
     # change column types
-    integer_columns = []
-    category_columns = ["country", "team"]
-
-    player_table_df = clean_fb_ref_column_dtypes(player_table_df, integer_columns, float_columns, category_columns)
+    player_table_df = player_table_df.astype(clean_plan.column_dtypes)
 
     # add additional per 90 columns
-    if len(total_count_columns) > 0:
-        for column in total_count_columns:
-            player_table_df[f"{column}_per_90"] = player_table_df.apply(
-                lambda x: round(x[column] / x["no_of_nineties"], 2) if x["no_of_nineties"] != 0 else np.nan, axis=1
-            )
-
-        # per match
-        per_match_columns = [column for column in player_table_df.columns if "per_90" in column]
-
-        if per_match_columns:
-            player_table_df.drop(total_count_columns, axis=1)
+    if len(clean_plan.total_count_columns) > 0:
+        player_table_df = player_table_df.assign(
+            **get_rate_columns(player_table_df, clean_plan.total_count_columns, "no_of_nineties", "per_90")
+        )
 
     # round up dataframe
-    for float_column in float_columns:
-        player_table_df[float_column] = player_table_df[float_column].apply(lambda x: round(x, 2))
+    player_table_df = round_columns(player_table_df, clean_plan.float_columns)
 
     # replace nulls in numerical columns with zero
     numerical_cols = player_table_df.select_dtypes(include=["float", "int"]).columns
@@ -426,8 +455,8 @@ def clean_full_match_stat_df(full_match_stat_df):
     full_match_stat_df = clean_fb_ref_column_names(full_match_stat_df)
 
     full_match_stat_df = full_match_stat_df.assign(
-        age=full_match_stat_df.age.apply(lambda x: x.split("-")[0] if isinstance(x, str) else np.nan),
-        country=full_match_stat_df.nation.apply(lambda x: x.split(" ")[1] if isinstance(x, str) else x),
+        age=get_split_part(full_match_stat_df.age, "-", 0),
+        country=get_split_part(full_match_stat_df.nation, " ", 1),
     )
 
     category_column_list = ["player", "nation", "country", "pos", "player_id", "player_link"]
@@ -441,8 +470,7 @@ def clean_full_match_stat_df(full_match_stat_df):
     )
 
     # round up dataframe
-    for numeric_column in numeric_columns:
-        full_match_stat_df[numeric_column] = full_match_stat_df[numeric_column].apply(lambda x: round(x, 2))
+    full_match_stat_df = round_columns(full_match_stat_df, numeric_columns)
 
     # rename columns
     full_match_stat_df.rename(
@@ -2,6 +2,8 @@
 
 from datetime import datetime
 
+import pandas as pd
+
 from src.fbref.etl.db.fetch import fetch_seasons
 
 
@@ -68,3 +70,78 @@ def clean_fixtures_df(fixtures_df):
         ]
     ]
     return fixtures_df
+
+
+def filter_fixtures_after_watermark(fixtures_df, watermarks_df):
+    """Function used to keep only fixtures played since the last incremental sync of their competition season.
+
+    Args:
+        fixtures_df (pandas.DataFrame): fixtures cleaned with clean_fixtures_df
+        watermarks_df (pandas.DataFrame): rows of fbref.fixture_sync_watermarks
+    """
+    # only completed matches, fixtures still missing their score are picked up by a later sync
+    fixtures_df = fixtures_df.loc[lambda dfr_: dfr_.home_score.notna() & dfr_.away_score.notna()]
+
+    if len(watermarks_df) == 0:
+        return fixtures_df
+
+    watermark_dict = {
+        competition_seasons_id: (last_kickoff, set(last_fixture_ids.split(",")) if last_fixture_ids else set())
+        for competition_seasons_id, last_kickoff, last_fixture_ids in zip(
+            watermarks_df.competition_seasons_id, watermarks_df.last_kickoff, watermarks_df.last_fixture_ids
+        )
+    }
+
+    def is_new_fixture(competition_seasons_id, kickoff, fixture_id):
+        if competition_seasons_id not in watermark_dict:
+            return True
+        last_kickoff, last_fixture_ids = watermark_dict[competition_seasons_id]
+        if pd.isna(last_kickoff):
+            return True
+        return kickoff > last_kickoff or (kickoff == last_kickoff and fixture_id not in last_fixture_ids)
+
+    new_fixture_mask = [
+        is_new_fixture(competition_seasons_id, kickoff, fixture_id)
+        for competition_seasons_id, kickoff, fixture_id in zip(
+            fixtures_df.competition_seasons_id, fixtures_df.kickoff, fixtures_df.fixture_id
+        )
+    ]
+    return fixtures_df.loc[new_fixture_mask]
+
+
+def get_fixture_watermarks(fixtures_df):
+    """Function used to get the sync watermark of each competition season from its past fixtures.
+
+    The watermark is the latest kickoff before the earliest past fixture still missing its score, so a fixture that
+    is scored after the sync (abandoned, late result feed) is still after the watermark on the next sync.
+
+    Args:
+        fixtures_df (pandas.DataFrame): every fixture of the synced competition seasons cleaned with clean_fixtures_df,
+        not only the ones persisted in this run
+
+    Returns:
+        new_watermarks_df (pandas.DataFrame): watermark rows to upsert, one per competition season, last_kickoff is
+        null when the first fixture of the season is still missing its score
+    """
+    watermark_rows = []
+    for competition_seasons_id, season_fixtures_df in fixtures_df.groupby("competition_seasons_id"):
+        is_scored = season_fixtures_df.home_score.notna() & season_fixtures_df.away_score.notna()
+        synced_fixtures_df = season_fixtures_df.loc[is_scored]
+        if not is_scored.all():
+            first_unscored_kickoff = season_fixtures_df.loc[~is_scored].kickoff.min()
+            synced_fixtures_df = synced_fixtures_df.loc[lambda dfr_: dfr_.kickoff < first_unscored_kickoff]
+
+        if len(synced_fixtures_df) > 0:
+            last_kickoff = synced_fixtures_df.kickoff.max()
+            last_fixture_ids = ",".join(
+                sorted(synced_fixtures_df.loc[lambda dfr_: dfr_.kickoff == last_kickoff].fixture_id)
+            )
+        else:
+            last_kickoff, last_fixture_ids = None, None
+
+        watermark_rows.append([competition_seasons_id, last_kickoff, last_fixture_ids, datetime.today()])
+
+    new_watermarks_df = pd.DataFrame(
+        watermark_rows, columns=["competition_seasons_id", "last_kickoff", "last_fixture_ids", "updated_at"]
+    )
+    return new_watermarks_df
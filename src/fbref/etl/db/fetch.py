@@ -1,21 +1,24 @@
-"""Script used to fetch data from db"""
+"""Script used to fetch data from db.
 
-from src.utility.sql.fetch_and_persist import query_db
+Without an engine every fetch runs on the shared pooled engine from get_db_engine.
+"""
 
+from src.utility.sql.fetch_and_persist import QUERY_CHUNK_SIZE, iter_query_db, query_db
 
-def fetch_countries():
-    return query_db("SELECT * FROM fbref.country")
 
+def fetch_countries(engine=None):
+    return query_db("SELECT * FROM fbref.country", engine=engine)
 
-def fetch_seasons():
-    return query_db("SELECT * FROM fbref.seasons")
 
+def fetch_seasons(engine=None):
+    return query_db("SELECT * FROM fbref.seasons", engine=engine)
 
-def fetch_competitions():
-    return query_db("SELECT * FROM fbref.competitions")
 
+def fetch_competitions(engine=None):
+    return query_db("SELECT * FROM fbref.competitions", engine=engine)
 
-def fetch_competition_seasons():
+
+def fetch_competition_seasons(engine=None):
     return query_db(
         """
         SELECT
@@ -29,17 +32,41 @@ def fetch_competition_seasons():
         ON cs.season_id = s.season_id
         JOIN fbref.competitions as c
         ON cs.competition_id = c.competition_id
-        """
+        """,
+        engine=engine,
     )
 
 
-def fetch_fixtures(competition_season_id=None):
+def fetch_fixtures(competition_season_id=None, engine=None):
     if competition_season_id is None:
         fixture_query = "SELECT * FROM fbref.fixtures"
     else:
         fixture_query = f"SELECT * FROM fbref.fixtures WHERE competition_seasons_id = {competition_season_id}"
-    return query_db(fixture_query)
+    return query_db(fixture_query, engine=engine)
+
+
+def fetch_fixture_watermarks(competition_season_ids=None, engine=None):
+    if competition_season_ids is None:
+        watermark_query = "SELECT * FROM fbref.fixture_sync_watermarks"
+    else:
+        competition_season_ids_text = ", ".join(
+            str(int(competition_season_id)) for competition_season_id in competition_season_ids
+        )
+        watermark_query = (
+            "SELECT * FROM fbref.fixture_sync_watermarks "
+            f"WHERE competition_seasons_id IN ({competition_season_ids_text})"
+        )
+    return query_db(watermark_query, engine=engine)
+
 
+def fetch_players(engine=None):
+    return query_db("SELECT * FROM fbref.players", engine=engine)
 
-def fetch_players():
-    return query_db("SELECT * FROM fbref.players")
+
+def iter_fixtures(competition_season_id=None, chunk_size=QUERY_CHUNK_SIZE, engine=None):
+    """Function used to fetch fixtures as a generator of dataframes, so the full table is never held in memory"""
+    if competition_season_id is None:
+        fixture_query = "SELECT * FROM fbref.fixtures"
+    else:
+        fixture_query = f"SELECT * FROM fbref.fixtures WHERE competition_seasons_id = {competition_season_id}"
+    return iter_query_db(fixture_query, engine=engine, chunk_size=chunk_size)
@@ -19,16 +19,14 @@ def get_stat_rank_df(input_df, stat_name):
 
 def get_full_match_stats(home_team_id, away_team_id, fixture_link):
     """Function used to grab dictionary of team match stats"""
-    stat_type_list = ["summary", "passing", "passing_types", "defense", "possession", "misc", "keeper", "shots"]
+    fixture_stat_dict = fb.get_fixture_stats(fixture_url=fixture_link, home_id=home_team_id, away_id=away_team_id)
 
     team_match_stats_dict = {}
 
     for team_id in [home_team_id, away_team_id]:
-        match_stats_dict = {}
-
-        for stat_type in stat_type_list:
-            stat_df = fb.get_fixture_stats(fixture_url=fixture_link, team_id=team_id, stat_type=stat_type)
-            match_stats_dict[stat_type] = stat_df
+        match_stats_dict = {
+            stat_type: stat_df.loc[stat_df.team_id == team_id] for stat_type, stat_df in fixture_stat_dict.items()
+        }
 
         full_match_stat_df = (
             match_stats_dict["summary"]
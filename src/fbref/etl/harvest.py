@@ -0,0 +1,177 @@
+"""Script used to harvest match report stats for every fixture of a season"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import requests
+
+from src.fbref.config.fbref_config import (
+    HARVEST_BATCH_SIZE,
+    HARVEST_MAX_ATTEMPTS,
+    HARVEST_RETRY_STATUS_CODES,
+    HTML_PARSER_BACKEND,
+)
+from src.fbref.etl.page import FBrefPage
+from src.fbref.fbref_class import FBref
+
+
+def get_fixture_id(fixture_link):
+    """Function used to get the FBref fixture id from a match report link"""
+    return fixture_link.split("/")[5]
+
+
+def parse_fixture_stats(fixture_link, html_content, home_team_id, away_team_id, parser_backend=HTML_PARSER_BACKEND):
+    """Function used to parse every stat table of a downloaded match report, run inside the process pool.
+
+    Returns:
+        fixture_stat_dict (dict): stat type -> dataframe for both teams, with fixture_id and team_id columns
+    """
+    fixture_page = FBrefPage(fixture_link, html_content, parser_backend)
+    fixture_stat_dict = FBref(parser_backend=parser_backend).get_fixture_stats(
+        fixture_link, home_team_id, away_team_id, fixture_page=fixture_page
+    )
+
+    fixture_id = get_fixture_id(fixture_link)
+    for stat_df in fixture_stat_dict.values():
+        stat_df["fixture_id"] = fixture_id
+    return fixture_stat_dict
+
+
+def read_progress(progress_path):
+    """Function used to read the fixture ids already harvested"""
+    if progress_path is None or not os.path.exists(progress_path):
+        return set()
+    with open(progress_path) as progress_file:
+        return {line.strip() for line in progress_file if line.strip()}
+
+
+def record_progress(progress_path, fixture_id):
+    """Function used to durably mark a fixture as harvested so a restarted run skips it"""
+    if progress_path is None:
+        return
+    with open(progress_path, "a") as progress_file:
+        progress_file.write(f"{fixture_id}\n")
+        progress_file.flush()
+        os.fsync(progress_file.fileno())
+
+
+def csv_directory_sink(output_dir):
+    """Function used to create a sink writing each stat table to output_dir/{stat_type}/{fixture_id}.csv"""
+
+    def sink(fixture_id, stat_type, stat_df):
+        stat_dir = os.path.join(output_dir, stat_type)
+        os.makedirs(stat_dir, exist_ok=True)
+        stat_df.to_csv(os.path.join(stat_dir, f"{fixture_id}.csv"), index=False)
+
+    return sink
+
+
+def is_retryable_fetch_error(fetch_error):
+    """Function used to tell transient download failures (connection errors, timeouts, 429 and 5xx) from the rest"""
+    if isinstance(fetch_error, requests.HTTPError):
+        return fetch_error.response is not None and fetch_error.response.status_code in HARVEST_RETRY_STATUS_CODES
+    # RetryError is raised once the session level retries of 429 and 5xx responses are used up
+    return isinstance(fetch_error, (requests.ConnectionError, requests.Timeout, requests.exceptions.RetryError))
+
+
+def fetch_with_retries(fetcher, url, max_attempts=HARVEST_MAX_ATTEMPTS):
+    """Function used to download a page, retrying transient failures the session level retries gave up on.
+
+    Other errors, e.g. a 404 or 403 response, are raised straight away.
+    """
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return fetcher.fetch(url)
+        except requests.RequestException as fetch_error:
+            if attempt == max_attempts or not is_retryable_fetch_error(fetch_error):
+                raise
+            time.sleep(2**attempt)
+
+
+def harvest_season_match_stats(
+    fixtures_df,
+    sink,
+    progress_path=None,
+    fb=None,
+    max_workers=None,
+    batch_size=HARVEST_BATCH_SIZE,
+):
+    """Function used to download and parse the match report of every played fixture of a season.
+
+    Match reports are downloaded concurrently through the FBref fetcher (pooled session, polite rate limit, retries)
+    and parsed in a process pool. Each parsed stat table is handed to the sink as soon as it is ready and the fixture
+    id is then appended to the progress file, so a crashed run picks up where it stopped.
+
+    Args:
+        fixtures_df (pandas.DataFrame): output of FBref.get_fixtures_and_results
+        sink (Callable): called as sink(fixture_id, stat_type, stat_df) for every stat table of every fixture
+        progress_path (str): text file with one harvested fixture id per line, fixtures listed there are skipped
+        fb (FBref): FBref instance whose fetcher is used, a new one is created when None
+        max_workers (int): number of parsing processes, defaults to the number of CPUs
+        batch_size (int): number of fixtures downloaded before their pages are handed to the parsers
+
+    Returns:
+        harvest_summary (dict): number of harvested and skipped fixtures, and the error for each failed fixture
+    """
+    if fb is None:
+        fb = FBref()
+
+    # unplayed fixtures link to a head-to-head page instead of a match report
+    played_fixtures_df = fixtures_df.loc[
+        fixtures_df.home_score.notna() & fixtures_df.fixture_link.str.contains("/matches/", na=False)
+    ]
+    harvested_fixture_ids = read_progress(progress_path)
+
+    fixtures_to_harvest = [
+        (fixture_link, home_team_id, away_team_id)
+        for fixture_link, home_team_id, away_team_id in zip(
+            played_fixtures_df.fixture_link, played_fixtures_df.home_team_id, played_fixtures_df.away_team_id
+        )
+        if get_fixture_id(fixture_link) not in harvested_fixture_ids
+    ]
+
+    harvest_summary = {
+        "harvested": 0,
+        "skipped": len(played_fixtures_df) - len(fixtures_to_harvest),
+        "failed": {},
+    }
+
+    fetch_pool = ThreadPoolExecutor(max_workers=fb.fetcher.max_workers)
+    parse_pool = ProcessPoolExecutor(max_workers=max_workers)
+
+    with fetch_pool, parse_pool:
+        for batch_start in range(0, len(fixtures_to_harvest), batch_size):
+            batch_end = batch_start + batch_size
+            fixtures_batch = fixtures_to_harvest[batch_start:batch_end]
+
+            fetch_futures = [
+                (fixture, fetch_pool.submit(fetch_with_retries, fb.fetcher, fixture[0])) for fixture in fixtures_batch
+            ]
+
+            parse_futures = []
+            for (fixture_link, home_team_id, away_team_id), fetch_future in fetch_futures:
+                try:
+                    html_content = fetch_future.result()
+                except Exception as fetch_error:
+                    harvest_summary["failed"][get_fixture_id(fixture_link)] = repr(fetch_error)
+                    continue
+                parse_future = parse_pool.submit(
+                    parse_fixture_stats, fixture_link, html_content, home_team_id, away_team_id, fb.parser_backend
+                )
+                parse_futures.append((fixture_link, parse_future))
+
+            for fixture_link, parse_future in parse_futures:
+                fixture_id = get_fixture_id(fixture_link)
+                try:
+                    fixture_stat_dict = parse_future.result()
+                except Exception as parse_error:
+                    harvest_summary["failed"][fixture_id] = repr(parse_error)
+                    continue
+
+                for stat_type, stat_df in fixture_stat_dict.items():
+                    sink(fixture_id, stat_type, stat_df)
+                record_progress(progress_path, fixture_id)
+                harvest_summary["harvested"] += 1
+
+    return harvest_summary
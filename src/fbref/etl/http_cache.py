@@ -0,0 +1,35 @@
+"""Script used to decide how long FBref pages can be served from the response cache"""
+
+import re
+
+from src.fbref.config.fbref_config import (
+    CURRENT_SEASON,
+    CURRENT_SEASON_CACHE_TTL_SECONDS,
+    DEFAULT_CACHE_TTL_SECONDS,
+)
+
+season_pattern = re.compile(r"/(\d{4}-\d{4})/")
+
+
+def get_fbref_cache_ttl(url):
+    """Function used to give the time to live in seconds of a cached FBref page.
+
+    Args:
+        url (str): FBref URL
+
+    Returns:
+        ttl (int): seconds before the page should be revalidated, None if the page never changes
+    """
+    # match reports only exist once a match has been played
+    if "/matches/" in url:
+        return None
+
+    season_match = season_pattern.search(url)
+    if season_match is None:
+        return DEFAULT_CACHE_TTL_SECONDS
+
+    if season_match.group(1) == CURRENT_SEASON:
+        return CURRENT_SEASON_CACHE_TTL_SECONDS
+
+    # finished seasons
+    return None
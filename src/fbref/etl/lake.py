@@ -0,0 +1,212 @@
+"""Script used to store cleaned FBref tables in a local parquet lake and read them back.
+
+Tables are written to {lake_dir}/table_type={table_type}/competition_partition={competition_id}/
+season_partition={season_name}/ as
+hive partitions, so readers only open the files of the competitions and seasons they ask for.
+"""
+
+import glob
+import os
+import shutil
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.fbref.config.fbref_config import FBREF_LAKE_DIR
+
+# named apart from data columns such as competition and season_name
+LAKE_PARTITION_COLUMNS = ["competition_partition", "season_partition"]
+LAKE_PARTITIONING = ds.partitioning(
+    pa.schema([(partition_column, pa.string()) for partition_column in LAKE_PARTITION_COLUMNS]), flavor="hive"
+)
+
+
+def get_lake_partition_dir(table_type, competition_id, season_name, lake_dir=FBREF_LAKE_DIR):
+    """Function used to get the directory of one partition of the lake"""
+    return os.path.join(
+        lake_dir,
+        f"table_type={table_type}",
+        f"competition_partition={competition_id}",
+        f"season_partition={season_name}",
+    )
+
+
+def get_lake_harvest_progress_path(competition_id, season_name, lake_dir=FBREF_LAKE_DIR):
+    """Function used to get the harvest progress file of a competition season harvested into the lake.
+
+    It sits under {lake_dir}/_harvest_progress/, pyarrow skips directories starting with an underscore.
+    """
+    return os.path.join(
+        lake_dir,
+        "_harvest_progress",
+        f"competition_partition={competition_id}",
+        f"season_partition={season_name}",
+        "harvested_fixture_ids.txt",
+    )
+
+
+def write_lake_table(table_df, table_type, competition_id, season_name, part_name="part-0", lake_dir=FBREF_LAKE_DIR):
+    """Function used to write a cleaned dataframe to the lake, replacing the same part of the partition.
+
+    Args:
+        table_df (pandas.DataFrame): cleaned FBref dataframe
+        table_type (str): e.g. league_table, fixtures, big5_passing, match_summary
+        competition_id (str): FBref competition id, Big5 for big 5 player tables
+        season_name (str): e.g. 2022-2023
+        part_name (str): file name in the partition, one part per fixture for match stats
+
+    Returns:
+        part_path (str): path of the written parquet file
+    """
+    partition_dir = get_lake_partition_dir(table_type, competition_id, season_name, lake_dir)
+    os.makedirs(partition_dir, exist_ok=True)
+    part_path = os.path.join(partition_dir, f"{part_name}.parquet")
+
+    # write next to the final file and swap it in, readers never see half a file
+    temp_path = f"{part_path}.{uuid.uuid4().hex[:8]}.tmp"
+    pq.write_table(pa.Table.from_pandas(table_df, preserve_index=False), temp_path)
+    os.replace(temp_path, part_path)
+    return part_path
+
+
+def compact_lake_partition(table_type, competition_id, season_name, lake_dir=FBREF_LAKE_DIR):
+    """Function used to merge the parts of a partition, e.g. one file per fixture, into a single file"""
+    partition_dir = get_lake_partition_dir(table_type, competition_id, season_name, lake_dir)
+    part_paths = sorted(glob.glob(os.path.join(partition_dir, "*.parquet")))
+    if len(part_paths) <= 1:
+        return
+
+    partition_table = pa.concat_tables(
+        [pq.read_table(part_path) for part_path in part_paths], promote_options="permissive"
+    ).combine_chunks()
+
+    temp_path = os.path.join(partition_dir, f"compacted.{uuid.uuid4().hex[:8]}.tmp")
+    pq.write_table(partition_table, temp_path)
+
+    # swap the compacted file in before removing the parts, a crash in between leaves duplicates, never lost rows
+    compacted_path = os.path.join(partition_dir, "part-0.parquet")
+    os.replace(temp_path, compacted_path)
+    for part_path in part_paths:
+        if part_path != compacted_path:
+            os.remove(part_path)
+
+
+def delete_lake_partition(table_type, competition_id, season_name, lake_dir=FBREF_LAKE_DIR):
+    """Function used to remove a partition from the lake"""
+    shutil.rmtree(get_lake_partition_dir(table_type, competition_id, season_name, lake_dir), ignore_errors=True)
+
+
+def get_lake_partitions(table_type=None, lake_dir=FBREF_LAKE_DIR):
+    """Function used to list the partitions stored in the lake
+
+    Returns:
+        partitions_df (pandas.DataFrame): table_type, competition_partition and season_partition of every partition
+    """
+    table_type_pattern = "*" if table_type is None else table_type
+    partition_dirs = glob.glob(
+        os.path.join(lake_dir, f"table_type={table_type_pattern}", "competition_partition=*", "season_partition=*")
+    )
+
+    partition_rows = [
+        [partition_part.split("=", 1)[1] for partition_part in os.path.relpath(partition_dir, lake_dir).split(os.sep)]
+        for partition_dir in sorted(partition_dirs)
+    ]
+    partitions_df = pd.DataFrame(partition_rows, columns=["table_type"] + LAKE_PARTITION_COLUMNS)
+    return partitions_df
+
+
+def get_lake_filter_expression(filters):
+    """Function used to turn filters into a pyarrow expression.
+
+    Args:
+        filters: a pyarrow expression, or the list of (column, op, value) tuples used by pandas.read_parquet
+    """
+    if filters is None or isinstance(filters, ds.Expression):
+        return filters
+    return pq.filters_to_expression(filters)
+
+
+def read_lake_table(
+    table_type,
+    competition_ids=None,
+    season_names=None,
+    columns=None,
+    filters=None,
+    include_partition_columns=False,
+    lake_dir=FBREF_LAKE_DIR,
+):
+    """Function used to read a table from the lake.
+
+    Only the partitions of the requested competitions and seasons are opened, only the requested columns are read and
+    filters are pushed down to the parquet row groups.
+
+    Args:
+        table_type (str): table type written with write_lake_table
+        competition_ids (List): competitions to read, None for all
+        season_names (List): seasons to read, None for all
+        columns (List): columns to read, None for all
+        filters: pyarrow expression or list of (column, op, value) tuples, e.g. [("minutes", ">=", 900)]
+        include_partition_columns (bool): add the competition and season partition columns
+
+    Returns:
+        table_df (pandas.DataFrame): matching rows, empty if nothing is stored for the table type
+    """
+    # partition pruning, only the files of the requested competitions and seasons are listed
+    table_dir = os.path.join(lake_dir, f"table_type={table_type}")
+    competition_patterns = (
+        ["*"] if competition_ids is None else [str(competition_id) for competition_id in competition_ids]
+    )
+    season_patterns = ["*"] if season_names is None else list(season_names)
+    part_paths = sorted(
+        part_path
+        for competition_pattern in competition_patterns
+        for season_pattern in season_patterns
+        for part_path in glob.glob(
+            os.path.join(
+                table_dir,
+                f"competition_partition={competition_pattern}",
+                f"season_partition={season_pattern}",
+                "*.parquet",
+            )
+        )
+    )
+    if not part_paths:
+        return pd.DataFrame(columns=columns)
+
+    # seasons can differ in columns and types, missing columns are read as nulls and e.g. int64 and double as double
+    table_schema = pa.unify_schemas(
+        [pq.read_schema(part_path) for part_path in part_paths] + [LAKE_PARTITIONING.schema],
+        promote_options="permissive",
+    )
+    table_dataset = ds.dataset(
+        part_paths,
+        schema=table_schema,
+        format="parquet",
+        partitioning=LAKE_PARTITIONING,
+        partition_base_dir=table_dir,
+    )
+
+    if columns is None:
+        columns = [
+            column_name
+            for column_name in table_dataset.schema.names
+            if include_partition_columns or column_name not in LAKE_PARTITION_COLUMNS
+        ]
+
+    filter_expression = get_lake_filter_expression(filters)
+    table_df = table_dataset.to_table(columns=columns, filter=filter_expression).to_pandas()
+    return table_df
+
+
+def lake_sink(competition_id, season_name, lake_dir=FBREF_LAKE_DIR):
+    """Function used to create a harvest sink writing each match stat table to the lake, one part per fixture"""
+
+    def sink(fixture_id, stat_type, stat_df):
+        write_lake_table(
+            stat_df, f"match_{stat_type}", competition_id, season_name, part_name=fixture_id, lake_dir=lake_dir
+        )
+
+    return sink
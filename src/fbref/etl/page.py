@@ -0,0 +1,142 @@
+"""Page object used to parse a downloaded FBref page once and read any number of tables from it"""
+
+import re
+
+import lxml.html
+from bs4 import BeautifulSoup
+from bs4.dammit import EncodingDetector
+
+from src.fbref.etl.table_parser import PARSER_BACKENDS, LxmlTable, SoupTable
+
+table_id_pattern = re.compile(rb"<table\b[^>]*?\bid\s*=\s*[\"']([^\"']+)[\"']", re.IGNORECASE)
+table_tag_pattern = re.compile(rb"<(/?)table\b", re.IGNORECASE)
+
+
+def find_table_end(html_content, table_start):
+    """Function used to find the byte offset just after the </table> closing the table opened at table_start"""
+    depth = 0
+    for tag_match in table_tag_pattern.finditer(html_content, table_start):
+        if tag_match.group(1):
+            depth -= 1
+            if depth == 0:
+                return html_content.index(b">", tag_match.end()) + 1
+        else:
+            depth += 1
+    return len(html_content)
+
+
+def build_table_index(html_content):
+    """Function used to scan raw HTML once for every <table id=...>, including tables hidden in HTML comments.
+
+    FBref ships most secondary tables (e.g. stats_squads_defense_for) commented out and only renders them with
+    javascript, so a normal parse of the document never sees them.
+
+    Args:
+        html_content (bytes): raw HTML of the page
+
+    Returns:
+        table_index (dict): table id -> (start, end) byte offsets of the table html, first occurrence wins
+    """
+    table_index = {}
+    for table_match in table_id_pattern.finditer(html_content):
+        table_id = table_match.group(1).decode("ascii", errors="replace")
+        if table_id not in table_index:
+            table_start = table_match.start()
+            table_index[table_id] = (table_start, find_table_end(html_content, table_start))
+    return table_index
+
+
+class FBrefPage:
+    """Class used to hold a downloaded FBref page.
+
+    Tables are located with a single scan of the raw HTML (see build_table_index) and only the fragment of each
+    requested table is parsed, once, so pulling N tables from one URL costs a single download and N small parses.
+    Tables hidden in HTML comments are found the same way as live ones.
+
+    Args:
+        url (str): URL the page was downloaded from
+        html_content (bytes): raw HTML of the page
+        parser_backend (str): parser used by get_parsed_table, "html.parser" (BeautifulSoup) or "lxml"
+    """
+
+    def __init__(self, url, html_content, parser_backend="html.parser"):
+        if parser_backend not in PARSER_BACKENDS:
+            raise Exception(f"Input parser_backend invalid, expected one of {PARSER_BACKENDS}.")
+
+        if isinstance(html_content, str):
+            html_content = html_content.encode("utf-8")
+
+        self.url = url
+        self.html_content = html_content
+        self.parser_backend = parser_backend
+        self._beautifulsoup_object = None
+        self._table_index = None
+        self._encoding = None
+        self._parsed_tables = {}
+
+    @property
+    def soup(self):
+        """BeautifulSoup object for the whole page, parsed on first use"""
+        if self._beautifulsoup_object is None:
+            self._beautifulsoup_object = BeautifulSoup(self.html_content, "html.parser")
+        return self._beautifulsoup_object
+
+    @property
+    def table_index(self):
+        """Table id -> (start, end) byte offsets for every table on the page, built on first use"""
+        if self._table_index is None:
+            self._table_index = build_table_index(self.html_content)
+        return self._table_index
+
+    @property
+    def encoding(self):
+        """Encoding declared by the page, utf-8 when the page does not declare one"""
+        if self._encoding is None:
+            declared_encoding = EncodingDetector.find_declared_encoding(self.html_content, is_html=True)
+            self._encoding = declared_encoding or "utf-8"
+        return self._encoding
+
+    def get_table_html(self, table_id):
+        """Function used to grab the raw html of a table, live or commented out, None if the page has no such table"""
+        if table_id not in self.table_index:
+            return None
+        table_start, table_end = self.table_index[table_id]
+        return self.html_content[table_start:table_end].decode(self.encoding, errors="replace")
+
+    def _parse_table(self, table_id, parser_backend):
+        """Function used to parse only the fragment of the page holding the table, memoised per table and backend"""
+        if (table_id, parser_backend) not in self._parsed_tables:
+            table_html = self.get_table_html(table_id)
+            if table_html is None:
+                html_table = None
+            elif parser_backend == "lxml":
+                html_table = lxml.html.fragment_fromstring(table_html)
+            else:
+                html_table = BeautifulSoup(table_html, "html.parser").find("table")
+            self._parsed_tables[(table_id, parser_backend)] = html_table
+        return self._parsed_tables[(table_id, parser_backend)]
+
+    def get_parsed_table(self, table_id):
+        """Function used to grab a table reader for specified table using the page's parser backend, None if missing"""
+        html_table = self._parse_table(table_id, self.parser_backend)
+        if html_table is None:
+            return None
+        if self.parser_backend == "lxml":
+            return LxmlTable(html_table)
+        return SoupTable(html_table)
+
+    def get_table(self, table_id):
+        """Function used to grab html code for specified table, None if the page has no such table"""
+        html_table = self._parse_table(table_id, "html.parser")
+        if html_table is None:
+            # not a <table id=...>, fall back to any element with that id
+            html_table = self.soup.find(id=table_id)
+        return html_table
+
+    def get_tables(self, table_ids):
+        """Function used to grab html code for several tables, returned as a dictionary keyed by table id"""
+        return {table_id: self.get_table(table_id) for table_id in table_ids}
+
+    def get_table_ids(self):
+        """Function used to give the ids of every table on the page, including tables hidden in HTML comments"""
+        return list(self.table_index)
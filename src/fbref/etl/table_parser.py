@@ -0,0 +1,142 @@
+"""Script used to read rows and cells out of FBref html tables with either BeautifulSoup or lxml"""
+
+import lxml.html
+from bs4 import Tag
+
+PARSER_BACKENDS = ["html.parser", "lxml"]
+
+
+def get_soup_column_names(html_table):
+    """Function used to get column names for tables scraped online"""
+    headers = html_table.find("thead")
+
+    over_headers = headers.find("tr", class_="over_header")
+
+    if over_headers is None:
+        over_headers_text = []
+    else:
+        over_headers_text = [(header.text, header.attrs.get("colspan")) for header in over_headers.find_all("th")]
+
+    table_headers_text = [header.text for header in headers.find_all("th", scope="col")]
+    return combine_column_names(over_headers_text, table_headers_text)
+
+
+def get_lxml_column_names(html_table):
+    """Function used to get column names for an lxml html table, matching get_soup_column_names"""
+    headers = html_table.find("thead")
+
+    over_headers = headers.xpath(".//tr[contains(concat(' ', normalize-space(@class), ' '), ' over_header ')]")
+
+    if len(over_headers) == 0:
+        over_headers_text = []
+    else:
+        over_headers_text = [(header.text_content(), header.get("colspan")) for header in over_headers[0].iter("th")]
+
+    table_headers_text = [header.text_content() for header in headers.xpath(".//th[@scope='col']")]
+    return combine_column_names(over_headers_text, table_headers_text)
+
+
+def combine_column_names(over_headers_text, table_headers_text):
+    """Function used to prefix column names with their over header, expanding over headers spanning several columns
+
+    Args:
+        over_headers_text (List): (text, colspan) for each over header, colspan None when the attribute is missing
+        table_headers_text (List): text of each column header
+
+    Returns:
+        full_header_names (List): column names
+    """
+    if len(over_headers_text) == 0:
+        return table_headers_text
+
+    expanded_over_headers_text = []
+    for header_text, colspan in over_headers_text:
+        if colspan is not None:
+            expanded_over_headers_text += [header_text] * int(colspan)
+        else:
+            expanded_over_headers_text.append(header_text)
+
+    full_header_names = [
+        (expanded_over_headers_text[i] + " " + table_headers_text[i]).strip() for i in range(len(table_headers_text))
+    ]
+    return full_header_names
+
+
+class SoupTable:
+    """Class used to read an html table parsed by BeautifulSoup"""
+
+    def __init__(self, html_table):
+        self.html_table = html_table
+
+    def get_column_names(self):
+        """Function used to get column names of the table"""
+        return get_soup_column_names(self.html_table)
+
+    def get_rows(self, expected_attribute_no=None):
+        """Function used to get body rows, dropping divider rows when expected_attribute_no is given"""
+        rows = self.html_table.find("tbody").find_all("tr")
+        if expected_attribute_no is not None:
+            rows = [row for row in rows if len(row.attrs) == expected_attribute_no]
+        return rows
+
+    def get_row_values(self, row):
+        """Function used to get the text of every cell in a row"""
+        return [data_cell.text for data_cell in row]
+
+    def get_row_link(self, row, data_stat=None):
+        """Function used to get the first link in a row, or in its cell with the given data-stat, None if missing"""
+        cell = row if data_stat is None else row.find(attrs={"data-stat": data_stat})
+        if cell is None:
+            return None
+        link = cell.find("a")
+        if link is None:
+            return None
+        return link.get("href")
+
+
+class LxmlTable:
+    """Class used to read an html table parsed by lxml, giving the same output as SoupTable"""
+
+    def __init__(self, html_table):
+        self.html_table = html_table
+
+    def get_column_names(self):
+        """Function used to get column names of the table"""
+        return get_lxml_column_names(self.html_table)
+
+    def get_rows(self, expected_attribute_no=None):
+        """Function used to get body rows, dropping divider rows when expected_attribute_no is given"""
+        rows = self.html_table.xpath("./tbody/tr")
+        if expected_attribute_no is not None:
+            rows = [row for row in rows if len(row.attrib) == expected_attribute_no]
+        return rows
+
+    def get_row_values(self, row):
+        """Function used to get the text of every cell in a row"""
+        # skip comments and processing instructions, whose tag is not a string
+        return [data_cell.text_content() for data_cell in row if isinstance(data_cell.tag, str)]
+
+    def get_row_link(self, row, data_stat=None):
+        """Function used to get the first link in a row, or in its cell with the given data-stat, None if missing"""
+        if data_stat is None:
+            cell = row
+        else:
+            cells = row.xpath("./*[@data-stat=$data_stat]", data_stat=data_stat)
+            if len(cells) == 0:
+                return None
+            cell = cells[0]
+        link = cell.find(".//a")
+        if link is None:
+            return None
+        return link.get("href")
+
+
+def as_parsed_table(html_table):
+    """Function used to wrap a BeautifulSoup tag or lxml element in the matching table reader"""
+    if html_table is None or isinstance(html_table, (SoupTable, LxmlTable)):
+        return html_table
+    if isinstance(html_table, Tag):
+        return SoupTable(html_table)
+    if isinstance(html_table, lxml.html.HtmlElement):
+        return LxmlTable(html_table)
+    raise Exception(f"Unsupported html table type {type(html_table)}.")
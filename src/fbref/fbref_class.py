@@ -1,10 +1,23 @@
 """FBref class used to fetch data from https://fbref.com/en/"""
 
+import threading
+from collections import OrderedDict
+
 import numpy as np
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
 
+from src.fbref.config.fbref_config import (
+    BIG5_PLAYER_STATS_URL,
+    BIG5_PLAYER_TABLE_SCHEMAS,
+    HTML_PARSER_BACKEND,
+    HTTP_CACHE_DIR,
+    HTTP_CACHE_MAX_BYTES,
+    MAX_CONCURRENT_REQUESTS,
+    PAGE_MEMO_SIZE,
+    REQUEST_MAX_RETRIES,
+    REQUEST_RATE_LIMIT_SECONDS,
+    REQUEST_TIMEOUT_SECONDS,
+)
 from src.fbref.etl.clean import (
     clean_big5_player_info,
     clean_defense_table,
@@ -14,6 +27,11 @@ from src.fbref.etl.clean import (
     clean_player_stat_table,
     clean_possession_table,
 )
+from src.fbref.etl.http_cache import get_fbref_cache_ttl
+from src.fbref.etl.page import FBrefPage
+from src.fbref.etl.table_parser import as_parsed_table
+from src.utility.http.cache import ResponseCache
+from src.utility.http.fetcher import Fetcher
 
 competition_dict = {
     "9": "Premier-League",
@@ -23,88 +41,112 @@ competition_dict = {
     "20": "Bundesliga",
 }
 
+# table type -> (table id template, clean function) for tables on the season stats page
+season_table_dict = {
+    "league_table": ("results{season_name}{competition_id}1_overall", clean_league_table_df),
+    "home_away_league_table": ("results{season_name}{competition_id}1_home_away", clean_home_away_league_table),
+    "defense_table": ("stats_squads_defense_for", clean_defense_table),
+    "possession_table": ("stats_squads_possession_for", clean_possession_table),
+}
+
 
 class FBref:
+    def __init__(self, fetcher=None, use_cache=True, parser_backend=HTML_PARSER_BACKEND):
+        self._fetcher = fetcher
+        self.use_cache = use_cache
+        self.parser_backend = parser_backend
+        self._page_memo = OrderedDict()
+        self._page_memo_lock = threading.Lock()
+
+    @property
+    def fetcher(self):
+        """Fetcher shared by every FBref method, created on first use"""
+        if self._fetcher is None:
+            if self.use_cache:
+                cache = ResponseCache(HTTP_CACHE_DIR, ttl_for_url=get_fbref_cache_ttl, max_bytes=HTTP_CACHE_MAX_BYTES)
+            else:
+                cache = None
+
+            self._fetcher = Fetcher(
+                rate_limit_seconds=REQUEST_RATE_LIMIT_SECONDS,
+                max_workers=MAX_CONCURRENT_REQUESTS,
+                timeout=REQUEST_TIMEOUT_SECONDS,
+                max_retries=REQUEST_MAX_RETRIES,
+                cache=cache,
+            )
+        return self._fetcher
+
+    def _remember_page(self, page):
+        with self._page_memo_lock:
+            self._page_memo[page.url] = page
+            self._page_memo.move_to_end(page.url)
+            while len(self._page_memo) > PAGE_MEMO_SIZE:
+                self._page_memo.popitem(last=False)
+
+    def _recall_page(self, input_url):
+        with self._page_memo_lock:
+            page = self._page_memo.get(input_url)
+            if page is not None:
+                self._page_memo.move_to_end(input_url)
+        return page
+
+    def get_page(self, input_url):
+        """Function used to grab the page object for a URL, downloaded and parsed at most once per URL"""
+        page = self._recall_page(input_url)
+        if page is None:
+            page = FBrefPage(input_url, self.fetcher.fetch(input_url), self.parser_backend)
+            self._remember_page(page)
+        return page
+
+    def get_pages(self, input_urls):
+        """Function used to grab page objects for several URLs, downloading the ones not yet in memory concurrently"""
+        input_urls = list(input_urls)
+        pages = {input_url: self._recall_page(input_url) for input_url in input_urls}
+
+        urls_to_fetch = list(dict.fromkeys(input_url for input_url, page in pages.items() if page is None))
+        for input_url, html_content in zip(urls_to_fetch, self.fetcher.fetch_many(urls_to_fetch)):
+            pages[input_url] = FBrefPage(input_url, html_content, self.parser_backend)
+            self._remember_page(pages[input_url])
+
+        return [pages[input_url] for input_url in input_urls]
+
     def instantiate_beautiful_soup_object(self, input_url):
         """Function used to create BeautifulSoup object to be used to extract information from URL"""
-        html_request = requests.get(input_url)
-        beautifulsoup_object = BeautifulSoup(html_request.content, "html.parser")
-        return beautifulsoup_object
+        return self.get_page(input_url).soup
+
+    def instantiate_beautiful_soup_objects(self, input_urls):
+        """Function used to download several URLs concurrently and create a BeautifulSoup object for each"""
+        return [page.soup for page in self.get_pages(input_urls)]
 
     def get_html_table_ids(self, input_url):
         """Function used to give a dictionary that contains the names of each table for a given URL"""
-        # instantiate beautiful soup
-        beautifulsoup_object = self.instantiate_beautiful_soup_object(input_url)
-        # get table list
-        html_table_list = beautifulsoup_object.find_all("table")
-        # get table id list
-        table_id_list = []
-
-        for table in html_table_list:
-            try:
-                table_id_list.append(table["id"])
-            except KeyError:
-                pass
-
-        return table_id_list
+        return self.get_page(input_url).get_table_ids()
 
     def get_column_names(self, html_table):
         """Function used to get column names for tables scraped online"""
-        headers = html_table.find("thead")
-
-        over_headers = headers.find("tr", class_="over_header")
-
-        if over_headers is None:
-            no_over_headers = 0
-        else:
-            over_headers = over_headers.find_all("th")
-            no_over_headers = len(over_headers)
-
-        table_headers = headers.find_all("th", scope="col")
-        table_headers_text = [header.text for header in table_headers]
-        no_table_headers = len(table_headers_text)
-
-        if no_over_headers > 0:
-            over_headers_text = []
-            for header in over_headers:
-                if "colspan" in header.attrs.keys():  # if statement for cases I ran into
-                    for times in range(int(header["colspan"])):
-                        over_headers_text.append(header.text)
-                else:
-                    over_headers_text.append(header.text)
-
-            full_header_names = [over_headers_text[i] + " " + table_headers_text[i] for i in range(no_table_headers)]
-            full_header_names = [header.strip() for header in full_header_names]
-        else:
-            full_header_names = table_headers_text
-        return full_header_names
+        return as_parsed_table(html_table).get_column_names()
 
     def get_html_table(self, table_id, input_url, beautifulsoup_object=None):
         """Function used to grab html code for specified table"""
         # grab html of data
         if beautifulsoup_object is None:
-            beautifulsoup_object = self.instantiate_beautiful_soup_object(input_url)
+            return self.get_page(input_url).get_table(table_id)
         html_table = beautifulsoup_object.find(id=table_id)
         return html_table
 
+    def get_parsed_table(self, table_id, input_url):
+        """Function used to grab a table reader for specified table using the configured parser backend"""
+        return self.get_page(input_url).get_parsed_table(table_id)
+
     def get_fbref_df(self, fbref_html_table, expected_attribute_no=None):
         """Function used to grab df for given table from FBref"""
-        fb_table_headers = self.get_column_names(fbref_html_table)
-        fb_table_body = fbref_html_table.find("tbody")
+        fb_table = as_parsed_table(fbref_html_table)
+        fb_table_headers = fb_table.get_column_names()
 
-        fb_table_rows = fb_table_body.find_all("tr")
+        fb_table_rows = fb_table.get_rows(expected_attribute_no)
 
-        if expected_attribute_no is not None:
-            fb_table_rows = self.get_rid_of_dividers(fb_table_rows, expected_attribute_no)
-
-        fb_table_rows_list = []
-
-        for fb_table_row in fb_table_rows:
-
-            # main data
-            row_data = [data_cell.text for data_cell in fb_table_row]
-
-            fb_table_rows_list.append(row_data)
+        # main data
+        fb_table_rows_list = [fb_table.get_row_values(fb_table_row) for fb_table_row in fb_table_rows]
 
         fb_table_df = pd.DataFrame(data=fb_table_rows_list, columns=fb_table_headers)
         return fb_table_df
@@ -115,22 +157,24 @@ class FBref:
         data_rows = [row for row in data_rows_list if len(row.attrs) == expected_attribute_no]
         return data_rows
 
+    def get_player_id_and_link(self, player_link):
+        """Function used to get player id and full link from a row link, NaN when the link is not a player link"""
+        if player_link is not None and "players" in player_link:
+            return player_link.split("/")[3], "https://fbref.com" + player_link
+        return np.nan, np.nan
+
     def get_big_5_leagues(self):
         """Function used to grab data about Europe's top 5 leagues"""
-        big5_table_html = self.get_html_table("comps_club", "https://fbref.com/en/comps/")
-        big5_headers = self.get_column_names(big5_table_html)
+        big5_table = self.get_parsed_table("comps_club", "https://fbref.com/en/comps/")
+        big5_headers = big5_table.get_column_names()
         big5_headers = big5_headers + ["competition_link", "competition_id"]
 
-        big5_table_body = big5_table_html.find("tbody")
-
-        big5_rows = big5_table_body.find_all("tr")
-
         big5_rows_list = []
-        for big5_row in big5_rows:
+        for big5_row in big5_table.get_rows():
             # main data
-            row_data = [data_cell.text for data_cell in big5_row]
+            row_data = big5_table.get_row_values(big5_row)
             # additional columns of interest
-            competition_link = "https://fbref.com" + big5_row.find(attrs={"data-stat": "league_name"}).a["href"]
+            competition_link = "https://fbref.com" + big5_table.get_row_link(big5_row, "league_name")
             competition_id = competition_link.split("/")[5]
 
             row_data += [competition_link]
@@ -156,32 +200,25 @@ class FBref:
 
         team_country_link = team_country_dict[country]
 
-        team_html_table = self.get_html_table("clubs", team_country_link)
-        team_headers = self.get_column_names(team_html_table)
+        team_table = self.get_parsed_table("clubs", team_country_link)
+        team_headers = team_table.get_column_names()
         team_headers += ["team_link", "team_id"]
 
-        team_body = team_html_table.find("tbody")
-        team_rows = team_body.find_all("tr")
-
-        team_rows = self.get_rid_of_dividers(data_rows_list=team_rows, expected_attribute_no=0)
+        team_rows = team_table.get_rows(expected_attribute_no=0)
 
         team_rows_list = []
 
         for team_row in team_rows:
 
             # main data
-            row_data = [data_cell.text for data_cell in team_row]
+            row_data = team_table.get_row_values(team_row)
 
             # additional columns of interest
-            try:
-                team_link = team_row.find("a")["href"]  # note here team link doesn't have specific tag to search
-                if "squads" in team_link:
-                    full_team_link = "https://fbref.com" + team_link
-                    team_id = full_team_link.split("/")[5]
-                else:
-                    full_team_link = np.nan
-                    team_id = np.nan
-            except TypeError:
+            team_link = team_table.get_row_link(team_row)  # note here team link doesn't have specific tag to search
+            if team_link is not None and "squads" in team_link:
+                full_team_link = "https://fbref.com" + team_link
+                team_id = full_team_link.split("/")[5]
+            else:
                 full_team_link = np.nan
                 team_id = np.nan
 
@@ -195,55 +232,38 @@ class FBref:
 
     def get_competition_seasons(self, competition_link):
         """"""
-        competition_seasons_html = self.get_html_table("seasons", competition_link)
-        competition_seasons_headers = self.get_column_names(competition_seasons_html)
-
-        competition_seasons_body = competition_seasons_html.find("tbody")
-        competition_seasons_rows = competition_seasons_body.find_all("tr")
-
-        competition_seasons_rows_list = []
-        for competition_seasons_row in competition_seasons_rows:
-            row_data = [data_cell.text for data_cell in competition_seasons_row]
-            competition_seasons_rows_list.append(row_data)
-        competition_seasons_df = pd.DataFrame(data=competition_seasons_rows_list, columns=competition_seasons_headers)
-        return competition_seasons_df
+        competition_seasons_table = self.get_parsed_table("seasons", competition_link)
+        return self.get_fbref_df(competition_seasons_table)
 
     def get_fixtures_and_results(self, competition_id, season_name):
         """Function used to grab fixtures and results for a given competition and season"""
         competition_name = competition_dict[str(competition_id)]
 
-        fixtures_html = self.instantiate_beautiful_soup_object(
+        fixtures_table = self.get_parsed_table(
+            f"sched_{season_name}_{competition_id}_1",
             f"https://fbref.com/en/comps/{competition_id}/{season_name}/schedule/"
-            + f"{season_name}-{competition_name}-Scores-and-Fixtures"
+            + f"{season_name}-{competition_name}-Scores-and-Fixtures",
         )
-
-        fixtures_html_table = fixtures_html.find(id=f"sched_{season_name}_{competition_id}_1")
-        fixtures_headers = self.get_column_names(fixtures_html_table)
+        fixtures_headers = fixtures_table.get_column_names()
         fixtures_headers += ["home_team_id", "away_team_id", "fixture_link"]
 
-        fixtures_body = fixtures_html_table.find("tbody")
-
-        fixtures_rows = fixtures_body.find_all("tr")
-
-        fixtures_rows = self.get_rid_of_dividers(data_rows_list=fixtures_rows, expected_attribute_no=0)
+        fixtures_rows = fixtures_table.get_rows(expected_attribute_no=0)
 
         fixtures_rows_list = []
 
         for fixtures_row in fixtures_rows:
 
             # main data
-            row_data = [data_cell.text for data_cell in fixtures_row]
+            row_data = fixtures_table.get_row_values(fixtures_row)
 
             # additional columns of interest
             # fixture link
-            try:
-                fixture_link = "https://fbref.com" + fixtures_row.find(attrs={"data-stat": "match_report"}).a["href"]
-            except TypeError:
-                fixture_link = np.nan
+            match_report_link = fixtures_table.get_row_link(fixtures_row, "match_report")
+            fixture_link = "https://fbref.com" + match_report_link if match_report_link is not None else np.nan
             # home id
-            home_id = fixtures_row.find(attrs={"data-stat": "home_team"}).a["href"].split("/")[3]
+            home_id = fixtures_table.get_row_link(fixtures_row, "home_team").split("/")[3]
             # away id
-            away_id = fixtures_row.find(attrs={"data-stat": "away_team"}).a["href"].split("/")[3]
+            away_id = fixtures_table.get_row_link(fixtures_row, "away_team").split("/")[3]
 
             row_data += [home_id]
             row_data += [away_id]
@@ -257,10 +277,17 @@ class FBref:
         cleaned_fixtures_df["competition_id"] = competition_id
         return cleaned_fixtures_df
 
-    def get_fixture_stats(self, fixture_url, home_id, away_id):
-        """Function used to grab stats for a specified team. ie"""
+    def get_fixture_stats(self, fixture_url, home_id, away_id, fixture_page=None):
+        """Function used to grab stats for both teams of a fixture, each stat table gets a team_id column.
 
-        fixture_object = self.instantiate_beautiful_soup_object(fixture_url)
+        Args:
+            fixture_url (str): match report url
+            home_id (str): FBref id of the home team
+            away_id (str): FBref id of the away team
+            fixture_page (FBrefPage): already downloaded match report, fetched from fixture_url when None
+        """
+        if fixture_page is None:
+            fixture_page = self.get_page(fixture_url)
 
         fixture_stat_dict = {}
 
@@ -268,7 +295,8 @@ class FBref:
             stat_df_list = []
             for team_id in [home_id, away_id]:
                 table_id = f"stats_{team_id}_{stat}"
-                fixture_stat_df = self.get_fixture_stat_df(table_id, fixture_url, fixture_object)
+                fixture_stat_df = self.get_fixture_stat_df(table_id, fixture_url, fixture_page)
+                fixture_stat_df["team_id"] = team_id
                 stat_df_list.append(fixture_stat_df)
             fixture_stat_dict[stat] = pd.concat(stat_df_list)
 
@@ -276,10 +304,12 @@ class FBref:
         shots_stats_list = []
         for team_id in [home_id, away_id]:
             table_id = f"keeper_stats_{team_id}"
-            keeper_stat_df = self.get_fixture_stat_df(table_id, fixture_url, fixture_object)
+            keeper_stat_df = self.get_fixture_stat_df(table_id, fixture_url, fixture_page)
+            keeper_stat_df["team_id"] = team_id
 
             table_id = f"shots_{team_id}"
-            shots_stat_df = self.get_fixture_shots_df(table_id, fixture_url, fixture_object)
+            shots_stat_df = self.get_fixture_shots_df(table_id, fixture_url, fixture_page)
+            shots_stat_df["team_id"] = team_id
 
             keeper_stats_list.append(keeper_stat_df)
             shots_stats_list.append(shots_stat_df)
@@ -288,33 +318,27 @@ class FBref:
 
         return fixture_stat_dict
 
-    def get_fixture_stat_df(self, table_id, fixture_url, fixture_bs_object):
+    def _get_fixture_table(self, table_id, fixture_url, fixture_page=None):
+        """Function used to grab a table reader from a match report page, a BeautifulSoup object or the fixture url"""
+        if fixture_page is None:
+            return self.get_parsed_table(table_id, fixture_url)
+        if isinstance(fixture_page, FBrefPage):
+            return fixture_page.get_parsed_table(table_id)
+        return as_parsed_table(fixture_page.find(id=table_id))
+
+    def get_fixture_stat_df(self, table_id, fixture_url, fixture_bs_object=None):
         """Function used to grab dataframe for stats from a given fixture url"""
-        fixture_stat_html = self.get_html_table(table_id, fixture_url, fixture_bs_object)
-        fixture_stat_headers = self.get_column_names(fixture_stat_html)
+        fixture_stat_table = self._get_fixture_table(table_id, fixture_url, fixture_bs_object)
+        fixture_stat_headers = fixture_stat_table.get_column_names()
         fixture_stat_headers += ["player_id", "player_link"]
 
-        fixture_stat_body = fixture_stat_html.find("tbody")
-
-        fixture_stat_rows = fixture_stat_body.find_all("tr")
-
         fixture_stat_rows_list = []
-        for fixture_stat_row in fixture_stat_rows:
+        for fixture_stat_row in fixture_stat_table.get_rows():
             # main data
-            row_data = [data_cell.text for data_cell in fixture_stat_row]
+            row_data = fixture_stat_table.get_row_values(fixture_stat_row)
 
             # get player ids
-            try:
-                player_link = fixture_stat_row.find("a")["href"]
-                if "players" in player_link:
-                    full_player_link = "https://fbref.com" + player_link
-                    player_id = player_link.split("/")[3]
-                else:
-                    full_player_link = np.nan
-                    player_id = np.nan
-            except TypeError:
-                full_player_link = np.nan
-                player_id = np.nan
+            player_id, full_player_link = self.get_player_id_and_link(fixture_stat_table.get_row_link(fixture_stat_row))
 
             row_data += [player_id, full_player_link]
             fixture_stat_rows_list.append(row_data)
@@ -322,147 +346,83 @@ class FBref:
         fixture_stat_df = pd.DataFrame(data=fixture_stat_rows_list, columns=fixture_stat_headers)
         return fixture_stat_df
 
-    def get_fixture_shots_df(self, table_id, fixture_url, fixture_bs_object):
+    def get_fixture_shots_df(self, table_id, fixture_url, fixture_bs_object=None):
         """Function used to grab dataframe for shots from a given fixture url"""
-        fixture_shots_html = self.get_html_table(table_id, fixture_url, fixture_bs_object)
-        fixture_shots_headers = self.get_column_names(fixture_shots_html)
+        fixture_shots_table = self._get_fixture_table(table_id, fixture_url, fixture_bs_object)
+        return self.get_fbref_df(fixture_shots_table, expected_attribute_no=1)
 
-        fixture_shots_body = fixture_shots_html.find("tbody")
-
-        fixture_shots_rows = fixture_shots_body.find_all("tr")
+    def get_season_stats_table(self, table_type, competition_id, season_name):
+        """Function used to grab league table for given competition and season"""
+        return self.get_season_tables(competition_id, season_name, [table_type])[table_type]
 
-        fixture_shots_rows = self.get_rid_of_dividers(data_rows_list=fixture_shots_rows, expected_attribute_no=1)
+    def get_season_tables(self, competition_id, season_name, table_types):
+        """Function used to grab several tables from the season stats page of a competition with one download.
 
-        fixture_shots_rows_list = []
-        for fixture_shots_row in fixture_shots_rows:
-            # main data
-            row_data = [data_cell.text for data_cell in fixture_shots_row]
-            fixture_shots_rows_list.append(row_data)
+        Args:
+            competition_id (str): FBref competition id
+            season_name (str): season name, format "YYYY-YYYY"
+            table_types (List): table types, keys of season_table_dict e.g. ["league_table", "defense_table"]
 
-        fixture_shots_df = pd.DataFrame(data=fixture_shots_rows_list, columns=fixture_shots_headers)
-        return fixture_shots_df
+        Returns:
+            season_tables_dict (dict): table type -> cleaned dataframe
+        """
+        for table_type in table_types:
+            if table_type not in season_table_dict:
+                raise Exception("Input table_type invalid.")
 
-    def get_season_stats_table(self, table_type, competition_id, season_name):
-        """Function used to grab league table for given competition and season"""
         competition_name = competition_dict[str(competition_id)]
 
-        season_stats_html = self.instantiate_beautiful_soup_object(
+        season_stats_page = self.get_page(
             f"https://fbref.com/en/comps/{competition_id}/{season_name}/{season_name}-{competition_name}-Stats"
         )
-        if table_type == "league_table":
-            season_table = season_stats_html.find(id=f"results{season_name}{competition_id}1_overall")
-            season_df = self.get_fbref_df(season_table)
-            cleaned_season_df = clean_league_table_df(season_df)
-        elif table_type == "home_away_league_table":
-            season_table = season_stats_html.find(id=f"results{season_name}{competition_id}1_home_away")
-            season_df = self.get_fbref_df(season_table)
-            cleaned_season_df = clean_home_away_league_table(season_df)
-        elif table_type == "defense_table":
-            season_table = season_stats_html.find(id="stats_squads_defense_for")
-            season_df = self.get_fbref_df(season_table)
-            cleaned_season_df = clean_defense_table(season_df)
-        elif table_type == "possession_table":
-            season_table = season_stats_html.find(id="stats_squads_possession_for")
-            season_df = self.get_fbref_df(season_table)
-            cleaned_season_df = season_df
-            cleaned_season_df = clean_possession_table(season_df)
 
-        else:
-            raise Exception("Input table_type invalid.")
+        season_tables_dict = {}
+        for table_type in table_types:
+            table_id_template, clean_function = season_table_dict[table_type]
+            season_table = season_stats_page.get_parsed_table(
+                table_id_template.format(season_name=season_name, competition_id=competition_id)
+            )
+            season_df = self.get_fbref_df(season_table)
+            cleaned_season_df = clean_function(season_df)
 
-        cleaned_season_df["competition_id"] = competition_id
-        cleaned_season_df["season_name"] = season_name.replace("-", "_")
+            cleaned_season_df["competition_id"] = competition_id
+            cleaned_season_df["season_name"] = season_name.replace("-", "_")
+            season_tables_dict[table_type] = cleaned_season_df
 
-        return cleaned_season_df
+        return season_tables_dict
 
     def get_big5_player_stats(self, table_type, season_name):
-        """Function used to grab player data from the big 5 leagues"""
-
-        if table_type == "standard":
-            big5_url = (
-                f"https://fbref.com/en/comps/Big5/{season_name}/stats/players/"
-                + f"{season_name}-Big-5-European-Leagues-Stats"
-            )
-            big5_table_html = self.get_html_table("stats_standard", big5_url)
-            big5_df = self.get_fbref_df(big5_table_html, expected_attribute_no=0)
-            big5_df = clean_player_stat_table(big5_df, table_type)
-        elif table_type == "passing":
-            big5_url = (
-                f"https://fbref.com/en/comps/Big5/{season_name}/{table_type}/players/"
-                + f"{season_name}-Big-5-European-Leagues-Stats"
-            )
-            big5_table_html = self.get_html_table("stats_passing", big5_url)
-            big5_df = self.get_fbref_df(big5_table_html, expected_attribute_no=0)
-            big5_df = clean_player_stat_table(big5_df, table_type)
-        elif table_type == "defense":
-            big5_url = (
-                f"https://fbref.com/en/comps/Big5/{season_name}/{table_type}/players/"
-                + f"{season_name}-Big-5-European-Leagues-Stats"
-            )
-            big5_table_html = self.get_html_table("stats_defense", big5_url)
-            big5_df = self.get_fbref_df(big5_table_html, expected_attribute_no=0)
-            big5_df = clean_player_stat_table(big5_df, table_type)
-        elif table_type == "possession":
-            big5_url = (
-                f"https://fbref.com/en/comps/Big5/{season_name}/{table_type}/players/"
-                + f"{season_name}-Big-5-European-Leagues-Stats"
-            )
-            big5_table_html = self.get_html_table("stats_possession", big5_url)
-            big5_df = self.get_fbref_df(big5_table_html, expected_attribute_no=0)
-            big5_df = clean_player_stat_table(big5_df, table_type)
-        elif table_type == "shooting":
-            big5_url = (
-                f"https://fbref.com/en/comps/Big5/{season_name}/{table_type}/players/"
-                + f"{season_name}-Big-5-European-Leagues-Stats"
-            )
-            big5_table_html = self.get_html_table("stats_shooting", big5_url)
-            big5_df = self.get_fbref_df(big5_table_html, expected_attribute_no=0)
-            big5_df = clean_player_stat_table(big5_df, table_type)
-        elif table_type == "miscellaneous":
-            big5_url = (
-                f"https://fbref.com/en/comps/Big5/{season_name}/misc/players/"
-                + f"{season_name}-Big-5-European-Leagues-Stats"
-            )
-            big5_table_html = self.get_html_table("stats_misc", big5_url)
-            big5_df = self.get_fbref_df(big5_table_html, expected_attribute_no=0)
-            big5_df = clean_player_stat_table(big5_df, table_type)
-        else:
+        """Function used to grab player data from the big 5 leagues, table types are set in BIG5_PLAYER_TABLE_SCHEMAS"""
+        if table_type not in BIG5_PLAYER_TABLE_SCHEMAS:
             raise Exception("Input table_type invalid.")
+        table_schema = BIG5_PLAYER_TABLE_SCHEMAS[table_type]
+
+        big5_url = BIG5_PLAYER_STATS_URL.format(season_name=season_name, url_path=table_schema["url_path"])
+        big5_table_html = self.get_parsed_table(table_schema["table_id"], big5_url)
+        big5_df = self.get_fbref_df(big5_table_html, expected_attribute_no=0)
+        big5_df = clean_player_stat_table(big5_df, table_type)
+
         big5_df["season_name"] = season_name
         return big5_df
 
     def get_big5_player_info(self, season_name):
         """Function used to grab player specific information from fbref"""
-        big5_url = (
-            f"https://fbref.com/en/comps/Big5/{season_name}/stats/players/"
-            + f"{season_name}-Big-5-European-Leagues-Stats"
-        )
-        big5_table_html = self.get_html_table("stats_standard", big5_url)
-        big5_table_headers = self.get_column_names(big5_table_html)
+        standard_schema = BIG5_PLAYER_TABLE_SCHEMAS["standard"]
+        big5_url = BIG5_PLAYER_STATS_URL.format(season_name=season_name, url_path=standard_schema["url_path"])
+        big5_table = self.get_parsed_table(standard_schema["table_id"], big5_url)
+        big5_table_headers = big5_table.get_column_names()
         big5_table_headers += ["player_id", "player_link"]
 
-        big5_table_body = big5_table_html.find("tbody")
-        big5_table_rows = big5_table_body.find_all("tr")
-        big5_table_rows = self.get_rid_of_dividers(big5_table_rows, expected_attribute_no=0)
+        big5_table_rows = big5_table.get_rows(expected_attribute_no=0)
 
         big5_table_rows_list = []
 
         for big5_table_row in big5_table_rows:
             # main data
-            row_data = [data_cell.text for data_cell in big5_table_row]
+            row_data = big5_table.get_row_values(big5_table_row)
 
             # get player ids
-            try:
-                player_link = big5_table_row.find("a")["href"]
-                if "players" in player_link:
-                    full_player_link = "https://fbref.com" + player_link
-                    player_id = player_link.split("/")[3]
-                else:
-                    full_player_link = np.nan
-                    player_id = np.nan
-            except TypeError:
-                full_player_link = np.nan
-                player_id = np.nan
+            player_id, full_player_link = self.get_player_id_and_link(big5_table.get_row_link(big5_table_row))
 
             row_data += [player_id, full_player_link]
             big5_table_rows_list.append(row_data)
@@ -0,0 +1,229 @@
+"""Script used to turn football-data bookmaker odds into implied probabilities, margins and line movement.
+
+Odds of a market are laid out as a matches x bookmakers x outcomes array, so every function works on every match and
+bookmaker at once. Missing prices are nan and leave the probabilities of that match and bookmaker nan.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.football_data.config.football_data_config import (
+    FOOTBALL_DATA_ASIAN_HANDICAP_LINE_COLUMNS,
+    FOOTBALL_DATA_ODDS_BOOKMAKERS,
+    FOOTBALL_DATA_ODDS_OUTCOMES,
+)
+
+ODDS_TIMINGS = ["opening", "closing"]
+ODDS_MARGIN_METHODS = ["basic", "shin", "power"]
+ODDS_SOLVER_ITERATIONS = 100
+ODDS_SOLVER_TOLERANCE = 1e-12
+
+
+def get_odds_columns(market, timing="opening", bookmakers=None):
+    """Function used to get the football-data column of every bookmaker and outcome of a market
+
+    Returns:
+        odds_columns (List): bookmakers x outcomes nested list of lower case column names
+        bookmakers (List): bookmakers of the rows of odds_columns
+    """
+    if market not in FOOTBALL_DATA_ODDS_OUTCOMES:
+        raise Exception(f"Unknown market {market}, use one of {list(FOOTBALL_DATA_ODDS_OUTCOMES)}.")
+    if timing not in ODDS_TIMINGS:
+        raise Exception(f"Unknown timing {timing}, use opening or closing.")
+
+    market_bookmakers = FOOTBALL_DATA_ODDS_BOOKMAKERS[market]
+    bookmakers = list(market_bookmakers) if bookmakers is None else list(bookmakers)
+    timing_code = "c" if timing == "closing" else ""
+    odds_columns = [
+        [f"{market_bookmakers[bookmaker]}{timing_code}{outcome}" for outcome in FOOTBALL_DATA_ODDS_OUTCOMES[market]]
+        for bookmaker in bookmakers
+    ]
+    return odds_columns, bookmakers
+
+
+def get_odds_array(football_data_df, market="1x2", timing="opening", bookmakers=None):
+    """Function used to get the odds of a market as a matches x bookmakers x outcomes array.
+
+    Args:
+        football_data_df (pandas.DataFrame): archive frame (read_football_data_archive) or a football-data csv with
+            lower case columns, columns it does not have are nan
+        market (str): 1x2, over_under_2_5 or asian_handicap
+        timing (str): opening or closing prices
+        bookmakers (List): e.g. ["b365", "ps", "max", "avg"], defaults to every bookmaker of the market
+
+    Returns:
+        odds_array (np.array): decimal odds, matches x bookmakers x outcomes
+        bookmakers (List): bookmakers of the second axis
+    """
+    odds_columns, bookmakers = get_odds_columns(market, timing, bookmakers)
+    flat_columns = [column for bookmaker_columns in odds_columns for column in bookmaker_columns]
+    odds_df = football_data_df.reindex(columns=flat_columns)
+
+    odds_array = odds_df.to_numpy(dtype=float, na_value=np.nan).reshape(len(odds_df), len(bookmakers), -1)
+    # zero or negative prices are placeholders in some files
+    odds_array[odds_array <= 1] = np.nan
+    return odds_array, bookmakers
+
+
+def get_implied_probabilities(odds_array):
+    """Function used to get the raw implied probability 1 / odds of every price"""
+    return 1 / odds_array
+
+
+def get_overround(odds_array):
+    """Function used to get the bookmaker margin of every match and bookmaker, the implied probabilities sum minus 1,
+    nan when any outcome has no price"""
+    return get_implied_probabilities(odds_array).sum(axis=-1) - 1
+
+
+def get_basic_probabilities(implied_probabilities):
+    """Function used to remove the margin by scaling the implied probabilities to sum to 1"""
+    return implied_probabilities / implied_probabilities.sum(axis=-1, keepdims=True)
+
+
+def get_power_probabilities(implied_probabilities, iterations=ODDS_SOLVER_ITERATIONS):
+    """Function used to remove the margin by raising the implied probabilities to the power k that makes them sum
+    to 1. k is found with Newton steps for every row at once, the sum of powers is convex in k so they converge in a
+    handful of steps.
+
+    Args:
+        implied_probabilities (np.array): rows x outcomes, every price present
+    """
+    log_probabilities = np.log(implied_probabilities)
+    powers = np.ones((len(implied_probabilities), 1))
+    for _ in range(iterations):
+        powered_probabilities = np.exp(powers * log_probabilities)
+        probabilities_errors = powered_probabilities.sum(axis=1, keepdims=True) - 1
+        if len(probabilities_errors) == 0 or np.abs(probabilities_errors).max() < ODDS_SOLVER_TOLERANCE:
+            break
+        powers = powers - probabilities_errors / (powered_probabilities * log_probabilities).sum(axis=1, keepdims=True)
+    return np.exp(powers * log_probabilities)
+
+
+def get_shin_probabilities(implied_probabilities, iterations=ODDS_SOLVER_ITERATIONS):
+    """Function used to remove the margin with the model of Shin (1993), in which the margin protects the bookmaker
+    against a share z of insider money.
+
+    The probabilities for a share z are (sqrt(z^2 + 4 (1 - z) implied^2 / implied_sum) - z) / (2 (1 - z)), z is found
+    with Newton steps for every row at once, kept inside a bisection bracket. Prices without a margin (best prices
+    across bookmakers can sum below 1) have no insider share, their probabilities are scaled like the basic method.
+
+    Args:
+        implied_probabilities (np.array): rows x outcomes, every price present
+    """
+    implied_sums = implied_probabilities.sum(axis=1, keepdims=True)
+    fair_probabilities = implied_probabilities / implied_sums
+
+    # the insider share is only solved for rows with a margin, the others would never converge
+    has_margin = implied_sums[:, 0] > 1
+    implied_sums = implied_sums[has_margin]
+    scaled_squares = implied_probabilities[has_margin] ** 2 / implied_sums
+
+    # the probabilities sum falls as the insider share grows, from sqrt(implied_sum) at 0 to 1 at the solution
+    lower_shares = np.zeros(implied_sums.shape)
+    upper_shares = np.full(implied_sums.shape, 0.5)
+    insider_shares = np.zeros(implied_sums.shape)
+    for _ in range(iterations):
+        roots = np.sqrt(insider_shares**2 + 4 * (1 - insider_shares) * scaled_squares)
+        probabilities_errors = ((roots - insider_shares) / (2 * (1 - insider_shares))).sum(axis=1, keepdims=True) - 1
+        if np.abs(probabilities_errors).max(initial=0) < ODDS_SOLVER_TOLERANCE:
+            break
+
+        lower_shares = np.where(probabilities_errors > 0, insider_shares, lower_shares)
+        upper_shares = np.where(probabilities_errors > 0, upper_shares, insider_shares)
+        probabilities_slopes = (
+            ((insider_shares - 2 * scaled_squares) / roots - 1) * (1 - insider_shares) + roots - insider_shares
+        ) / (2 * (1 - insider_shares) ** 2)
+        newton_shares = insider_shares - probabilities_errors / probabilities_slopes.sum(axis=1, keepdims=True)
+        is_inside = (newton_shares >= lower_shares) & (newton_shares <= upper_shares)
+        insider_shares = np.where(is_inside, newton_shares, (lower_shares + upper_shares) / 2)
+
+    roots = np.sqrt(insider_shares**2 + 4 * (1 - insider_shares) * scaled_squares)
+    fair_probabilities[has_margin] = (roots - insider_shares) / (2 * (1 - insider_shares))
+    return fair_probabilities
+
+
+def get_fair_probabilities(odds_array, method="basic"):
+    """Function used to get the outcome probabilities of every match and bookmaker with the margin removed
+
+    Args:
+        odds_array (np.array): decimal odds, matches x bookmakers x outcomes, see get_odds_array
+        method (str): basic, shin or power
+    """
+    if method not in ODDS_MARGIN_METHODS:
+        raise Exception(f"Unknown method {method}, use one of {ODDS_MARGIN_METHODS}.")
+    implied_probabilities = get_implied_probabilities(odds_array)
+    if method == "basic":
+        return get_basic_probabilities(implied_probabilities)
+
+    # the solvers only run on the match and bookmaker rows with every price, most bookmakers miss most seasons
+    row_probabilities = implied_probabilities.reshape(-1, odds_array.shape[-1])
+    is_complete = ~np.isnan(row_probabilities).any(axis=1)
+    fair_probabilities = np.full(row_probabilities.shape, np.nan)
+    if method == "shin":
+        fair_probabilities[is_complete] = get_shin_probabilities(row_probabilities[is_complete])
+    else:
+        fair_probabilities[is_complete] = get_power_probabilities(row_probabilities[is_complete])
+    return fair_probabilities.reshape(odds_array.shape)
+
+
+def get_line_movement(opening_odds_array, closing_odds_array, method="basic"):
+    """Function used to get the move of every price from opening to closing
+
+    Returns:
+        movement_dict (dict): matches x bookmakers x outcomes arrays of odds_change (closing / opening - 1),
+            log_odds_change (log of closing / opening) and probability_change (closing minus opening fair probability)
+    """
+    return {
+        "odds_change": closing_odds_array / opening_odds_array - 1,
+        "log_odds_change": np.log(closing_odds_array / opening_odds_array),
+        "probability_change": get_fair_probabilities(closing_odds_array, method)
+        - get_fair_probabilities(opening_odds_array, method),
+    }
+
+
+def get_odds_df(football_data_df, market="1x2", bookmakers=None, method="basic"):
+    """Function used to get the odds of a market in long layout, one row per match, bookmaker and outcome.
+
+    Args:
+        football_data_df (pandas.DataFrame): archive frame or football-data csv with lower case columns
+        market (str): 1x2, over_under_2_5 or asian_handicap
+        bookmakers (List): bookmakers to keep, defaults to every bookmaker of the market
+        method (str): margin removal method of the fair probabilities, basic, shin or power
+
+    Returns:
+        odds_df (pandas.DataFrame): match_index (football_data_df index), bookmaker and outcome categoricals, opening
+            and closing odds, overround, fair probabilities and line movement, cells without any price are left out.
+            Asian handicap rows also have the opening and closing home handicap.
+    """
+    timing_dict = {}
+    for timing in ODDS_TIMINGS:
+        odds_array, market_bookmakers = get_odds_array(football_data_df, market, timing, bookmakers)
+        timing_dict[timing] = {"odds": odds_array, "fair_probability": get_fair_probabilities(odds_array, method)}
+    movement_dict = get_line_movement(timing_dict["opening"]["odds"], timing_dict["closing"]["odds"], method)
+
+    # only match, bookmaker and outcome cells with an opening or closing price become rows
+    outcomes = FOOTBALL_DATA_ODDS_OUTCOMES[market]
+    has_price = ~(np.isnan(timing_dict["opening"]["odds"]) & np.isnan(timing_dict["closing"]["odds"]))
+    cell_positions = np.flatnonzero(has_price)
+    match_nos, bookmaker_nos, outcome_nos = np.unravel_index(cell_positions, has_price.shape)
+
+    odds_df = pd.DataFrame(
+        {
+            "match_index": football_data_df.index.to_numpy()[match_nos],
+            "bookmaker": pd.Categorical.from_codes(bookmaker_nos, market_bookmakers),
+            "outcome": pd.Categorical.from_codes(outcome_nos, outcomes),
+        }
+    )
+    for timing in ODDS_TIMINGS:
+        odds_df[f"{timing}_odds"] = timing_dict[timing]["odds"].ravel()[cell_positions]
+        odds_df[f"{timing}_overround"] = get_overround(timing_dict[timing]["odds"])[match_nos, bookmaker_nos]
+        odds_df[f"{timing}_fair_probability"] = timing_dict[timing]["fair_probability"].ravel()[cell_positions]
+    for value_name, value_array in movement_dict.items():
+        odds_df[value_name] = value_array.ravel()[cell_positions]
+
+    if market == "asian_handicap":
+        for timing, line_column in FOOTBALL_DATA_ASIAN_HANDICAP_LINE_COLUMNS.items():
+            line_values = football_data_df.reindex(columns=[line_column])[line_column].to_numpy(dtype=float)
+            odds_df[f"{timing}_handicap"] = line_values[match_nos]
+    return odds_df
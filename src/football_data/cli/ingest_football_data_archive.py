@@ -0,0 +1,40 @@
+"""CLI script used to ingest a directory tree of football-data csvs into the partitioned archive dataset.
+
+Example:
+    python -m src.football_data.cli.ingest_football_data_archive data/football_data_archive --max-workers 4
+"""
+
+import typer
+
+from src.football_data.config.football_data_config import (
+    FOOTBALL_DATA_ARCHIVE_DIR,
+    FOOTBALL_DATA_MAX_WORKERS,
+)
+from src.football_data.etl.archive import ingest_football_data_archive
+
+app = typer.Typer()
+
+
+@app.command()
+def main(
+    source_dir: str,
+    archive_dir: str = typer.Option(FOOTBALL_DATA_ARCHIVE_DIR),
+    max_workers: int = typer.Option(FOOTBALL_DATA_MAX_WORKERS),
+):
+    """
+    CLI script used to ingest every csv below source_dir, csvs already ingested are skipped.
+    """
+    ingest_summary = ingest_football_data_archive(source_dir, archive_dir, max_workers)
+
+    print(
+        f"Ingested {ingest_summary['files'] - ingest_summary['skipped'] - len(ingest_summary['failed'])} files "
+        f"({ingest_summary['skipped']} skipped, {len(ingest_summary['failed'])} failed), "
+        f"{ingest_summary['rows']} rows in {ingest_summary['seconds']:.1f}s: "
+        f"{ingest_summary['rows_per_second']:.0f} rows/s, {ingest_summary['mb_per_second']:.1f} MB/s."
+    )
+    for csv_path, error in ingest_summary["failed"].items():
+        print(f"Failed {csv_path}: {error}")
+
+
+if __name__ == """__main__""":
+    app()
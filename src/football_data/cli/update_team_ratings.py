@@ -0,0 +1,52 @@
+"""CLI script used to apply new football-data archive results to the stored team ratings.
+
+Example:
+    python -m src.football_data.cli.update_team_ratings --league-codes E0 --league-codes E1
+"""
+
+from typing import List
+
+import typer
+
+from src.football_data.config.football_data_config import FOOTBALL_DATA_ARCHIVE_DIR
+from src.football_data.etl.archive import read_football_data_archive
+from src.utility.football.ratings import (
+    TEAM_RATINGS_DIR,
+    read_team_ratings,
+    update_team_ratings,
+    write_team_ratings,
+)
+from src.utility.football.results import get_football_data_results
+
+app = typer.Typer()
+
+
+@app.command()
+def main(
+    league_codes: List[str] = typer.Option(None),
+    archive_dir: str = typer.Option(FOOTBALL_DATA_ARCHIVE_DIR),
+    ratings_dir: str = typer.Option(TEAM_RATINGS_DIR),
+    rebuild: bool = typer.Option(False),
+    top: int = typer.Option(10),
+):
+    """
+    CLI script used to rate teams with Elo, goal-based Elo and pi-ratings, only results played after the stored
+    ratings are applied unless --rebuild is passed.
+    """
+    football_data_df = read_football_data_archive(
+        league_codes or None,
+        columns=["league_code", "season_name", "date", "kickoff", "hometeam", "awayteam", "fthg", "ftag"],
+        archive_dir=archive_dir,
+    )
+    results_df = get_football_data_results(football_data_df)
+
+    team_ratings_df = None if rebuild else read_team_ratings(ratings_dir)
+    team_ratings_df, match_ratings_df = update_team_ratings(team_ratings_df, results_df)
+    write_team_ratings(team_ratings_df, ratings_dir)
+
+    print(f"Applied {len(match_ratings_df)} results, {len(team_ratings_df)} teams rated.")
+    print(team_ratings_df.sort_values("elo", ascending=False).head(top).to_string(index=False))
+
+
+if __name__ == """__main__""":
+    app()
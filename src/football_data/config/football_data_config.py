@@ -1,5 +1,7 @@
 """Config file for data from www.football-data.co.uk"""
 
+import os
+
 MAIN_FOOTBALL_DATA_COLUMNS = [
     "league_code",
     "season_name",
@@ -33,3 +35,158 @@ ADDITIONAL_FOOTBALL_DATA_COLUMNS = [
     "hr",
     "ar",
 ]
+
+# dtypes of the raw csv columns read by the fast ingestion path, lower case names
+FOOTBALL_DATA_COLUMN_DTYPES = {
+    "div": "category",
+    "date": "object",
+    "time": "object",
+    "hometeam": "category",
+    "awayteam": "category",
+    "fthg": "int64",
+    "ftag": "int64",
+    "ftr": "category",
+    "hthg": "int64",
+    "htag": "int64",
+    "htr": "object",
+    "b365h": "float64",
+    "b365d": "float64",
+    "b365a": "float64",
+    "hs": "int64",
+    "as": "int64",
+    "hst": "int64",
+    "ast": "int64",
+    "hf": "int64",
+    "af": "int64",
+    "hc": "int64",
+    "ac": "int64",
+    "hy": "int64",
+    "ay": "int64",
+    "hr": "int64",
+    "ar": "int64",
+}
+
+FOOTBALL_DATA_DATE_FORMAT = "%d/%m/%Y"
+FOOTBALL_DATA_KICKOFF_FORMAT = "%d/%m/%Y %H:%M"
+
+FOOTBALL_DATA_DIR = "data"
+FOOTBALL_DATA_MAX_WORKERS = 4
+
+# cleaned seasons cached as parquet, keyed by csv hash, bump the version when cleaning changes
+FOOTBALL_DATA_CACHE_DIR = os.environ.get(
+    "FOOTBALL_DATA_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "football_sandbox", "football_data")
+)
+FOOTBALL_DATA_CACHE_VERSION = 1
+
+# full football-data archive, every league and season unioned into one parquet dataset
+FOOTBALL_DATA_ARCHIVE_DIR = os.environ.get(
+    "FOOTBALL_DATA_ARCHIVE_DIR",
+    os.path.join(os.path.expanduser("~"), ".local", "share", "football_sandbox", "football_data_archive"),
+)
+
+# bookmaker odds columns, opening prices are {prefix}{outcome} and closing prices {prefix}c{outcome}
+FOOTBALL_DATA_ODDS_OUTCOMES = {
+    "1x2": ["h", "d", "a"],
+    "over_under_2_5": [">2.5", "<2.5"],
+    "asian_handicap": ["ahh", "aha"],
+}
+# bookmaker -> column prefix of each market, max and avg are the best and average prices across bookmakers
+FOOTBALL_DATA_ODDS_BOOKMAKERS = {
+    "1x2": {
+        bookmaker: bookmaker
+        for bookmaker in [
+            "b365",
+            "bf",
+            "bfd",
+            "bmgm",
+            "bs",
+            "bv",
+            "bw",
+            "cl",
+            "gb",
+            "iw",
+            "lb",
+            "ps",
+            "sb",
+            "sj",
+            "so",
+            "sy",
+            "vc",
+            "wh",
+            "1xb",
+            "bfe",
+            "max",
+            "avg",
+        ]
+    },
+    "over_under_2_5": {"b365": "b365", "ps": "p", "bfe": "bfe", "max": "max", "avg": "avg"},
+    "asian_handicap": {"b365": "b365", "ps": "p", "bfe": "bfe", "max": "max", "avg": "avg"},
+}
+FOOTBALL_DATA_ODDS_COLUMNS = [
+    f"{prefix}{timing}{outcome}"
+    for market, outcomes in FOOTBALL_DATA_ODDS_OUTCOMES.items()
+    for prefix in FOOTBALL_DATA_ODDS_BOOKMAKERS[market].values()
+    for timing in ["", "c"]
+    for outcome in outcomes
+]
+# home handicap of the asian handicap prices, opening and closing
+FOOTBALL_DATA_ASIAN_HANDICAP_LINE_COLUMNS = {"opening": "ahh", "closing": "ahch"}
+
+# bump when the archive columns or partitions change, csvs are then ingested again and replace every older part of
+# the same csv
+FOOTBALL_DATA_ARCHIVE_VERSION = 3
+
+# names used by other eras and by the extra leagues files, mapped to the main league names
+FOOTBALL_DATA_COLUMN_ALIASES = {
+    "home": "hometeam",
+    "away": "awayteam",
+    "hg": "fthg",
+    "ag": "ftag",
+    "res": "ftr",
+    "bbavh": "avgh",
+    "bbavd": "avgd",
+    "bbava": "avga",
+    "bbmxh": "maxh",
+    "bbmxd": "maxd",
+    "bbmxa": "maxa",
+    "bbmx>2.5": "max>2.5",
+    "bbmx<2.5": "max<2.5",
+    "bbav>2.5": "avg>2.5",
+    "bbav<2.5": "avg<2.5",
+    "bbahh": "ahh",
+    "bbmxahh": "maxahh",
+    "bbmxaha": "maxaha",
+    "bbavahh": "avgahh",
+    "bbavaha": "avgaha",
+}
+
+# arrow types of the archive dataset, partitioned by league_code and season_name, columns missing from a file are null
+FOOTBALL_DATA_ARCHIVE_COLUMN_TYPES = {
+    "country": "string",
+    "league": "string",
+    "date": "date32",
+    "time": "string",
+    "kickoff": "timestamp",
+    "hometeam": "string",
+    "awayteam": "string",
+    "fthg": "int16",
+    "ftag": "int16",
+    "ftr": "string",
+    "hthg": "int16",
+    "htag": "int16",
+    "htr": "string",
+    "hs": "int16",
+    "as": "int16",
+    "hst": "int16",
+    "ast": "int16",
+    "hf": "int16",
+    "af": "int16",
+    "hc": "int16",
+    "ac": "int16",
+    "hy": "int16",
+    "ay": "int16",
+    "hr": "int16",
+    "ar": "int16",
+    **{column: "float64" for column in FOOTBALL_DATA_ODDS_COLUMNS},
+    **{column: "float64" for column in FOOTBALL_DATA_ASIAN_HANDICAP_LINE_COLUMNS.values()},
+}
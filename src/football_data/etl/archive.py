@@ -0,0 +1,316 @@
+""" Script used to ingest the full football-data archive, every league and season, into one parquet dataset. """
+
+import csv
+import glob
+import hashlib
+import io
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.football_data.config.football_data_config import (
+    FOOTBALL_DATA_ARCHIVE_COLUMN_TYPES,
+    FOOTBALL_DATA_ARCHIVE_DIR,
+    FOOTBALL_DATA_ARCHIVE_VERSION,
+    FOOTBALL_DATA_COLUMN_ALIASES,
+    FOOTBALL_DATA_MAX_WORKERS,
+)
+
+ARCHIVE_ARROW_TYPES = {
+    "string": pa.string(),
+    "date32": pa.date32(),
+    "timestamp": pa.timestamp("ns"),
+    "int16": pa.int16(),
+    "float64": pa.float64(),
+}
+ARCHIVE_SCHEMA = pa.schema(
+    [(column, ARCHIVE_ARROW_TYPES[column_type]) for column, column_type in FOOTBALL_DATA_ARCHIVE_COLUMN_TYPES.items()]
+)
+ARCHIVE_PARTITION_SCHEMA = pa.schema([("league_code", pa.string()), ("season_name", pa.string())])
+ARCHIVE_PARTITIONING = ds.partitioning(ARCHIVE_PARTITION_SCHEMA, flavor="hive")
+# parts written before a column was added are read with it as null
+ARCHIVE_DATASET_SCHEMA = pa.unify_schemas([ARCHIVE_SCHEMA, ARCHIVE_PARTITION_SCHEMA])
+# part-{source_key}-{csv_hash}-v{archive version}, parts written before the source key have no source_key
+ARCHIVE_PART_NAME_PATTERN = re.compile(r"part-(?:(?P<source_key>[0-9a-f]{16})-)?[0-9a-f]{16}(?:-v\d+)?")
+
+
+def discover_football_data_csvs(source_dir):
+    """Function used to find every csv file below source_dir"""
+    return sorted(
+        os.path.join(dir_path, file_name)
+        for dir_path, _, file_names in os.walk(source_dir)
+        for file_name in file_names
+        if file_name.lower().endswith(".csv")
+    )
+
+
+def get_csv_encoding(csv_bytes):
+    """Function used to pick the encoding of a football-data csv, older files are latin-1"""
+    try:
+        csv_bytes.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def get_archive_column_names(raw_columns):
+    """Function used to map the raw csv columns we keep to archive column names, the first of any alias wins"""
+    column_names = {}
+    for raw_column in raw_columns:
+        column_name = raw_column.strip().lower()
+        column_name = FOOTBALL_DATA_COLUMN_ALIASES.get(column_name, column_name)
+
+        is_archive_column = column_name in FOOTBALL_DATA_ARCHIVE_COLUMN_TYPES or column_name in ["div", "season"]
+        if is_archive_column and column_name not in column_names.values():
+            column_names[raw_column] = column_name
+    return column_names
+
+
+def read_csv_columns(csv_bytes, encoding, column_names):
+    """Function used to parse the columns we keep with explicit types using the arrow csv reader.
+
+    Files with stray text in numeric columns or ragged rows are parsed again with pandas as text and coerced.
+    """
+    column_types = {
+        raw_column: ARCHIVE_ARROW_TYPES[FOOTBALL_DATA_ARCHIVE_COLUMN_TYPES[column_name]]
+        for raw_column, column_name in column_names.items()
+        if FOOTBALL_DATA_ARCHIVE_COLUMN_TYPES.get(column_name) in ["int16", "float64"]
+    }
+    try:
+        csv_table = pa_csv.read_csv(
+            io.BytesIO(csv_bytes),
+            read_options=pa_csv.ReadOptions(encoding=encoding),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=list(column_names),
+                column_types={
+                    **{raw_column: pa.string() for raw_column in column_names},
+                    **column_types,
+                },
+                strings_can_be_null=True,
+            ),
+        )
+        return csv_table.to_pandas(types_mapper={pa.int16(): pd.Int16Dtype()}.get)
+    except pa.ArrowInvalid:
+        csv_df = pd.read_csv(io.BytesIO(csv_bytes), usecols=list(column_names), dtype=str, encoding=encoding)
+        for raw_column, column_type in column_types.items():
+            numeric_values = pd.to_numeric(csv_df[raw_column], errors="coerce")
+            csv_df[raw_column] = numeric_values.round().astype("Int16") if column_type == pa.int16() else numeric_values
+        return csv_df
+
+
+def read_football_data_archive_csv(csv_path, csv_bytes=None):
+    """Function used to read one archive csv of any era into the archive columns and types.
+
+    Columns are matched case insensitively and through FOOTBALL_DATA_COLUMN_ALIASES, columns a file does not have are
+    left null. Day first dates with two or four digit years are both parsed.
+
+    Returns:
+        archive_df (pandas.DataFrame): league_code, season_name and the archive columns
+    """
+    if csv_bytes is None:
+        with open(csv_path, "rb") as csv_file:
+            csv_bytes = csv_file.read()
+
+    encoding = get_csv_encoding(csv_bytes)
+    header_line = csv_bytes.split(b"\n", 1)[0].decode(encoding).lstrip("\ufeff")
+    column_names = get_archive_column_names(next(csv.reader([header_line])))
+
+    archive_df = read_csv_columns(csv_bytes, encoding, column_names).rename(columns=column_names)
+    archive_df = archive_df.dropna(subset=[column for column in ["date", "hometeam"] if column in archive_df.columns])
+
+    # dates
+    match_dates = pd.to_datetime(archive_df["date"], format="%d/%m/%Y", errors="coerce")
+    match_dates = match_dates.fillna(pd.to_datetime(archive_df["date"], format="%d/%m/%y", errors="coerce"))
+    archive_df["date"] = match_dates
+
+    if "time" in archive_df.columns:
+        kickoff_times = pd.to_timedelta(archive_df["time"].str.strip() + ":00", errors="coerce")
+        archive_df["kickoff"] = (match_dates + kickoff_times).fillna(match_dates)
+    else:
+        archive_df["kickoff"] = match_dates
+
+    # partition columns, extra leagues files have a season column and no div
+    if "season" in archive_df.columns:
+        archive_df["season_name"] = archive_df["season"].astype(str).str.replace("/", "_", regex=False)
+    else:
+        # one season per main league file, from its first match, so a season finished in July stays whole
+        first_match_date = match_dates.min()
+        if pd.notna(first_match_date):
+            season_start_year = first_match_date.year - int(first_match_date.month < 7)
+            archive_df["season_name"] = f"{season_start_year}_{season_start_year + 1}"
+        else:
+            archive_df["season_name"] = None
+
+    if "div" in archive_df.columns:
+        archive_df["league_code"] = archive_df["div"]
+    else:
+        archive_df["league_code"] = os.path.splitext(os.path.basename(csv_path))[0].upper()
+
+    archive_df = archive_df.dropna(subset=["date"])
+    return archive_df.reindex(columns=["league_code", "season_name"] + list(FOOTBALL_DATA_ARCHIVE_COLUMN_TYPES))
+
+
+def get_source_key(csv_path, source_dir=None):
+    """Function used to key a csv on its path relative to source_dir, so every version of the file gets the same key"""
+    source_dir = os.path.dirname(csv_path) if source_dir is None else source_dir
+    relative_path = os.path.relpath(csv_path, source_dir).replace(os.sep, "/")
+    return hashlib.sha256(relative_path.encode("utf-8")).hexdigest()[:16]
+
+
+def get_ingested_parts(archive_dir):
+    """Function used to list the part files already in the archive by the source csv they were written from
+
+    Returns:
+        ingested_parts (dict): source key -> part paths, parts written before names had a source key are under None
+    """
+    ingested_parts = {}
+    for part_path in glob.glob(os.path.join(archive_dir, "league_code=*", "season_name=*", "part-*.parquet")):
+        part_match = ARCHIVE_PART_NAME_PATTERN.fullmatch(os.path.splitext(os.path.basename(part_path))[0])
+        if part_match is not None:
+            ingested_parts.setdefault(part_match.group("source_key"), []).append(part_path)
+    return ingested_parts
+
+
+def remove_part_files(part_paths, kept_part_paths=frozenset()):
+    """Function used to remove part files, except the ones in kept_part_paths"""
+    for part_path in part_paths:
+        if part_path not in kept_part_paths and os.path.exists(part_path):
+            os.remove(part_path)
+
+
+def ingest_football_data_csv(csv_path, archive_dir=FOOTBALL_DATA_ARCHIVE_DIR, source_dir=None, earlier_part_paths=()):
+    """Function used to write one csv to the archive, run inside the process pool.
+
+    Parts are named after the path of the csv relative to source_dir, its content hash and the archive version. Once
+    the new parts are written, every earlier part of the same csv is removed, whatever its content or version, so a
+    csv that gained rows replaces its old rows instead of adding to them.
+
+    Args:
+        csv_path (str): path of the csv
+        archive_dir (str): output dataset
+        source_dir (str): directory the csv was discovered in, defaults to the directory of the csv
+        earlier_part_paths (List): parts already in the archive for this csv, see get_ingested_parts
+
+    Returns:
+        ingest_stats (dict): rows and bytes read, skipped is True when the csv was already ingested
+    """
+    with open(csv_path, "rb") as csv_file:
+        csv_bytes = csv_file.read()
+
+    csv_hash = hashlib.sha256(csv_bytes).hexdigest()[:16]
+    part_name = f"part-{get_source_key(csv_path, source_dir)}-{csv_hash}-v{FOOTBALL_DATA_ARCHIVE_VERSION}"
+    current_part_paths = {
+        part_path for part_path in earlier_part_paths if os.path.basename(part_path) == f"{part_name}.parquet"
+    }
+    if current_part_paths:
+        # a run stopped between writing and removing can leave earlier parts next to the current ones
+        remove_part_files(earlier_part_paths, current_part_paths)
+        return {"rows": 0, "bytes": len(csv_bytes), "skipped": True}
+
+    archive_df = read_football_data_archive_csv(csv_path, csv_bytes)
+
+    written_part_paths = set()
+    for (league_code, season_name), part_df in archive_df.groupby(["league_code", "season_name"], sort=False):
+        part_dir = os.path.join(archive_dir, f"league_code={league_code}", f"season_name={season_name}")
+        os.makedirs(part_dir, exist_ok=True)
+        part_path = os.path.join(part_dir, f"{part_name}.parquet")
+
+        part_table = pa.Table.from_pandas(
+            part_df.drop(columns=["league_code", "season_name"]), schema=ARCHIVE_SCHEMA, preserve_index=False
+        )
+        temp_path = f"{part_path}.{uuid.uuid4().hex[:8]}.tmp"
+        pq.write_table(part_table, temp_path)
+        os.replace(temp_path, part_path)
+        written_part_paths.add(part_path)
+
+    remove_part_files(earlier_part_paths, written_part_paths)
+    return {"rows": len(archive_df), "bytes": len(csv_bytes), "skipped": False}
+
+
+def ingest_football_data_archive(
+    source_dir, archive_dir=FOOTBALL_DATA_ARCHIVE_DIR, max_workers=FOOTBALL_DATA_MAX_WORKERS
+):
+    """Function used to ingest every football-data csv below source_dir into the partitioned archive dataset.
+
+    Each worker process reads and writes one csv at a time, so memory stays bounded by max_workers files. Csvs already
+    ingested (same path and content hash) are skipped and changed csvs replace their earlier parts, so the archive can
+    be refreshed by re-running on the same tree. Parts written before part names had a source key cannot be traced
+    to their csv, they are removed once every csv has been ingested again without failures.
+
+    Args:
+        source_dir (str): directory tree of football-data csvs, any league and era
+        archive_dir (str): output dataset, partitioned by league_code and season_name
+        max_workers (int): number of worker processes
+
+    Returns:
+        ingest_summary (dict): files, skipped, failed, rows, bytes, seconds, rows_per_second and mb_per_second
+    """
+    start_time = time.perf_counter()
+    csv_paths = discover_football_data_csvs(source_dir)
+    ingested_parts = get_ingested_parts(archive_dir)
+
+    ingest_summary = {"files": len(csv_paths), "skipped": 0, "failed": {}, "rows": 0, "bytes": 0}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        future_dict = {
+            executor.submit(
+                ingest_football_data_csv,
+                csv_path,
+                archive_dir,
+                source_dir,
+                ingested_parts.get(get_source_key(csv_path, source_dir), []),
+            ): csv_path
+            for csv_path in csv_paths
+        }
+        for future in as_completed(future_dict):
+            try:
+                ingest_stats = future.result()
+            except Exception as error:
+                ingest_summary["failed"][future_dict[future]] = repr(error)
+                continue
+            ingest_summary["skipped"] += ingest_stats["skipped"]
+            ingest_summary["rows"] += ingest_stats["rows"]
+            ingest_summary["bytes"] += ingest_stats["bytes"]
+
+    if not ingest_summary["failed"]:
+        remove_part_files(ingested_parts.get(None, []))
+
+    ingest_summary["seconds"] = time.perf_counter() - start_time
+    ingest_summary["rows_per_second"] = ingest_summary["rows"] / ingest_summary["seconds"]
+    ingest_summary["mb_per_second"] = ingest_summary["bytes"] / 1024**2 / ingest_summary["seconds"]
+    return ingest_summary
+
+
+def read_football_data_archive(
+    league_codes=None, season_names=None, columns=None, filters=None, archive_dir=FOOTBALL_DATA_ARCHIVE_DIR
+):
+    """Function used to read matches from the archive, only opening the requested leagues and seasons
+
+    Args:
+        league_codes (List): e.g. ["E0", "SP1"], None for all
+        season_names (List): e.g. ["2021_2022"], None for all
+        columns (List): columns to read, None for all
+        filters (List): (column, op, value) tuples pushed down to the parquet files
+    """
+    table_dataset = ds.dataset(
+        archive_dir, schema=ARCHIVE_DATASET_SCHEMA, format="parquet", partitioning=ARCHIVE_PARTITIONING
+    )
+
+    filter_expression = None if filters is None else pq.filters_to_expression(filters)
+    for partition_column, partition_values in [("league_code", league_codes), ("season_name", season_names)]:
+        if partition_values is not None:
+            partition_expression = ds.field(partition_column).isin(list(partition_values))
+            filter_expression = (
+                partition_expression if filter_expression is None else filter_expression & partition_expression
+            )
+
+    archive_table = table_dataset.to_table(columns=columns, filter=filter_expression)
+    return archive_table.to_pandas(types_mapper={pa.int16(): pd.Int16Dtype()}.get)
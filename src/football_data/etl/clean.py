@@ -4,21 +4,42 @@ import pandas as pd
 
 from src.football_data.config.football_data_config import (
     ADDITIONAL_FOOTBALL_DATA_COLUMNS,
+    FOOTBALL_DATA_ASIAN_HANDICAP_LINE_COLUMNS,
+    FOOTBALL_DATA_DATE_FORMAT,
+    FOOTBALL_DATA_KICKOFF_FORMAT,
+    FOOTBALL_DATA_ODDS_COLUMNS,
     MAIN_FOOTBALL_DATA_COLUMNS,
 )
 
 
-def clean_football_data(football_data_df, season_name, include_additional_columns=False):
+def get_kickoff(football_data_df):
+    """Function used to parse kickoff datetimes with the fixed football-data day first format.
+
+    Seasons before 2019/2020 have no time column, their kickoff is the match date.
+    """
+    if "time" in football_data_df.columns:
+        return pd.to_datetime(football_data_df.date + " " + football_data_df.time, format=FOOTBALL_DATA_KICKOFF_FORMAT)
+    return pd.to_datetime(football_data_df.date, format=FOOTBALL_DATA_DATE_FORMAT)
+
+
+def clean_football_data(football_data_df, season_name, include_additional_columns=False, include_odds_columns=False):
     """Function used to clean football data grabbed from football-data
 
     Args:
         football_data_df (pandas.DataFrame): dataframe of football results from football-data
         season_name (str): season in question
+        include_additional_columns (bool): also keep shots, fouls, corners and cards columns
+        include_odds_columns (bool): also keep every bookmaker odds column the csv has, see football_data.analysis.odds
 
     Returns:
         cleaned_football_data_df (pandas.DataFrame): cleaned dataframe of football results
     """
     football_data_df.columns = [col_name.lower() for col_name in football_data_df.columns]
+    kickoff = get_kickoff(football_data_df)
+
+    # missing before 2019/2020, kept so every season has the same columns
+    if "time" not in football_data_df.columns:
+        football_data_df = football_data_df.assign(time=None)
 
     cleaned_football_data_df = (
         football_data_df.rename(
@@ -27,7 +48,7 @@ def clean_football_data(football_data_df, season_name, include_additional_column
             }
         )
         .assign(
-            kickoff=pd.to_datetime(football_data_df.date + " " + football_data_df.time),
+            kickoff=kickoff,
             season_name=season_name,
         )
         .astype(
@@ -46,5 +67,13 @@ def clean_football_data(football_data_df, season_name, include_additional_column
     else:
         columns_of_interest = MAIN_FOOTBALL_DATA_COLUMNS
 
+    if include_odds_columns:
+        odds_columns = FOOTBALL_DATA_ODDS_COLUMNS + list(FOOTBALL_DATA_ASIAN_HANDICAP_LINE_COLUMNS.values())
+        columns_of_interest = columns_of_interest + [
+            column
+            for column in odds_columns
+            if column in cleaned_football_data_df.columns and column not in columns_of_interest
+        ]
+
     cleaned_football_data_df = cleaned_football_data_df[columns_of_interest]
     return cleaned_football_data_df
@@ -1,28 +1,152 @@
 """ Script used to help fetch data from football-data. """
 
+import hashlib
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 
+from src.football_data.config.football_data_config import (
+    ADDITIONAL_FOOTBALL_DATA_COLUMNS,
+    FOOTBALL_DATA_ASIAN_HANDICAP_LINE_COLUMNS,
+    FOOTBALL_DATA_CACHE_DIR,
+    FOOTBALL_DATA_CACHE_VERSION,
+    FOOTBALL_DATA_COLUMN_DTYPES,
+    FOOTBALL_DATA_DIR,
+    FOOTBALL_DATA_MAX_WORKERS,
+    FOOTBALL_DATA_ODDS_COLUMNS,
+)
 from src.football_data.etl.clean import clean_football_data
 
 
-def get_football_data_seasons(season_name_list):
+def get_file_sha256(file_path):
+    """Function used to hash the content of a file"""
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as data_file:
+        for file_chunk in iter(lambda: data_file.read(1024 * 1024), b""):
+            file_hash.update(file_chunk)
+    return file_hash.hexdigest()
+
+
+def get_football_data_cache_path(
+    csv_path, include_additional_columns, cache_dir=FOOTBALL_DATA_CACHE_DIR, include_odds_columns=False
+):
+    """Function used to get the parquet cache path of a cleaned csv, keyed by the csv content hash.
+
+    The hash is stored next to the cache with the csv mtime and size, so an unchanged csv is not hashed again.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    csv_stat = os.stat(csv_path)
+    csv_name = os.path.splitext(os.path.basename(csv_path))[0]
+    hash_path = os.path.join(cache_dir, f"{csv_name}.json")
+
+    csv_sha256 = None
+    if os.path.exists(hash_path):
+        with open(hash_path) as hash_file:
+            hash_dict = json.load(hash_file)
+        if hash_dict["mtime_ns"] == csv_stat.st_mtime_ns and hash_dict["size"] == csv_stat.st_size:
+            csv_sha256 = hash_dict["sha256"]
+
+    if csv_sha256 is None:
+        csv_sha256 = get_file_sha256(csv_path)
+        with open(hash_path, "w") as hash_file:
+            json.dump({"mtime_ns": csv_stat.st_mtime_ns, "size": csv_stat.st_size, "sha256": csv_sha256}, hash_file)
+
+    column_set = "all" if include_additional_columns else "main"
+    if include_odds_columns:
+        column_set += "_odds"
+    return os.path.join(cache_dir, f"{csv_name}_{csv_sha256[:16]}_{column_set}_v{FOOTBALL_DATA_CACHE_VERSION}.parquet")
+
+
+def read_football_data_csv(csv_path, season_name, include_additional_columns=True, include_odds_columns=False):
+    """Function used to read and clean a football-data csv, parsing only the columns we keep with fixed dtypes"""
+    # csv column names differ in case only, map them to the configured lower case names
+    raw_column_dict = {raw_column.lower(): raw_column for raw_column in pd.read_csv(csv_path, nrows=0).columns}
+
+    column_dtypes = {
+        raw_column_dict[column]: dtype
+        for column, dtype in FOOTBALL_DATA_COLUMN_DTYPES.items()
+        if column in raw_column_dict and (include_additional_columns or column not in ADDITIONAL_FOOTBALL_DATA_COLUMNS)
+    }
+    if include_odds_columns:
+        odds_columns = FOOTBALL_DATA_ODDS_COLUMNS + list(FOOTBALL_DATA_ASIAN_HANDICAP_LINE_COLUMNS.values())
+        column_dtypes.update(
+            {raw_column_dict[column]: "float64" for column in odds_columns if column in raw_column_dict}
+        )
+
+    football_data_df = pd.read_csv(csv_path, usecols=list(column_dtypes), dtype=column_dtypes)
+    cleaned_football_data_df = clean_football_data(
+        football_data_df=football_data_df,
+        season_name=season_name,
+        include_additional_columns=include_additional_columns,
+        include_odds_columns=include_odds_columns,
+    )
+    return cleaned_football_data_df
+
+
+def get_football_data_season(
+    season_name,
+    include_additional_columns=True,
+    data_dir=FOOTBALL_DATA_DIR,
+    use_cache=True,
+    cache_dir=FOOTBALL_DATA_CACHE_DIR,
+    include_odds_columns=False,
+):
+    """Function used to grab a season of football-data results, from the parquet cache when the csv is unchanged"""
+    csv_path = os.path.join(data_dir, f"football_data_prem_{season_name}.csv")
+
+    if not use_cache:
+        return read_football_data_csv(csv_path, season_name, include_additional_columns, include_odds_columns)
+
+    cache_path = get_football_data_cache_path(csv_path, include_additional_columns, cache_dir, include_odds_columns)
+    if os.path.exists(cache_path):
+        return pd.read_parquet(cache_path)
+
+    cleaned_football_data_df = read_football_data_csv(
+        csv_path, season_name, include_additional_columns, include_odds_columns
+    )
+
+    temp_path = f"{cache_path}.{uuid.uuid4().hex[:8]}.tmp"
+    cleaned_football_data_df.to_parquet(temp_path, index=False)
+    os.replace(temp_path, cache_path)
+    return cleaned_football_data_df
+
+
+def get_football_data_seasons(
+    season_name_list,
+    include_additional_columns=True,
+    data_dir=FOOTBALL_DATA_DIR,
+    use_cache=True,
+    max_workers=FOOTBALL_DATA_MAX_WORKERS,
+    include_odds_columns=False,
+):
     """Function used to grab seasons worth of data
     Args:
         season_name_list (List): List of strings indicating season names, format "YYYY_YYYY"
+        include_additional_columns (bool): also keep shots, fouls, corners and cards columns
+        data_dir (str): directory of the football_data_prem_{season_name}.csv files
+        use_cache (bool): load cleaned seasons from the parquet cache when their csv is unchanged
+        max_workers (int): number of seasons read in parallel
+        include_odds_columns (bool): also keep every bookmaker odds column, see football_data.analysis.odds
 
     Returns:
         cleaned_seasons_football_data_df (pandas.DataFrame): dataframe of fixture results data
     """
-    cleaned_season_data_list = []
-
-    for season_name in season_name_list:
-        football_data_df = pd.read_csv(f"data/football_data_prem_{season_name}.csv")
-        cleaned_football_data_df = clean_football_data(
-            football_data_df=football_data_df,
-            season_name=season_name,
-            include_additional_columns=True,
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        cleaned_season_data_list = list(
+            executor.map(
+                lambda season_name: get_football_data_season(
+                    season_name,
+                    include_additional_columns,
+                    data_dir=data_dir,
+                    use_cache=use_cache,
+                    include_odds_columns=include_odds_columns,
+                ),
+                season_name_list,
+            )
         )
-        cleaned_season_data_list.append(cleaned_football_data_df)
 
     cleaned_seasons_football_data_df = pd.concat(cleaned_season_data_list)
 
@@ -0,0 +1,115 @@
+"""CLI script used to time hypothesis test calls against the scipy calls they made before caching, and with the
+critical value cache cold and warm.
+
+Example:
+    python -m src.utility.cli.benchmark_hypothesis_testing --no-calls 20000
+"""
+
+import time
+
+import numpy as np
+import typer
+from scipy.stats import f, norm, t
+
+from src.utility.maths.hypothesis_testing import (
+    batch_one_sample_t_test,
+    f_test_variance,
+    get_critical_value,
+    get_distribution,
+    one_sample_t_test,
+    two_sample_proportion_test,
+    two_sample_t_test,
+)
+
+app = typer.Typer()
+
+
+def clear_hypothesis_caches():
+    """Function used to empty the distribution and critical value caches"""
+    get_critical_value.cache_clear()
+    get_distribution.cache_clear()
+
+
+def baseline_distribution_calls(distribution, percentile, test_statistic_value=None, no_ppf_calls=1):
+    """Function used to repeat the scipy work every test did per call before caching: freeze the distribution, ppf for
+    the critical value and cdf for the p-value. The test statistic arithmetic is left out, it is well under 1us."""
+    frozen_distribution = distribution()
+    for _ in range(no_ppf_calls):
+        frozen_distribution.ppf(percentile)
+    if test_statistic_value is not None:
+        1 - frozen_distribution.cdf(abs(test_statistic_value))
+
+
+def get_call_latency(test_function, no_calls, clear_caches):
+    """Function used to get the mean microseconds per call of test_function, a rolling window scan repeats the same
+    significance level and degrees of freedom on every call"""
+    start_time = time.perf_counter()
+    for _ in range(no_calls):
+        if clear_caches:
+            clear_hypothesis_caches()
+        test_function()
+    return (time.perf_counter() - start_time) / no_calls * 1e6
+
+
+@app.command()
+def main(
+    no_calls: int = typer.Option(10_000),
+    significance_level: float = typer.Option(0.05),
+):
+    """
+    CLI script used to print per call latency of each scalar test as it was before caching (baseline), with the caches
+    cleared before every call and with warm caches, then a scan of no_calls comparisons looping the scalar test
+    against one batch call.
+    """
+    two_sided_percentile = 1 - significance_level / 2
+    right_sided_percentile = 1 - significance_level
+    # test name -> (test call, the scipy calls the test made before caching with the same inputs and test statistic)
+    test_functions = {
+        "one_sample_t_test (normal)": (
+            lambda: one_sample_t_test(1.6, 38, 1.4, 0.8, significance_level, "two-sided"),
+            lambda: baseline_distribution_calls(lambda: norm(loc=0, scale=1), two_sided_percentile, 1.54),
+        ),
+        "one_sample_t_test (t)": (
+            lambda: one_sample_t_test(1.6, 12, 1.4, 0.8, significance_level, "two-sided"),
+            lambda: baseline_distribution_calls(lambda: t(df=11), two_sided_percentile, 0.87),
+        ),
+        "two_sample_t_test (t)": (
+            lambda: two_sample_t_test(1.6, 0.8, 19, 1.3, 0.9, 19, significance_level, "right-sided"),
+            lambda: baseline_distribution_calls(lambda: t(df=36), right_sided_percentile, 1.09),
+        ),
+        "two_sample_proportion_test": (
+            lambda: two_sample_proportion_test(38, 21, 38, 12, significance_level, "two-sided"),
+            lambda: baseline_distribution_calls(lambda: norm(loc=0, scale=1), two_sided_percentile, 2.08, 2),
+        ),
+        "f_test_variance": (
+            lambda: f_test_variance(0.9, 19, 0.6, 19, significance_level, "right-sided"),
+            lambda: baseline_distribution_calls(lambda: f(18, 18), right_sided_percentile),
+        ),
+    }
+
+    print(f"{'test':<30}{'baseline us/call':>18}{'cold us/call':>15}{'warm us/call':>15}")
+    for test_name, (test_function, baseline_function) in test_functions.items():
+        baseline_latency = get_call_latency(baseline_function, no_calls, clear_caches=False)
+        cold_latency = get_call_latency(test_function, no_calls, clear_caches=True)
+        clear_hypothesis_caches()
+        warm_latency = get_call_latency(test_function, no_calls, clear_caches=False)
+        print(f"{test_name:<30}{baseline_latency:>18.1f}{cold_latency:>15.1f}{warm_latency:>15.1f}")
+
+    rng = np.random.default_rng(0)
+    sample_means = rng.normal(1.4, 0.3, no_calls)
+    sample_sizes = rng.integers(5, 60, no_calls)
+
+    start_time = time.perf_counter()
+    for sample_mean, sample_size in zip(sample_means, sample_sizes):
+        one_sample_t_test(sample_mean, sample_size, 1.4, 0.8, significance_level, "two-sided")
+    loop_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    batch_one_sample_t_test(sample_means, sample_sizes, 1.4, 0.8, significance_level, "two-sided")
+    batch_seconds = time.perf_counter() - start_time
+
+    print(f"Scan of {no_calls} one sample tests: loop {loop_seconds:.3f}s, batch {batch_seconds:.4f}s.")
+
+
+if __name__ == """__main__""":
+    app()
@@ -0,0 +1,72 @@
+"""CLI script used to compare rows per second of to_sql inserts and COPY when persisting to db.
+
+Example:
+    python -m src.utility.cli.benchmark_persist_to_db --no-rows 200000 --schema-name fbref
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import typer
+from sqlalchemy.sql import text
+
+from src.utility.sql.fetch_and_persist import copy_to_db, get_db_engine, persist_to_db
+
+app = typer.Typer()
+
+
+def get_benchmark_df(no_rows, seed=0):
+    """Function used to create a dataframe shaped like per player match stats"""
+    rng = np.random.default_rng(seed)
+    benchmark_df = pd.DataFrame(
+        {
+            "player_id": rng.integers(0, 16**8, no_rows).astype(str),
+            "fixture_id": rng.integers(0, 16**8, no_rows).astype(str),
+            "team_id": rng.integers(0, 16**8, no_rows).astype(str),
+            "minutes": rng.integers(0, 91, no_rows),
+            "goals": rng.poisson(0.1, no_rows),
+            "xg": rng.gamma(0.3, 0.3, no_rows).round(2),
+            "passes_completed_perc": np.where(rng.random(no_rows) < 0.05, np.nan, rng.uniform(0, 100, no_rows)),
+        }
+    )
+    return benchmark_df
+
+
+@app.command()
+def main(
+    no_rows: int = typer.Option(100_000),
+    schema_name: str = typer.Option("public"),
+    table_name: str = typer.Option("persist_benchmark"),
+):
+    """
+    CLI script used to time to_sql and COPY on a scratch table, dropped at the end.
+    Uses the POSTGRES_* environment variables.
+    """
+    engine = get_db_engine()
+    benchmark_df = get_benchmark_df(no_rows)
+
+    persist_methods = {
+        "to_sql": lambda: persist_to_db(benchmark_df, table_name, schema_name, engine=engine),
+        "to_sql multi": lambda: benchmark_df.to_sql(
+            table_name, con=engine, schema=schema_name, if_exists="append", index=False, method="multi", chunksize=1000
+        ),
+        "copy": lambda: copy_to_db(benchmark_df, table_name, schema_name, engine=engine),
+    }
+
+    try:
+        for method_name, persist_method in persist_methods.items():
+            benchmark_df.head(0).to_sql(table_name, con=engine, schema=schema_name, if_exists="replace", index=False)
+
+            start_time = time.perf_counter()
+            persist_method()
+            run_time = time.perf_counter() - start_time
+
+            print(f"{method_name:>12}: {no_rows / run_time:12,.0f} rows/sec ({run_time:.2f} s for {no_rows:,} rows)")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f'DROP TABLE IF EXISTS "{schema_name}"."{table_name}"'))
+
+
+if __name__ == """__main__""":
+    app()
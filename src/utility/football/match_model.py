@@ -0,0 +1,342 @@
+"""Script used to fit goals models on results: independent Poisson and Dixon-Coles with time decay weighting.
+
+The home goals of a fixture are Poisson with log rate intercept + home_advantage + attack[home] - defence[away] and
+the away goals with log rate intercept + attack[away] - defence[home]. Dixon-Coles adds the rho correction of the
+0-0, 1-0, 0-1 and 1-1 scores. Matches are weighted by exp(-xi * days before the fit date). The log-likelihood and its
+gradient are computed for every fixture at once and optimised with L-BFGS-B, refits start from the previous fit.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.special import gammaln
+from scipy.stats import poisson
+
+from src.utility.football.results import get_played_results
+
+MATCH_MODEL_TYPES = ["poisson", "dixon_coles"]
+MATCH_MODEL_XI = 0.0019
+MATCH_MODEL_RHO_BOUNDS = (-0.2, 0.2)
+MATCH_MODEL_MAX_GOALS = 10
+MATCH_MODEL_MAX_ITERATIONS = 500
+MATCH_MODEL_DIR = os.environ.get(
+    "MATCH_MODEL_DIR",
+    os.path.join(os.path.expanduser("~"), ".local", "share", "football_sandbox", "match_model"),
+)
+
+
+def get_time_decay_weights(kickoffs, as_of, xi=MATCH_MODEL_XI):
+    """Function used to weight matches by exp(-xi * days between kickoff and as_of)"""
+    days_before = (pd.Timestamp(as_of) - pd.to_datetime(kickoffs)).dt.total_seconds().to_numpy() / 86400
+    return np.exp(-xi * np.maximum(days_before, 0))
+
+
+def get_dixon_coles_tau(home_goals, away_goals, home_rates, away_rates, rho):
+    """Function used to get the Dixon-Coles correction of each score, 1 outside 0-0, 1-0, 0-1 and 1-1.
+
+    Returns:
+        tau (np.array): correction factor of each score
+        tau_gradients (np.array): scores x 3 derivatives of log tau by the home log rate, away log rate and rho
+    """
+    is_nil_nil = (home_goals == 0) & (away_goals == 0)
+    is_nil_one = (home_goals == 0) & (away_goals == 1)
+    is_one_nil = (home_goals == 1) & (away_goals == 0)
+    is_one_one = (home_goals == 1) & (away_goals == 1)
+
+    tau = np.ones(len(home_goals))
+    tau[is_nil_nil] = 1 - home_rates[is_nil_nil] * away_rates[is_nil_nil] * rho
+    tau[is_nil_one] = 1 + home_rates[is_nil_one] * rho
+    tau[is_one_nil] = 1 + away_rates[is_one_nil] * rho
+    tau[is_one_one] = 1 - rho
+    # rho is bounded so tau stays positive for sensible rates, the floor only guards extreme early iterations
+    tau = np.maximum(tau, 1e-10)
+
+    tau_gradients = np.zeros((len(home_goals), 3))
+    rate_product = home_rates * away_rates
+    tau_gradients[is_nil_nil, 0] = -rate_product[is_nil_nil] * rho / tau[is_nil_nil]
+    tau_gradients[is_nil_nil, 1] = tau_gradients[is_nil_nil, 0]
+    tau_gradients[is_nil_nil, 2] = -rate_product[is_nil_nil] / tau[is_nil_nil]
+    tau_gradients[is_nil_one, 0] = home_rates[is_nil_one] * rho / tau[is_nil_one]
+    tau_gradients[is_nil_one, 2] = home_rates[is_nil_one] / tau[is_nil_one]
+    tau_gradients[is_one_nil, 1] = away_rates[is_one_nil] * rho / tau[is_one_nil]
+    tau_gradients[is_one_nil, 2] = away_rates[is_one_nil] / tau[is_one_nil]
+    tau_gradients[is_one_one, 2] = -1 / tau[is_one_one]
+    return tau, tau_gradients
+
+
+def get_negative_log_likelihood(params, home_codes, away_codes, home_goals, away_goals, weights, no_teams, model_type):
+    """Function used to get the weighted negative log-likelihood of every fixture and its gradient.
+
+    Attack and defence are centred on their means inside the model, so the gradient is centred too and the
+    optimiser never moves them away from a mean of 0 apart from rounding.
+
+    Args:
+        params (np.array): attack (no_teams), defence (no_teams), intercept, home_advantage and rho
+        home_codes (np.array): team number of the home team of each fixture
+        away_codes (np.array): team number of the away team of each fixture
+        home_goals (np.array): home goals of each fixture
+        away_goals (np.array): away goals of each fixture
+        weights (np.array): time decay weight of each fixture
+        no_teams (int): number of teams
+        model_type (str): poisson or dixon_coles, rho is left at its value for poisson
+
+    Returns:
+        negative_log_likelihood (float): constant log factorial terms are left out
+        gradient (np.array): derivative of negative_log_likelihood by each parameter
+    """
+    attack = params[:no_teams] - params[:no_teams].mean()
+    defence_end = 2 * no_teams
+    defence = params[no_teams:defence_end] - params[no_teams:defence_end].mean()
+    intercept, home_advantage, rho = params[defence_end:]
+
+    home_log_rates = intercept + home_advantage + attack[home_codes] - defence[away_codes]
+    away_log_rates = intercept + attack[away_codes] - defence[home_codes]
+    home_rates = np.exp(home_log_rates)
+    away_rates = np.exp(away_log_rates)
+
+    log_likelihoods = home_goals * home_log_rates - home_rates + away_goals * away_log_rates - away_rates
+    home_gradients = home_goals - home_rates
+    away_gradients = away_goals - away_rates
+    rho_gradient = 0.0
+    if model_type == "dixon_coles":
+        tau, tau_gradients = get_dixon_coles_tau(home_goals, away_goals, home_rates, away_rates, rho)
+        log_likelihoods = log_likelihoods + np.log(tau)
+        home_gradients = home_gradients + tau_gradients[:, 0]
+        away_gradients = away_gradients + tau_gradients[:, 1]
+        rho_gradient = weights @ tau_gradients[:, 2]
+
+    home_gradients = weights * home_gradients
+    away_gradients = weights * away_gradients
+    attack_gradient = np.bincount(home_codes, home_gradients, no_teams) + np.bincount(
+        away_codes, away_gradients, no_teams
+    )
+    defence_gradient = -np.bincount(away_codes, home_gradients, no_teams) - np.bincount(
+        home_codes, away_gradients, no_teams
+    )
+
+    gradient = np.concatenate(
+        [
+            attack_gradient - attack_gradient.mean(),
+            defence_gradient - defence_gradient.mean(),
+            [home_gradients.sum() + away_gradients.sum(), home_gradients.sum(), rho_gradient],
+        ]
+    )
+    return -(weights @ log_likelihoods), -gradient
+
+
+class MatchModel:
+    """Class used to fit a goals model on results and predict score and outcome probabilities.
+
+    Teams are rated across competitions by name. Competitions without fixtures between them are only linked by the
+    shared intercept and home advantage, so fitting one competition (or a set of linked divisions) at a time keeps
+    their team strengths comparable.
+    """
+
+    def __init__(
+        self, teams, attack, defence, intercept, home_advantage, rho, as_of, model_type="dixon_coles", xi=MATCH_MODEL_XI
+    ):
+        if model_type not in MATCH_MODEL_TYPES:
+            raise Exception(f"Unknown model_type {model_type}, use poisson or dixon_coles.")
+        self.teams = pd.Index(teams)
+        self.attack = np.asarray(attack, dtype=float)
+        self.defence = np.asarray(defence, dtype=float)
+        self.intercept = float(intercept)
+        self.home_advantage = float(home_advantage)
+        self.rho = float(rho)
+        self.as_of = pd.Timestamp(as_of)
+        self.model_type = model_type
+        self.xi = float(xi)
+        self.fit_summary = {}
+
+    @classmethod
+    def fit(
+        cls,
+        results_df,
+        as_of=None,
+        model_type="dixon_coles",
+        xi=MATCH_MODEL_XI,
+        initial_model=None,
+        max_iterations=MATCH_MODEL_MAX_ITERATIONS,
+    ):
+        """Function used to fit the model on the results played before as_of.
+
+        Args:
+            results_df (pandas.DataFrame): results in the layout of get_fbref_results / get_football_data_results
+            as_of (str or pandas.Timestamp): fit date, results after it are left out, defaults to the latest kickoff
+            model_type (str): poisson or dixon_coles
+            xi (float): time decay per day, 0 weights every match equally
+            initial_model (MatchModel): earlier fit to start from, teams it does not know start at 0
+            max_iterations (int): L-BFGS-B iteration limit
+
+        Returns:
+            match_model (MatchModel): fitted model, fit_summary holds the optimiser outcome
+        """
+        if model_type not in MATCH_MODEL_TYPES:
+            raise Exception(f"Unknown model_type {model_type}, use poisson or dixon_coles.")
+        played_df = get_played_results(results_df)
+        as_of = played_df.kickoff.max() if as_of is None else pd.Timestamp(as_of)
+        played_df = played_df.loc[(played_df.kickoff <= as_of).to_numpy()]
+        if len(played_df) == 0:
+            raise Exception(f"No played results on or before {as_of}.")
+
+        weights = get_time_decay_weights(played_df.kickoff, as_of, xi)
+        teams = pd.Index(pd.unique(played_df[["home_team", "away_team"]].to_numpy().ravel())).sort_values()
+        no_teams = len(teams)
+        home_codes = teams.get_indexer(played_df.home_team)
+        away_codes = teams.get_indexer(played_df.away_team)
+        home_goals = played_df.home_goals.to_numpy(dtype=float)
+        away_goals = played_df.away_goals.to_numpy(dtype=float)
+
+        if initial_model is None:
+            initial_params = np.zeros(2 * no_teams + 3)
+            initial_params[-3] = np.log(max(np.average(home_goals + away_goals, weights=weights) / 2, 0.1))
+        else:
+            initial_params = initial_model.get_params(teams)
+        if model_type == "poisson":
+            initial_params[-1] = 0.0
+
+        rho_bounds = MATCH_MODEL_RHO_BOUNDS if model_type == "dixon_coles" else (0.0, 0.0)
+        optimise_result = minimize(
+            get_negative_log_likelihood,
+            initial_params,
+            args=(home_codes, away_codes, home_goals, away_goals, weights, no_teams, model_type),
+            jac=True,
+            method="L-BFGS-B",
+            bounds=[(None, None)] * (2 * no_teams + 2) + [rho_bounds],
+            options={"maxiter": max_iterations},
+        )
+
+        # the log factorial terms do not depend on the parameters, they are only added to the reported value
+        log_factorials = weights @ (gammaln(home_goals + 1) + gammaln(away_goals + 1))
+        params = optimise_result.x
+        defence_end = 2 * no_teams
+        match_model = cls(
+            teams,
+            params[:no_teams] - params[:no_teams].mean(),
+            params[no_teams:defence_end] - params[no_teams:defence_end].mean(),
+            params[-3],
+            params[-2],
+            params[-1],
+            as_of,
+            model_type,
+            xi,
+        )
+        match_model.fit_summary = {
+            "success": bool(optimise_result.success),
+            "message": str(optimise_result.message),
+            "iterations": int(optimise_result.nit),
+            "log_likelihood": float(-optimise_result.fun - log_factorials),
+            "matches": len(played_df),
+        }
+        return match_model
+
+    def refit(self, results_df, as_of=None, max_iterations=MATCH_MODEL_MAX_ITERATIONS):
+        """Function used to fit the same model again with newer results, starting from this fit"""
+        return MatchModel.fit(results_df, as_of, self.model_type, self.xi, self, max_iterations)
+
+    def get_params(self, teams):
+        """Function used to get the parameter vector of the likelihood for teams, unknown teams get 0"""
+        team_positions = self.teams.get_indexer(teams)
+        is_known = team_positions >= 0
+        attack = np.where(is_known, self.attack[team_positions], 0.0)
+        defence = np.where(is_known, self.defence[team_positions], 0.0)
+        return np.concatenate([attack, defence, [self.intercept, self.home_advantage, self.rho]])
+
+    def get_team_params_df(self):
+        """Function used to get the attack and defence of every team, strongest attack first"""
+        team_params_df = pd.DataFrame({"team": self.teams, "attack": self.attack, "defence": self.defence})
+        return team_params_df.sort_values("attack", ascending=False, ignore_index=True)
+
+    def predict_rates(self, home_teams, away_teams):
+        """Function used to get the expected home and away goals of fixtures
+
+        Returns:
+            home_rates (np.array): expected home goals of each fixture
+            away_rates (np.array): expected away goals of each fixture
+        """
+        home_positions = self.teams.get_indexer(pd.Index(np.atleast_1d(home_teams)))
+        away_positions = self.teams.get_indexer(pd.Index(np.atleast_1d(away_teams)))
+        unknown_teams = set(np.atleast_1d(home_teams)[home_positions < 0]) | set(
+            np.atleast_1d(away_teams)[away_positions < 0]
+        )
+        if unknown_teams:
+            raise Exception(f"Teams not in the model: {sorted(unknown_teams)}.")
+
+        home_rates = np.exp(
+            self.intercept + self.home_advantage + self.attack[home_positions] - self.defence[away_positions]
+        )
+        away_rates = np.exp(self.intercept + self.attack[away_positions] - self.defence[home_positions])
+        return home_rates, away_rates
+
+    def predict_score_matrices(self, home_teams, away_teams, max_goals=MATCH_MODEL_MAX_GOALS):
+        """Function used to get the probability of every score up to max_goals for each team
+
+        Returns:
+            score_matrices (np.array): fixtures x home goals x away goals probabilities
+        """
+        home_rates, away_rates = self.predict_rates(home_teams, away_teams)
+        goals = np.arange(max_goals + 1)
+        score_matrices = poisson.pmf(goals.reshape(1, -1, 1), home_rates.reshape(-1, 1, 1)) * poisson.pmf(
+            goals.reshape(1, 1, -1), away_rates.reshape(-1, 1, 1)
+        )
+        if self.model_type == "dixon_coles":
+            score_matrices[:, 0, 0] *= 1 - home_rates * away_rates * self.rho
+            score_matrices[:, 0, 1] *= 1 + home_rates * self.rho
+            score_matrices[:, 1, 0] *= 1 + away_rates * self.rho
+            score_matrices[:, 1, 1] *= 1 - self.rho
+        return score_matrices
+
+    def predict_outcomes(self, home_teams, away_teams, max_goals=MATCH_MODEL_MAX_GOALS):
+        """Function used to get expected goals and home, draw and away probabilities of fixtures"""
+        home_rates, away_rates = self.predict_rates(home_teams, away_teams)
+        score_matrices = self.predict_score_matrices(home_teams, away_teams, max_goals)
+        score_totals = score_matrices.sum(axis=(1, 2))
+        return pd.DataFrame(
+            {
+                "home_team": np.atleast_1d(home_teams),
+                "away_team": np.atleast_1d(away_teams),
+                "home_expected_goals": home_rates,
+                "away_expected_goals": away_rates,
+                "home_win": np.tril(score_matrices, -1).sum(axis=(1, 2)) / score_totals,
+                "draw": np.trace(score_matrices, axis1=1, axis2=2) / score_totals,
+                "away_win": np.triu(score_matrices, 1).sum(axis=(1, 2)) / score_totals,
+            }
+        )
+
+    @classmethod
+    def load(cls, model_dir=MATCH_MODEL_DIR):
+        """Function used to load a model written with save"""
+        team_params_df = pd.read_parquet(os.path.join(model_dir, "team_params.parquet"))
+        model_params = pd.read_parquet(os.path.join(model_dir, "model_params.parquet")).iloc[0]
+        return cls(
+            team_params_df.team,
+            team_params_df.attack,
+            team_params_df.defence,
+            model_params.intercept,
+            model_params.home_advantage,
+            model_params.rho,
+            model_params.as_of,
+            model_params.model_type,
+            model_params.xi,
+        )
+
+    def save(self, model_dir=MATCH_MODEL_DIR):
+        """Function used to write the team parameters and model parameters to model_dir as parquet files"""
+        os.makedirs(model_dir, exist_ok=True)
+        pd.DataFrame({"team": self.teams, "attack": self.attack, "defence": self.defence}).to_parquet(
+            os.path.join(model_dir, "team_params.parquet"), index=False
+        )
+        pd.DataFrame(
+            [
+                {
+                    "intercept": self.intercept,
+                    "home_advantage": self.home_advantage,
+                    "rho": self.rho,
+                    "as_of": self.as_of,
+                    "model_type": self.model_type,
+                    "xi": self.xi,
+                }
+            ]
+        ).to_parquet(os.path.join(model_dir, "model_params.parquet"), index=False)
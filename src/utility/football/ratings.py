@@ -0,0 +1,284 @@
+"""Script used to rate teams from results with Elo, goal-based Elo and pi-ratings.
+
+Ratings are replayed in layers: a fixture only depends on the ratings of its two teams, so fixtures are grouped into
+layers in which no team plays twice, every earlier fixture of both teams being in an earlier layer. Each layer is then
+one set of array operations for every fixture in it. The team ratings frame is the state of the engine, later runs
+only apply the fixtures played after it with update_team_ratings.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.utility.football.results import get_played_results
+
+RATING_COLUMNS = ["elo", "goal_elo", "pi_home", "pi_away"]
+
+ELO_INITIAL_RATING = 1500.0
+ELO_K_FACTOR = 20.0
+ELO_HOME_ADVANTAGE = 60.0
+
+# pi-ratings of Constantinou and Fenton (2013), goal differences are on a log scale of base PI_GOAL_BASE
+PI_LEARNING_RATE = 0.035
+PI_HOME_AWAY_RATE = 0.7
+PI_GOAL_BASE = 10.0
+PI_GOAL_SCALE = 3.0
+
+TEAM_RATINGS_DIR = os.environ.get(
+    "TEAM_RATINGS_DIR",
+    os.path.join(os.path.expanduser("~"), ".local", "share", "football_sandbox", "team_ratings"),
+)
+
+
+def get_rating_layers(home_codes, away_codes, no_teams):
+    """Function used to number fixtures by layer, one more than the latest layer either team has played in.
+
+    Args:
+        home_codes (np.array): team number of the home team of each fixture, fixtures in kickoff order
+        away_codes (np.array): team number of the away team of each fixture
+        no_teams (int): number of teams
+
+    Returns:
+        layers (np.array): layer of each fixture, no team plays twice in a layer
+    """
+    team_layers = [-1] * no_teams
+    layers = []
+    for home_code, away_code in zip(home_codes.tolist(), away_codes.tolist()):
+        layer = max(team_layers[home_code], team_layers[away_code]) + 1
+        team_layers[home_code] = layer
+        team_layers[away_code] = layer
+        layers.append(layer)
+    return np.array(layers, dtype=np.int64)
+
+
+def get_elo_expectation(home_rating, away_rating, home_advantage=ELO_HOME_ADVANTAGE):
+    """Function used to get the expected score of the home team, a win counting 1 and a draw 0.5"""
+    return 1 / (1 + 10 ** ((away_rating - home_rating - home_advantage) / 400))
+
+
+def get_goal_elo_multiplier(goal_difference):
+    """Function used to scale the Elo K factor by the margin of victory, as World Football Elo Ratings do"""
+    absolute_difference = np.abs(goal_difference)
+    return np.where(
+        absolute_difference <= 1, 1.0, np.where(absolute_difference == 2, 1.5, (11 + absolute_difference) / 8)
+    )
+
+
+def get_pi_expected_goal_difference(pi_rating):
+    """Function used to turn a pi-rating into the goal difference expected against an average team"""
+    return np.sign(pi_rating) * (PI_GOAL_BASE ** (np.abs(pi_rating) / PI_GOAL_SCALE) - 1)
+
+
+def replay_ratings(
+    rating_matrix,
+    home_codes,
+    away_codes,
+    goal_differences,
+    k_factor=ELO_K_FACTOR,
+    home_advantage=ELO_HOME_ADVANTAGE,
+    pi_learning_rate=PI_LEARNING_RATE,
+    pi_home_away_rate=PI_HOME_AWAY_RATE,
+):
+    """Function used to apply fixtures in kickoff order to the ratings of every method, one layer at a time.
+
+    Args:
+        rating_matrix (np.array): teams x RATING_COLUMNS ratings before the first fixture, updated in place
+        home_codes (np.array): team number of the home team of each fixture, fixtures in kickoff order
+        away_codes (np.array): team number of the away team of each fixture
+        goal_differences (np.array): home goals minus away goals of each fixture
+        k_factor (float): Elo K factor, also the base K factor of goal-based Elo
+        home_advantage (float): Elo points added to the home team rating
+        pi_learning_rate (float): share of the goal difference error added to the pi-ratings of the venue played at
+        pi_home_away_rate (float): share of that change also added to the pi-rating of the other venue
+
+    Returns:
+        pre_match_matrix (np.array): fixtures x (home, away) x RATING_COLUMNS ratings before each fixture
+    """
+    layers = get_rating_layers(home_codes, away_codes, len(rating_matrix))
+    layer_order = np.argsort(layers, kind="stable")
+    layer_ends = np.cumsum(np.bincount(layers)) if len(layers) else np.array([], dtype=np.int64)
+    pre_match_matrix = np.empty((len(home_codes), 2, len(RATING_COLUMNS)))
+
+    # both Elo methods are updated together, goal-based Elo with a K factor scaled by the margin
+    match_scores = ((np.sign(goal_differences) + 1) / 2).reshape(-1, 1)
+    elo_k_factors = np.column_stack(
+        [np.full(len(goal_differences), k_factor), k_factor * get_goal_elo_multiplier(goal_differences)]
+    )
+    goal_difference_scale = pi_learning_rate * PI_GOAL_SCALE / np.log(PI_GOAL_BASE)
+    # the away team gains the opposite of the home team, on the pi-rating of the other venue
+    away_change_columns = [0, 1, 3, 2]
+
+    layer_start = 0
+    for layer_end in layer_ends.tolist():
+        fixture_nos = layer_order[layer_start:layer_end]
+        layer_start = layer_end
+        home_teams = home_codes[fixture_nos]
+        away_teams = away_codes[fixture_nos]
+
+        home_ratings = rating_matrix[home_teams]
+        away_ratings = rating_matrix[away_teams]
+        pre_match_matrix[fixture_nos, 0] = home_ratings
+        pre_match_matrix[fixture_nos, 1] = away_ratings
+
+        home_changes = np.empty(home_ratings.shape)
+        home_changes[:, :2] = elo_k_factors[fixture_nos] * (
+            match_scores[fixture_nos] - get_elo_expectation(home_ratings[:, :2], away_ratings[:, :2], home_advantage)
+        )
+
+        # pi-ratings move by the log of the goal difference error, the home team at home and the away team away
+        goal_difference_errors = goal_differences[fixture_nos] - (
+            get_pi_expected_goal_difference(home_ratings[:, 2]) - get_pi_expected_goal_difference(away_ratings[:, 3])
+        )
+        pi_changes = goal_difference_scale * np.sign(goal_difference_errors) * np.log1p(np.abs(goal_difference_errors))
+        home_changes[:, 2] = pi_changes
+        home_changes[:, 3] = pi_home_away_rate * pi_changes
+
+        # teams are unique within a layer, so the fancy index assignments never collide
+        rating_matrix[home_teams] = home_ratings + home_changes
+        rating_matrix[away_teams] = away_ratings - home_changes[:, away_change_columns]
+
+    return pre_match_matrix
+
+
+def get_new_rating_results(team_ratings_df, results_df):
+    """Function used to keep the played results not yet applied to team_ratings_df.
+
+    A fixture has been applied when both teams have a rated match at or after its kickoff. Fixtures played after
+    the latest rated match of either team are new, so results_df can be the full fixture list fetched again.
+    """
+    played_df = get_played_results(results_df)
+    last_kickoffs = team_ratings_df.set_index("team")["last_kickoff"]
+    home_last_kickoffs = played_df.home_team.map(last_kickoffs)
+    away_last_kickoffs = played_df.away_team.map(last_kickoffs)
+    is_new = (
+        home_last_kickoffs.isna()
+        | away_last_kickoffs.isna()
+        | (played_df.kickoff > home_last_kickoffs)
+        | (played_df.kickoff > away_last_kickoffs)
+    )
+    return played_df.loc[is_new.to_numpy()].sort_values("kickoff", kind="stable")
+
+
+def update_team_ratings(
+    team_ratings_df,
+    results_df,
+    k_factor=ELO_K_FACTOR,
+    home_advantage=ELO_HOME_ADVANTAGE,
+    pi_learning_rate=PI_LEARNING_RATE,
+    pi_home_away_rate=PI_HOME_AWAY_RATE,
+):
+    """Function used to apply new results to team ratings without replaying earlier fixtures.
+
+    Teams are rated across competitions by name, so a promoted team keeps its rating. A result older than the latest
+    rated match of both its teams cannot be applied in order and is skipped, rebuild with get_team_ratings to pick up
+    corrected history.
+
+    Args:
+        team_ratings_df (pandas.DataFrame): output of get_team_ratings, of an earlier update or read_team_ratings,
+            None to start with every team at the initial ratings
+        results_df (pandas.DataFrame): results in the layout of get_fbref_results / get_football_data_results
+        k_factor, home_advantage, pi_learning_rate, pi_home_away_rate: see replay_ratings, must match the earlier run
+
+    Returns:
+        team_ratings_df (pandas.DataFrame): team, RATING_COLUMNS, matches and last_kickoff of every team
+        match_ratings_df (pandas.DataFrame): the applied results with the ratings of both teams before kickoff, the
+            Elo expected home score of both Elo methods and the pi-rating expected goal difference
+    """
+    if team_ratings_df is None:
+        team_ratings_df = pd.DataFrame(
+            {
+                "team": pd.Series(dtype=object),
+                **{column: pd.Series(dtype=float) for column in RATING_COLUMNS},
+                "matches": pd.Series(dtype=np.int64),
+                "last_kickoff": pd.Series(dtype="datetime64[ns]"),
+            }
+        )
+
+    new_results_df = get_new_rating_results(team_ratings_df, results_df)
+
+    # new teams start at the initial ratings, after the stored ones
+    teams = pd.Index(team_ratings_df.team)
+    new_teams = pd.Index(pd.unique(new_results_df[["home_team", "away_team"]].to_numpy().ravel()))
+    teams = teams.append(new_teams.difference(teams, sort=False))
+    no_new_teams = len(teams) - len(team_ratings_df)
+
+    initial_ratings = np.tile([ELO_INITIAL_RATING, ELO_INITIAL_RATING, 0.0, 0.0], (no_new_teams, 1))
+    rating_matrix = np.concatenate([team_ratings_df[RATING_COLUMNS].to_numpy(dtype=float), initial_ratings])
+
+    home_codes = teams.get_indexer(new_results_df.home_team)
+    away_codes = teams.get_indexer(new_results_df.away_team)
+    goal_differences = (new_results_df.home_goals - new_results_df.away_goals).to_numpy(dtype=float)
+    pre_match_matrix = replay_ratings(
+        rating_matrix,
+        home_codes,
+        away_codes,
+        goal_differences,
+        k_factor,
+        home_advantage,
+        pi_learning_rate,
+        pi_home_away_rate,
+    )
+
+    match_ratings_df = new_results_df.reset_index(drop=True)
+    for side_no, side in enumerate(["home", "away"]):
+        for column_no, column in enumerate(RATING_COLUMNS):
+            match_ratings_df[f"{side}_{column}"] = pre_match_matrix[:, side_no, column_no]
+    for method in ["elo", "goal_elo"]:
+        match_ratings_df[f"{method}_expected_home_score"] = get_elo_expectation(
+            match_ratings_df[f"home_{method}"], match_ratings_df[f"away_{method}"], home_advantage
+        )
+    match_ratings_df["pi_expected_goal_difference"] = get_pi_expected_goal_difference(
+        match_ratings_df.home_pi_home
+    ) - get_pi_expected_goal_difference(match_ratings_df.away_pi_away)
+
+    # match counts and last kickoffs of the teams that played
+    team_codes = np.concatenate([home_codes, away_codes])
+    team_kickoffs = np.concatenate([new_results_df.kickoff.to_numpy()] * 2)
+    matches = np.concatenate([team_ratings_df.matches.to_numpy(dtype=np.int64), np.zeros(no_new_teams, np.int64)])
+    matches += np.bincount(team_codes, minlength=len(teams))
+    stored_last_kickoffs = np.concatenate(
+        [
+            team_ratings_df.last_kickoff.to_numpy(dtype="datetime64[ns]"),
+            np.full(no_new_teams, np.datetime64("NaT"), "M8[ns]"),
+        ]
+    )
+    last_kickoffs = (
+        pd.Series(np.concatenate([stored_last_kickoffs, team_kickoffs]))
+        .groupby(np.concatenate([np.arange(len(teams)), team_codes]))
+        .max()
+    )
+
+    team_ratings_df = pd.DataFrame(rating_matrix, columns=RATING_COLUMNS)
+    team_ratings_df.insert(0, "team", teams.to_numpy())
+    team_ratings_df["matches"] = matches
+    team_ratings_df["last_kickoff"] = last_kickoffs.to_numpy()
+    return team_ratings_df, match_ratings_df
+
+
+def get_team_ratings(
+    results_df,
+    k_factor=ELO_K_FACTOR,
+    home_advantage=ELO_HOME_ADVANTAGE,
+    pi_learning_rate=PI_LEARNING_RATE,
+    pi_home_away_rate=PI_HOME_AWAY_RATE,
+):
+    """Function used to replay every played result from the initial ratings, see update_team_ratings"""
+    return update_team_ratings(None, results_df, k_factor, home_advantage, pi_learning_rate, pi_home_away_rate)
+
+
+def read_team_ratings(ratings_dir=TEAM_RATINGS_DIR):
+    """Function used to read the team ratings written with write_team_ratings, None when there are none yet"""
+    ratings_path = os.path.join(ratings_dir, "team_ratings.parquet")
+    if not os.path.exists(ratings_path):
+        return None
+    return pd.read_parquet(ratings_path)
+
+
+def write_team_ratings(team_ratings_df, ratings_dir=TEAM_RATINGS_DIR):
+    """Function used to write team ratings, the state later updates start from"""
+    os.makedirs(ratings_dir, exist_ok=True)
+    ratings_path = os.path.join(ratings_dir, "team_ratings.parquet")
+    temporary_path = f"{ratings_path}.tmp"
+    team_ratings_df.to_parquet(temporary_path, index=False)
+    os.replace(temporary_path, ratings_path)
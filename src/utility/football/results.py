@@ -0,0 +1,108 @@
+"""Script used to put FBref fixtures and football-data results into one results layout, shared by the team form,
+standings, rating and match model engines"""
+
+import numpy as np
+import pandas as pd
+
+# one row per fixture, unplayed fixtures have nan goals
+RESULTS_COLUMNS = [
+    "competition",
+    "season_name",
+    "kickoff",
+    "home_team",
+    "away_team",
+    "home_goals",
+    "away_goals",
+    "home_xg",
+    "away_xg",
+]
+
+
+def get_fbref_results(fixtures_df):
+    """Function used to get results from the output of FBref.get_fixtures_and_results"""
+    results_df = pd.DataFrame(
+        {
+            "competition": fixtures_df["competition_id"].astype(str),
+            "season_name": fixtures_df["season_name"].astype(str),
+            "kickoff": fixtures_df["kickoff"].fillna(fixtures_df["date"]),
+            "home_team": fixtures_df["home"].astype(str),
+            "away_team": fixtures_df["away"].astype(str),
+            "home_goals": fixtures_df["home_score"].astype(float),
+            "away_goals": fixtures_df["away_score"].astype(float),
+            "home_xg": fixtures_df["home_xg"].astype(float),
+            "away_xg": fixtures_df["away_xg"].astype(float),
+        }
+    )
+    return sort_results(results_df)
+
+
+def get_football_data_results(football_data_df):
+    """Function used to get results from cleaned football-data seasons (get_football_data_seasons) or the archive
+    (read_football_data_archive), football-data has no xg"""
+    results_df = pd.DataFrame(
+        {
+            "competition": football_data_df["league_code"].astype(str),
+            "season_name": football_data_df["season_name"].astype(str),
+            "kickoff": pd.to_datetime(football_data_df["kickoff"]).fillna(pd.to_datetime(football_data_df["date"])),
+            "home_team": football_data_df["hometeam"].astype(str),
+            "away_team": football_data_df["awayteam"].astype(str),
+            "home_goals": football_data_df["fthg"].astype(float),
+            "away_goals": football_data_df["ftag"].astype(float),
+            "home_xg": np.nan,
+            "away_xg": np.nan,
+        }
+    )
+    return sort_results(results_df)
+
+
+def sort_results(results_df):
+    """Function used to order results by kickoff, the order every engine replays them in"""
+    return results_df.sort_values(["kickoff", "competition", "home_team"], kind="stable").reset_index(drop=True)
+
+
+def get_played_results(results_df):
+    """Function used to keep the fixtures with a result"""
+    return results_df.loc[results_df.home_goals.notna() & results_df.away_goals.notna()]
+
+
+def get_points(goals_for, goals_against):
+    """Function used to get league points, 3 for a win and 1 for a draw"""
+    return np.where(goals_for > goals_against, 3, np.where(goals_for == goals_against, 1, 0))
+
+
+def get_table_ranks(table_df, group_columns, rank_columns, ascending=False):
+    """Function used to rank rows within groups on several columns at once, later columns break ties of earlier ones
+    and rows tied on all of them share the best rank. One sort of the whole frame, no per group loop.
+
+    Args:
+        table_df (pandas.DataFrame): rows to rank
+        group_columns (List): rows are ranked within these groups, e.g. competition, season and matchday
+        rank_columns (List): e.g. ["points", "goal_difference", "goals_for"]
+        ascending (bool): rank 1 is the lowest value when True, the highest when False
+
+    Returns:
+        ranks (np.array): rank of each row of table_df, in table_df order
+    """
+    group_codes = table_df.groupby(group_columns, sort=False, observed=True).ngroup().to_numpy()
+    rank_values = [table_df[column].to_numpy(dtype=float) for column in rank_columns]
+    if not ascending:
+        rank_values = [-values for values in rank_values]
+
+    # np.lexsort sorts on the last key first
+    sort_order = np.lexsort(rank_values[::-1] + [group_codes])
+    sorted_group_codes = group_codes[sort_order]
+
+    positions = np.arange(len(table_df))
+    is_group_start = np.ones(len(table_df), dtype=bool)
+    is_group_start[1:] = sorted_group_codes[1:] != sorted_group_codes[:-1]
+    is_tie_start = is_group_start.copy()
+    for values in rank_values:
+        sorted_values = values[sort_order]
+        is_tie_start[1:] |= sorted_values[1:] != sorted_values[:-1]
+
+    group_starts = np.maximum.accumulate(np.where(is_group_start, positions, 0))
+    tie_starts = np.maximum.accumulate(np.where(is_tie_start, positions, 0))
+
+    ranks = np.empty(len(table_df), dtype=np.int64)
+    ranks[sort_order] = tie_starts - group_starts + 1
+    return ranks
@@ -0,0 +1,188 @@
+"""Script used to simulate the rest of a season from the unplayed fixtures and their goal expectations.
+
+Every unplayed fixture of every simulation is sampled at once as a simulations x fixtures array of Poisson goals.
+Team points and goals are then a matrix product with fixtures x teams incidence matrices, and the final positions one
+sort per simulation along the team axis. Simulations are split into chunks seeded from one SeedSequence, so a seed
+gives the same table whatever the number of worker processes.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import poisson
+
+from src.utility.football.team_form import get_team_match_df
+
+SIMULATION_COUNT = 100_000
+SIMULATION_CHUNK_SIZE = 10_000
+SIMULATION_TOP_PLACES = 4
+SIMULATION_RELEGATION_PLACES = 3
+# goals are sampled up to the count whose cdf reaches 1 - SIMULATION_GOALS_TAIL, larger counts are capped to it
+SIMULATION_GOALS_TAIL = 1e-12
+
+
+def add_expected_goals(results_df, match_model):
+    """Function used to add home_expected_goals and away_expected_goals of the unplayed fixtures from a MatchModel"""
+    results_df = results_df.copy()
+    is_unplayed = (results_df.home_goals.isna() | results_df.away_goals.isna()).to_numpy()
+    home_rates, away_rates = match_model.predict_rates(
+        results_df.home_team.to_numpy()[is_unplayed], results_df.away_team.to_numpy()[is_unplayed]
+    )
+    results_df["home_expected_goals"] = np.nan
+    results_df["away_expected_goals"] = np.nan
+    results_df.loc[is_unplayed, "home_expected_goals"] = home_rates
+    results_df.loc[is_unplayed, "away_expected_goals"] = away_rates
+    return results_df
+
+
+def get_poisson_goals(rng, rates, no_simulations):
+    """Function used to sample simulations x fixtures Poisson goals by inverting the cdf of each fixture.
+
+    A uniform draw is compared with the cdf of every goal count, which is several times faster than rng.poisson for
+    the low rates of football scores.
+    """
+    max_goals = int(poisson.ppf(1 - SIMULATION_GOALS_TAIL, rates.max())) if len(rates) else 0
+    goals_cdf = poisson.cdf(np.arange(max_goals).reshape(-1, 1), rates)
+    uniforms = rng.random((no_simulations, len(rates)))
+    goals = np.zeros((no_simulations, len(rates)), dtype=np.int16)
+    for goal_cdf in goals_cdf:
+        goals += uniforms > goal_cdf
+    return goals
+
+
+def simulate_season_chunk(
+    seed_sequence, no_simulations, home_codes, away_codes, home_rates, away_rates, base_table, no_teams
+):
+    """Function used to simulate one chunk of seasons, run inside the process pool.
+
+    Args:
+        seed_sequence (np.random.SeedSequence): seed of the chunk
+        no_simulations (int): number of seasons in the chunk
+        home_codes (np.array): team number of the home team of each unplayed fixture
+        away_codes (np.array): team number of the away team of each unplayed fixture
+        home_rates (np.array): expected home goals of each unplayed fixture
+        away_rates (np.array): expected away goals of each unplayed fixture
+        base_table (np.array): teams x (points, goal difference, goals for) of the played fixtures
+        no_teams (int): number of teams
+
+    Returns:
+        position_counts (np.array): teams x positions number of seasons each team finished in each position
+        points_sums (np.array): total final points of each team over the chunk
+    """
+    rng = np.random.default_rng(seed_sequence)
+    no_fixtures = len(home_codes)
+    home_goals = get_poisson_goals(rng, home_rates, no_simulations)
+    away_goals = get_poisson_goals(rng, away_rates, no_simulations)
+
+    # fixtures x teams incidence matrices turn per fixture results into per team totals
+    fixture_nos = np.arange(no_fixtures)
+    home_incidence = np.zeros((no_fixtures, no_teams))
+    away_incidence = np.zeros((no_fixtures, no_teams))
+    home_incidence[fixture_nos, home_codes] = 1
+    away_incidence[fixture_nos, away_codes] = 1
+
+    goal_differences = home_goals - away_goals
+    is_draw = goal_differences == 0
+    home_points = 3 * (goal_differences > 0) + is_draw
+    away_points = 3 * (goal_differences < 0) + is_draw
+    points = base_table[:, 0] + home_points @ home_incidence + away_points @ away_incidence
+    goals_for = base_table[:, 2] + home_goals @ home_incidence + away_goals @ away_incidence
+    goal_differences = base_table[:, 1] + goal_differences @ (home_incidence - away_incidence)
+
+    # points, goal difference and goals for in one sort key, teams level on all three are split at random
+    sort_keys = points * 1e6 + (goal_differences + 1000) * 1e3 + goals_for + rng.random((no_simulations, no_teams))
+    team_order = np.argsort(-sort_keys, axis=1)
+    positions = np.empty((no_simulations, no_teams), dtype=np.int64)
+    np.put_along_axis(positions, team_order, np.arange(no_teams), axis=1)
+
+    team_positions = np.arange(no_teams) * no_teams + positions
+    position_counts = np.bincount(team_positions.ravel(), minlength=no_teams * no_teams).reshape(no_teams, no_teams)
+    return position_counts, points.sum(axis=0)
+
+
+def simulate_season(
+    results_df,
+    no_simulations=SIMULATION_COUNT,
+    seed=None,
+    max_workers=None,
+    chunk_size=SIMULATION_CHUNK_SIZE,
+    top_places=SIMULATION_TOP_PLACES,
+    relegation_places=SIMULATION_RELEGATION_PLACES,
+):
+    """Function used to simulate the unplayed fixtures of a competition season and get final table probabilities.
+
+    Args:
+        results_df (pandas.DataFrame): fixtures of one competition season in the layout of get_fbref_results, unplayed
+            fixtures have nan goals and home_expected_goals / away_expected_goals, see add_expected_goals
+        no_simulations (int): number of simulated seasons
+        seed (int): seed of the simulations, the same seed gives the same probabilities for any max_workers
+        max_workers (int): number of simulation processes, chunks are run in this process when 1
+        chunk_size (int): number of seasons simulated in one array, bounds memory per process
+        top_places (int): number of places counted in the top column, e.g. 4 for the Champions League places
+        relegation_places (int): number of places counted in the relegation column
+
+    Returns:
+        simulation_df (pandas.DataFrame): one row per team with current and expected points, mean position, title,
+            top and relegation probabilities and the probability of every final position, ordered by mean position
+    """
+    if len(results_df[["competition", "season_name"]].drop_duplicates()) > 1:
+        raise Exception("Simulate one competition season at a time.")
+
+    is_unplayed = (results_df.home_goals.isna() | results_df.away_goals.isna()).to_numpy()
+    unplayed_df = results_df.loc[is_unplayed]
+    if unplayed_df[["home_expected_goals", "away_expected_goals"]].isna().any().any():
+        raise Exception("Every unplayed fixture needs home_expected_goals and away_expected_goals.")
+
+    teams = pd.Index(pd.unique(results_df[["home_team", "away_team"]].to_numpy().ravel())).sort_values()
+    no_teams = len(teams)
+
+    # current table of the played fixtures
+    team_match_df = get_team_match_df(results_df)
+    base_table_df = (
+        team_match_df.groupby("team")[["points", "goal_difference", "goals_for"]].sum().reindex(teams, fill_value=0)
+    )
+    base_table = base_table_df.to_numpy(dtype=float)
+
+    home_codes = teams.get_indexer(unplayed_df.home_team)
+    away_codes = teams.get_indexer(unplayed_df.away_team)
+    home_rates = unplayed_df.home_expected_goals.to_numpy(dtype=float)
+    away_rates = unplayed_df.away_expected_goals.to_numpy(dtype=float)
+
+    # chunks and their seeds only depend on no_simulations, chunk_size and seed
+    chunk_sizes = [chunk_size] * (no_simulations // chunk_size)
+    if no_simulations % chunk_size:
+        chunk_sizes.append(no_simulations % chunk_size)
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    chunk_args = [
+        (seed_sequence, chunk_no_simulations, home_codes, away_codes, home_rates, away_rates, base_table, no_teams)
+        for seed_sequence, chunk_no_simulations in zip(seed_sequences, chunk_sizes)
+    ]
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(chunk_args))
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as simulation_pool:
+            chunk_results = list(simulation_pool.map(simulate_season_chunk, *zip(*chunk_args)))
+    else:
+        chunk_results = [simulate_season_chunk(*args) for args in chunk_args]
+
+    position_counts = sum(chunk_position_counts for chunk_position_counts, _ in chunk_results)
+    points_sums = sum(chunk_points_sums for _, chunk_points_sums in chunk_results)
+    position_probabilities = position_counts / no_simulations
+
+    relegation_start = no_teams - relegation_places
+    simulation_df = pd.DataFrame(
+        {
+            "team": teams,
+            "points": base_table_df.points.to_numpy().astype(np.int64),
+            "expected_points": points_sums / no_simulations,
+            "mean_position": position_probabilities @ np.arange(1, no_teams + 1),
+            "title": position_probabilities[:, 0],
+            f"top_{top_places}": position_probabilities[:, :top_places].sum(axis=1),
+            "relegation": position_probabilities[:, relegation_start:].sum(axis=1),
+        }
+    )
+    position_columns = [f"position_{position}" for position in range(1, no_teams + 1)]
+    simulation_df = pd.concat([simulation_df, pd.DataFrame(position_probabilities, columns=position_columns)], axis=1)
+    return simulation_df.sort_values("mean_position", ignore_index=True)
@@ -0,0 +1,206 @@
+"""Script used to rebuild league tables after every matchday from results, so the table as of any date is a lookup"""
+
+import numpy as np
+import pandas as pd
+
+from src.utility.football.results import get_table_ranks
+from src.utility.football.team_form import get_team_match_df
+
+STANDINGS_STATS = ["played", "won", "drawn", "lost", "goals_for", "goals_against", "goal_difference", "points"]
+STANDINGS_TIE_BREAK_COLUMNS = ["points", "goal_difference", "goals_for"]
+
+
+def get_standings_blocks(results_df, tie_break_columns=STANDINGS_TIE_BREAK_COLUMNS):
+    """Function used to get the full table of every competition season after each of its match dates.
+
+    Each competition season is a block of match dates x teams rows. The results of each team on each date are added
+    into the block with one np.add.at, the running totals are one cumulative sum along dates and the ranks one
+    grouped sort, for every season at once. Teams appear from the first date of the season, with zeros until their
+    first match.
+
+    Args:
+        results_df (pandas.DataFrame): results in the layout of get_fbref_results / get_football_data_results
+        tie_break_columns (List): table order, later columns break ties of earlier ones, teams level on all of them
+            share a rank
+
+    Returns:
+        standings_df (pandas.DataFrame): competition, season_name, date, team, STANDINGS_STATS and rank, ordered by
+            season, date and rank
+        seasons_df (pandas.DataFrame): number of teams and dates of each competition season and the first row of its
+            block in standings_df
+    """
+    team_match_df = get_team_match_df(results_df)
+    team_match_df["date"] = team_match_df.kickoff.dt.normalize()
+    season_columns = ["competition", "season_name"]
+
+    # teams and match dates of every season, numbered within the season
+    season_teams_df = team_match_df[season_columns + ["team"]].drop_duplicates().sort_values(season_columns + ["team"])
+    season_teams_df["team_no"] = season_teams_df.groupby(season_columns, sort=False).cumcount()
+    season_dates_df = team_match_df[season_columns + ["date"]].drop_duplicates().sort_values(season_columns + ["date"])
+    season_dates_df["date_no"] = season_dates_df.groupby(season_columns, sort=False).cumcount()
+
+    seasons_df = (
+        season_teams_df.groupby(season_columns, sort=False)
+        .size()
+        .rename("no_teams")
+        .to_frame()
+        .join(season_dates_df.groupby(season_columns, sort=False).size().rename("no_dates"))
+        .reset_index()
+    )
+    seasons_df["block_size"] = seasons_df.no_teams * seasons_df.no_dates
+    seasons_df["block_start"] = seasons_df.block_size.cumsum() - seasons_df.block_size
+    seasons_df["season_no"] = np.arange(len(seasons_df))
+
+    # position of each team result in its season block
+    team_match_df = (
+        team_match_df.merge(season_teams_df, on=season_columns + ["team"])
+        .merge(season_dates_df, on=season_columns + ["date"])
+        .merge(seasons_df, on=season_columns)
+    )
+    row_positions = (
+        team_match_df.block_start + team_match_df.date_no * team_match_df.no_teams + team_match_df.team_no
+    ).to_numpy()
+
+    goals_for = team_match_df.goals_for.to_numpy()
+    goals_against = team_match_df.goals_against.to_numpy()
+    match_stats = np.column_stack(
+        [
+            np.ones(len(team_match_df)),
+            goals_for > goals_against,
+            goals_for == goals_against,
+            goals_for < goals_against,
+            goals_for,
+            goals_against,
+            goals_for - goals_against,
+            team_match_df.points.to_numpy(),
+        ]
+    ).astype(float)
+
+    no_rows = int(seasons_df.block_size.sum())
+    standings_matrix = np.zeros((no_rows, len(STANDINGS_STATS)))
+    np.add.at(standings_matrix, row_positions, match_stats)
+
+    # block rows: season, date number and team number of every row
+    season_nos = np.repeat(seasons_df.season_no.to_numpy(), seasons_df.block_size.to_numpy())
+    block_offsets = np.arange(no_rows) - seasons_df.block_start.to_numpy()[season_nos]
+    no_teams = seasons_df.no_teams.to_numpy()[season_nos]
+    date_nos = block_offsets // no_teams
+    team_nos = block_offsets % no_teams
+
+    # running totals along dates, for each season and team
+    team_order = np.lexsort([date_nos, team_nos, season_nos])
+    team_matrix = standings_matrix[team_order]
+    running_totals = np.cumsum(team_matrix, axis=0)
+    team_starts = np.maximum.accumulate(np.where(date_nos[team_order] == 0, np.arange(no_rows), 0))
+    standings_matrix[team_order] = running_totals - running_totals[team_starts] + team_matrix[team_starts]
+
+    # names of the numbered teams and dates
+    season_team_starts = np.concatenate([[0], np.cumsum(seasons_df.no_teams.to_numpy())])
+    season_date_starts = np.concatenate([[0], np.cumsum(seasons_df.no_dates.to_numpy())])
+
+    # ranks within each season date block, then every block ordered by rank
+    block_nos = season_date_starts[season_nos] + date_nos
+    rank_df = pd.DataFrame(standings_matrix, columns=STANDINGS_STATS).assign(block_no=block_nos)
+    ranks = get_table_ranks(rank_df, ["block_no"], tie_break_columns)
+    display_order = np.lexsort([team_nos, ranks, block_nos])
+
+    competition_codes, competitions = pd.factorize(seasons_df.competition)
+    season_name_codes, season_names = pd.factorize(seasons_df.season_name)
+    team_codes, teams = pd.factorize(season_teams_df.team)
+    season_nos = season_nos[display_order]
+
+    standings_df = pd.DataFrame(
+        {
+            "competition": pd.Categorical.from_codes(competition_codes[season_nos], competitions),
+            "season_name": pd.Categorical.from_codes(season_name_codes[season_nos], season_names),
+            "date": season_dates_df.date.to_numpy()[block_nos[display_order]],
+            "team": pd.Categorical.from_codes(
+                team_codes[season_team_starts[season_nos] + team_nos[display_order]], teams
+            ),
+        }
+    )
+    for stat_index, stat in enumerate(STANDINGS_STATS):
+        standings_df[stat] = standings_matrix[display_order, stat_index].astype(np.int64)
+    standings_df["rank"] = ranks[display_order]
+
+    return standings_df, seasons_df[season_columns + ["no_teams", "no_dates", "block_size", "block_start"]]
+
+
+def get_standings_df(results_df, tie_break_columns=STANDINGS_TIE_BREAK_COLUMNS):
+    """Function used to get the full table of every competition season after each of its match dates, see
+    get_standings_blocks"""
+    return get_standings_blocks(results_df, tie_break_columns)[0]
+
+
+class StandingsHistory:
+    """Class used to look up league tables as of any date.
+
+    The standings frame is stored as one block of no_teams rows per competition season and match date, so the table
+    as of a date is a binary search on that season's match dates and a slice of no_teams rows.
+    """
+
+    def __init__(self, results_df, tie_break_columns=STANDINGS_TIE_BREAK_COLUMNS):
+        self.standings_df, seasons_df = get_standings_blocks(results_df, tie_break_columns)
+
+        standings_dates = self.standings_df.date.to_numpy()
+        self.season_index = {}
+        competition_seasons = {}
+        for competition, season_name, no_teams, block_size, block_start in zip(
+            seasons_df.competition,
+            seasons_df.season_name,
+            seasons_df.no_teams,
+            seasons_df.block_size,
+            seasons_df.block_start,
+        ):
+            block_end = block_start + block_size
+            season_dates = standings_dates[block_start:block_end:no_teams]
+            self.season_index[(competition, season_name)] = (season_dates, int(block_start), int(no_teams))
+            competition_seasons.setdefault(competition, []).append((season_dates[0], season_name))
+
+        # seasons of each competition in order of their first match date
+        self.competition_seasons = {
+            competition: [season_name for _, season_name in sorted(season_list)]
+            for competition, season_list in competition_seasons.items()
+        }
+        self.competition_season_starts = {
+            competition: np.array([self.season_index[(competition, season_name)][0][0] for season_name in season_names])
+            for competition, season_names in self.competition_seasons.items()
+        }
+
+    def table_as_of(self, competition, as_of, season_name=None):
+        """Function used to get the table of a competition including every match played on or before as_of.
+
+        Args:
+            competition (str): competition of the results, e.g. a football-data league code or an FBref competition id
+            as_of (str or pandas.Timestamp): date, matches on that day are included
+            season_name (str): season to look in, defaults to the latest season started on or before as_of
+
+        Returns:
+            table_df (pandas.DataFrame): one row per team ordered by rank, indexed by standings_df row
+        """
+        as_of = pd.Timestamp(as_of).normalize()
+
+        if season_name is None:
+            season_starts = self.competition_season_starts.get(competition, np.array([], dtype="datetime64[ns]"))
+            season_no = np.searchsorted(season_starts, as_of.to_datetime64(), side="right") - 1
+            if season_no < 0:
+                raise Exception(f"No season of {competition} started by {as_of.date()}.")
+            season_name = self.competition_seasons[competition][season_no]
+
+        if (competition, season_name) not in self.season_index:
+            raise Exception(f"No results for {competition} {season_name}.")
+        season_dates, season_start, no_teams = self.season_index[(competition, season_name)]
+
+        date_no = np.searchsorted(season_dates, as_of.to_datetime64(), side="right") - 1
+        if date_no < 0:
+            # before the first matchday every team is level
+            block_start = season_start
+            block_end = season_start + no_teams
+            table_df = self.standings_df.iloc[block_start:block_end].sort_values("team").assign(date=as_of, rank=1)
+            table_df[STANDINGS_STATS] = 0
+            return table_df
+
+        # a slice keeps the standings_df index, resetting it would copy the block
+        block_start = season_start + date_no * no_teams
+        block_end = block_start + no_teams
+        return self.standings_df.iloc[block_start:block_end]
@@ -0,0 +1,212 @@
+"""Script used to get rolling and exponentially weighted team form, and league ranks after every match, from results.
+
+Form is computed per team within a competition season. The team form frame is also the state of the engine, new
+results are applied with update_team_form_df which only reads the last rows of each team.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.utility.football.results import get_played_results, get_points, get_table_ranks
+
+FORM_STATS = ["goals_for", "goals_against", "xg_for", "xg_against", "points"]
+FORM_GROUP_COLUMNS = ["competition", "season_name", "team"]
+FORM_CUMULATIVE_COLUMNS = {
+    "points": "total_points",
+    "goal_difference": "total_goal_difference",
+    "goals_for": "total_goals_for",
+}
+FORM_WINDOW = 5
+FORM_EWM_ALPHA = 0.3
+
+
+def get_team_match_df(results_df):
+    """Function used to turn played results into two rows per fixture, one for each team"""
+    played_df = get_played_results(results_df)
+
+    team_match_list = []
+    for team_side, opponent_side in [("home", "away"), ("away", "home")]:
+        team_match_list.append(
+            pd.DataFrame(
+                {
+                    "competition": played_df["competition"],
+                    "season_name": played_df["season_name"],
+                    "kickoff": played_df["kickoff"],
+                    "team": played_df[f"{team_side}_team"],
+                    "opponent": played_df[f"{opponent_side}_team"],
+                    "is_home": team_side == "home",
+                    "goals_for": played_df[f"{team_side}_goals"],
+                    "goals_against": played_df[f"{opponent_side}_goals"],
+                    "xg_for": played_df[f"{team_side}_xg"],
+                    "xg_against": played_df[f"{opponent_side}_xg"],
+                }
+            )
+        )
+
+    team_match_df = pd.concat(team_match_list, ignore_index=True)
+    team_match_df["goal_difference"] = team_match_df.goals_for - team_match_df.goals_against
+    team_match_df["points"] = get_points(team_match_df.goals_for, team_match_df.goals_against)
+    return team_match_df
+
+
+def get_form_matrices(form_df, window, alpha):
+    """Function used to get rolling means and exponentially weighted means of FORM_STATS for every row.
+
+    Rows are laid out as a teams x match number x stat array so the rolling window is a difference of cumulative sums
+    along the match axis and the exponentially weighted mean is a loop over match numbers, vectorised over every team
+    at once. Rows flagged is_carry hold the last rows of an earlier run: they feed the rolling window and their stored
+    ewm values seed the recursion, so they are not recomputed.
+
+    Args:
+        form_df (pandas.DataFrame): rows sorted by team group and kickoff, carry rows first in their group
+        window (int): number of matches in the rolling window
+        alpha (float): weight of the latest match in the exponentially weighted mean
+
+    Returns:
+        rolling_values (np.array): rows x stats rolling means, nan when the window has no value
+        ewm_values (np.array): rows x stats exponentially weighted means
+    """
+    group_codes = form_df.groupby(FORM_GROUP_COLUMNS, sort=False, observed=True).ngroup().to_numpy()
+    match_positions = form_df.groupby(group_codes, sort=False).cumcount().to_numpy()
+    no_groups = int(group_codes.max()) + 1 if len(form_df) else 0
+    no_positions = int(match_positions.max()) + 1 if len(form_df) else 0
+
+    stat_values = form_df[FORM_STATS].to_numpy(dtype=float)
+    stat_matrix = np.full((no_groups, no_positions, len(FORM_STATS)), np.nan)
+    stat_matrix[group_codes, match_positions] = stat_values
+
+    # rolling means from cumulative sums, missing values (football-data xg) are skipped
+    is_valid = ~np.isnan(stat_matrix)
+    padding = np.zeros((no_groups, window, len(FORM_STATS)))
+    cumulative_sums = np.concatenate([padding, np.cumsum(np.where(is_valid, stat_matrix, 0), axis=1)], axis=1)
+    cumulative_counts = np.concatenate([padding, np.cumsum(is_valid, axis=1)], axis=1)
+    window_sums = cumulative_sums[:, window:] - cumulative_sums[:, :-window]
+    window_counts = cumulative_counts[:, window:] - cumulative_counts[:, :-window]
+    rolling_matrix = np.divide(
+        window_sums, window_counts, out=np.full(window_sums.shape, np.nan), where=window_counts > 0
+    )
+
+    # exponentially weighted means, seeded by the stored values of carry rows
+    carry_matrix = np.zeros((no_groups, no_positions), dtype=bool)
+    carry_matrix[group_codes, match_positions] = form_df["is_carry"].to_numpy(dtype=bool)
+    stored_ewm_matrix = np.full(stat_matrix.shape, np.nan)
+    stored_ewm_values = form_df[[f"ewm_{stat}" for stat in FORM_STATS]].to_numpy(dtype=float)
+    stored_ewm_matrix[group_codes, match_positions] = stored_ewm_values
+
+    ewm_matrix = np.full(stat_matrix.shape, np.nan)
+    previous_ewm = np.full((no_groups, len(FORM_STATS)), np.nan)
+    for match_position in range(no_positions):
+        match_values = stat_matrix[:, match_position]
+        updated_ewm = np.where(
+            np.isnan(previous_ewm),
+            match_values,
+            np.where(np.isnan(match_values), previous_ewm, (1 - alpha) * previous_ewm + alpha * match_values),
+        )
+        updated_ewm = np.where(
+            carry_matrix[:, match_position].reshape(-1, 1), stored_ewm_matrix[:, match_position], updated_ewm
+        )
+        ewm_matrix[:, match_position] = updated_ewm
+        previous_ewm = updated_ewm
+
+    return rolling_matrix[group_codes, match_positions], ewm_matrix[group_codes, match_positions]
+
+
+def update_team_form_df(team_form_df, results_df, window=FORM_WINDOW, alpha=FORM_EWM_ALPHA):
+    """Function used to add new results to a team form frame without recomputing earlier matches.
+
+    Only the last window rows of the teams with new results are read back from team_form_df. Results already in
+    team_form_df are ignored, so results_df can be the full fixture list fetched again. A team whose new result is
+    older than its latest stored match is recomputed from its stored rows.
+
+    Args:
+        team_form_df (pandas.DataFrame): output of get_team_form_df or of an earlier update, None to start empty
+        results_df (pandas.DataFrame): results in the layout of get_fbref_results / get_football_data_results
+        window (int): number of matches in the rolling window, must match the earlier run
+        alpha (float): weight of the latest match in the exponentially weighted mean, must match the earlier run
+
+    Returns:
+        team_form_df (pandas.DataFrame): one row per team per played fixture with raw stats, match_no, running
+            totals, rolling_{stat} and ewm_{stat} means of FORM_STATS, and table_rank after that match number
+    """
+    new_form_df = get_team_match_df(results_df)
+    if team_form_df is None or len(team_form_df) == 0:
+        form_columns = ["match_no"] + list(FORM_CUMULATIVE_COLUMNS.values())
+        form_columns += [f"{form_type}_{stat}" for form_type in ["rolling", "ewm"] for stat in FORM_STATS]
+        team_form_df = new_form_df.iloc[:0].reindex(columns=list(new_form_df.columns) + form_columns + ["table_rank"])
+
+    # only the stored rows of the competition seasons with new results are read
+    is_season_row = team_form_df.competition.isin(new_form_df.competition.unique()) & team_form_df.season_name.isin(
+        new_form_df.season_name.unique()
+    )
+    season_form_df = team_form_df.loc[is_season_row.to_numpy()]
+
+    if len(season_form_df) > 0:
+        stored_keys_df = season_form_df[FORM_GROUP_COLUMNS + ["kickoff"]].assign(is_stored=True)
+        is_stored = new_form_df.merge(stored_keys_df, on=FORM_GROUP_COLUMNS + ["kickoff"], how="left")["is_stored"]
+        new_form_df = new_form_df.loc[is_stored.isna().to_numpy()]
+    if len(new_form_df) == 0:
+        return team_form_df
+
+    # teams with a result older than their latest stored match are recomputed from their stored rows
+    last_kickoffs = season_form_df.groupby(FORM_GROUP_COLUMNS, observed=True).kickoff.max().rename("last_kickoff")
+    new_form_df = new_form_df.join(last_kickoffs, on=FORM_GROUP_COLUMNS)
+    late_groups = new_form_df.loc[new_form_df.kickoff < new_form_df.last_kickoff, FORM_GROUP_COLUMNS].drop_duplicates()
+    new_form_df = new_form_df.drop(columns="last_kickoff")
+    if len(late_groups) > 0:
+        late_index = season_form_df.reset_index().merge(late_groups, on=FORM_GROUP_COLUMNS)["index"]
+        new_form_df = pd.concat([new_form_df, team_form_df.loc[late_index, new_form_df.columns]], ignore_index=True)
+        team_form_df = team_form_df.drop(index=late_index)
+        season_form_df = season_form_df.drop(index=late_index)
+
+    # carry rows: the last window rows of every team with new results
+    touched_groups = new_form_df[FORM_GROUP_COLUMNS].drop_duplicates()
+    carry_df = season_form_df.merge(touched_groups, on=FORM_GROUP_COLUMNS)
+    carry_df = carry_df.sort_values(FORM_GROUP_COLUMNS + ["kickoff"], kind="stable")
+    carry_df = carry_df.groupby(FORM_GROUP_COLUMNS, observed=True, sort=False).tail(window)
+
+    form_df = pd.concat([carry_df.assign(is_carry=True), new_form_df.assign(is_carry=False)], ignore_index=True)
+    form_df = form_df.sort_values(FORM_GROUP_COLUMNS + ["kickoff"], kind="stable").reset_index(drop=True)
+
+    rolling_values, ewm_values = get_form_matrices(form_df, window, alpha)
+    for stat_index, stat in enumerate(FORM_STATS):
+        form_df[f"rolling_{stat}"] = rolling_values[:, stat_index]
+        form_df[f"ewm_{stat}"] = ewm_values[:, stat_index]
+
+    # running totals and match numbers continue from the last carry row of each team
+    form_df = form_df.loc[~form_df.is_carry.to_numpy()].drop(columns="is_carry").reset_index(drop=True)
+    last_carry_df = carry_df.groupby(FORM_GROUP_COLUMNS, observed=True, sort=False).tail(1)
+    offset_df = form_df[FORM_GROUP_COLUMNS].merge(
+        last_carry_df[FORM_GROUP_COLUMNS + ["match_no"] + list(FORM_CUMULATIVE_COLUMNS.values())],
+        on=FORM_GROUP_COLUMNS,
+        how="left",
+    )
+    form_groups = form_df.groupby(FORM_GROUP_COLUMNS, observed=True, sort=False)
+    form_df["match_no"] = offset_df["match_no"].fillna(0).to_numpy() + form_groups.cumcount().to_numpy() + 1
+    for stat, total_column in FORM_CUMULATIVE_COLUMNS.items():
+        form_df[total_column] = offset_df[total_column].fillna(0).to_numpy() + form_groups[stat].cumsum().to_numpy()
+
+    # table ranks of the match numbers with new rows, every team that reached that match number is ranked again
+    rank_keys = form_df[["competition", "season_name", "match_no"]].drop_duplicates()
+    rerank_df = season_form_df.reset_index().merge(rank_keys, on=["competition", "season_name", "match_no"])
+    rank_df = pd.concat([rerank_df, form_df.assign(index=-1)], ignore_index=True)
+    table_ranks = get_table_ranks(
+        rank_df, ["competition", "season_name", "match_no"], list(FORM_CUMULATIVE_COLUMNS.values())
+    )
+    no_reranked = len(rerank_df)
+    form_df["table_rank"] = table_ranks[no_reranked:]
+    rerank_positions = team_form_df.index.get_indexer(rerank_df["index"])
+
+    # new results usually come after every stored one, the frame is only sorted again when they do not
+    form_df = form_df.sort_values(["kickoff"] + FORM_GROUP_COLUMNS, kind="stable")
+    needs_sort = len(team_form_df) > 0 and form_df.kickoff.min() <= team_form_df.kickoff.max()
+    team_form_df = pd.concat([team_form_df, form_df], ignore_index=True)
+    team_form_df.loc[rerank_positions, "table_rank"] = table_ranks[:no_reranked]
+    if needs_sort:
+        team_form_df = team_form_df.sort_values(["kickoff"] + FORM_GROUP_COLUMNS, kind="stable", ignore_index=True)
+    team_form_df["table_rank"] = team_form_df["table_rank"].astype(int)
+    return team_form_df
+
+
+def get_team_form_df(results_df, window=FORM_WINDOW, alpha=FORM_EWM_ALPHA):
+    """Function used to get team form after every played fixture, see update_team_form_df"""
+    return update_team_form_df(None, results_df, window, alpha)
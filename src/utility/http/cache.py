@@ -0,0 +1,167 @@
+"""Script used to cache HTTP responses on disk."""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+CacheEntry = namedtuple("CacheEntry", ["url", "blob_hash", "size", "etag", "last_modified", "fetched_at"])
+
+
+class ResponseCache:
+    """Class used to persist HTTP response bodies on disk.
+
+    Bodies are content addressed (stored once under their sha256, however many URLs point at them) and indexed in a
+    small sqlite database holding the validators needed for conditional revalidation. Once the stored bodies exceed
+    max_bytes, the least recently used entries are evicted.
+
+    Args:
+        cache_dir (str): directory holding the index and the response bodies
+        ttl_for_url (Callable): function returning the time to live in seconds for a URL, None meaning never expire
+        max_bytes (int): maximum total size of the stored response bodies
+    """
+
+    def __init__(self, cache_dir, ttl_for_url=None, max_bytes=2 * 1024**3):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, "blobs")
+        self.ttl_for_url = ttl_for_url
+        self.max_bytes = max_bytes
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    blob_hash TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS idx_responses_blob_hash ON responses(blob_hash)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses(accessed_at)")
+
+    def _blob_path(self, blob_hash):
+        return os.path.join(self.blob_dir, blob_hash[:2], blob_hash)
+
+    def get(self, url):
+        """Function used to look up the cache entry for a URL, None if the URL has not been cached"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT url, blob_hash, size, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(*row)
+
+    def is_fresh(self, entry):
+        """Function used to check whether a cache entry can be served without contacting the server"""
+        ttl = None if self.ttl_for_url is None else self.ttl_for_url(entry.url)
+        if ttl is None:
+            return True
+        return time.time() - entry.fetched_at < ttl
+
+    def read(self, entry):
+        """Function used to read the body of a cache entry, None if the body has gone missing"""
+        try:
+            with open(self._blob_path(entry.blob_hash), "rb") as blob_file:
+                content = blob_file.read()
+        except FileNotFoundError:
+            return None
+
+        with self._lock, self._connection:
+            self._connection.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), entry.url))
+        return content
+
+    def revalidation_headers(self, entry):
+        """Function used to build the conditional request headers for a stale cache entry"""
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def mark_revalidated(self, entry):
+        """Function used to restart the time to live of an entry after the server answered 304 Not Modified"""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, entry.url)
+            )
+
+    def put(self, url, content, etag=None, last_modified=None):
+        """Function used to store a response body and its validators"""
+        blob_hash = hashlib.sha256(content).hexdigest()
+        blob_path = self._blob_path(blob_hash)
+
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            temporary_path = f"{blob_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary_path, "wb") as blob_file:
+                blob_file.write(content)
+            os.replace(temporary_path, blob_path)
+
+        now = time.time()
+        with self._lock:
+            with self._connection:
+                previous_row = self._connection.execute(
+                    "SELECT blob_hash FROM responses WHERE url = ?", (url,)
+                ).fetchone()
+                self._connection.execute(
+                    """
+                    INSERT OR REPLACE INTO responses
+                    (url, blob_hash, size, etag, last_modified, fetched_at, accessed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (url, blob_hash, len(content), etag, last_modified, now, now),
+                )
+            if previous_row is not None and previous_row[0] != blob_hash:
+                self._delete_blob_if_unused(previous_row[0])
+            self._evict()
+
+    def _delete_blob_if_unused(self, blob_hash):
+        in_use = self._connection.execute(
+            "SELECT 1 FROM responses WHERE blob_hash = ? LIMIT 1", (blob_hash,)
+        ).fetchone()
+        if in_use is None:
+            try:
+                os.remove(self._blob_path(blob_hash))
+            except FileNotFoundError:
+                pass
+
+    def _total_bytes(self):
+        (total_bytes,) = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT blob_hash, size FROM responses)"
+        ).fetchone()
+        return total_bytes
+
+    def _evict(self):
+        """Function used to drop least recently used entries until the stored bodies fit in max_bytes"""
+        if self.max_bytes is None or self._total_bytes() <= self.max_bytes:
+            return
+
+        lru_rows = self._connection.execute("SELECT url, blob_hash FROM responses ORDER BY accessed_at").fetchall()
+        for url, blob_hash in lru_rows:
+            with self._connection:
+                self._connection.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self._delete_blob_if_unused(blob_hash)
+            if self._total_bytes() <= self.max_bytes:
+                break
+
+    def clear(self):
+        """Function used to remove every cached response"""
+        with self._lock:
+            blob_hashes = [row[0] for row in self._connection.execute("SELECT DISTINCT blob_hash FROM responses")]
+            with self._connection:
+                self._connection.execute("DELETE FROM responses")
+            for blob_hash in blob_hashes:
+                self._delete_blob_if_unused(blob_hash)
@@ -0,0 +1,128 @@
+"""Script used to fetch web pages over a shared, pooled and rate limited HTTP session."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class RateLimiter:
+    """Class used to space out requests so that at most one request starts every min_interval seconds.
+
+    The limiter is shared by every thread using the same fetcher, so concurrency never bypasses the polite rate.
+    """
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Function used to block until the caller is allowed to start its request"""
+        with self._lock:
+            request_slot = max(time.monotonic(), self._next_slot)
+            self._next_slot = request_slot + self.min_interval
+
+        delay = request_slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Fetcher:
+    """Class used to download pages through one pooled requests.Session with a bounded thread pool.
+
+    Args:
+        rate_limit_seconds (float): minimum number of seconds between the start of two requests
+        max_workers (int): maximum number of requests in flight, also used as the connection pool size
+        timeout (float): seconds to wait for a response before giving up
+        max_retries (int): number of retries for connection errors and 429/5xx responses
+        cache (ResponseCache): optional on-disk response cache, fresh entries are served without any network I/O
+    """
+
+    def __init__(self, rate_limit_seconds=0.0, max_workers=4, timeout=30, max_retries=3, cache=None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = RateLimiter(rate_limit_seconds)
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url, headers=None):
+        """Function used to send a single rate limited GET request and return the response"""
+        self.rate_limiter.wait()
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        return response
+
+    def fetch(self, url):
+        """Function used to download the content of a single URL"""
+        if self.cache is None:
+            response = self.get(url)
+            response.raise_for_status()
+            return response.content
+
+        cache_entry = self.cache.get(url)
+        if cache_entry is not None:
+            if self.cache.is_fresh(cache_entry):
+                content = self.cache.read(cache_entry)
+                if content is not None:
+                    return content
+            else:
+                # stale entry, ask the server whether our copy is still valid
+                response = self.get(url, headers=self.cache.revalidation_headers(cache_entry))
+                if response.status_code == 304:
+                    content = self.cache.read(cache_entry)
+                    if content is not None:
+                        self.cache.mark_revalidated(cache_entry)
+                        return content
+                    response = self.get(url)
+                response.raise_for_status()
+                self._store(url, response)
+                return response.content
+
+        response = self.get(url)
+        response.raise_for_status()
+        self._store(url, response)
+        return response.content
+
+    def _store(self, url, response):
+        self.cache.put(
+            url,
+            response.content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+    def fetch_many(self, urls):
+        """Function used to download several URLs concurrently.
+
+        Args:
+            urls (List): list of URLs to download
+
+        Returns:
+            contents (List): page contents in the same order as urls
+        """
+        urls = list(urls)
+        if len(urls) <= 1:
+            return [self.fetch(url) for url in urls]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            contents = list(executor.map(self.fetch, urls))
+        return contents
+
+    def close(self):
+        """Function used to close the pooled connections"""
+        self.session.close()
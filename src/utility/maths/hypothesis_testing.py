@@ -1,8 +1,77 @@
 """Script used for hypothesis testing"""
 
+import math
+from functools import lru_cache
+from statistics import NormalDist
+
 import numpy as np
+from scipy.special import fdtr, fdtrc, ndtr, stdtr
 from scipy.stats import f, fisher_exact, norm, t
 
+# number of (distribution, degrees of freedom, significance level, test type) critical values kept in memory
+CRITICAL_VALUE_CACHE_SIZE = 4096
+
+STANDARD_NORMAL = NormalDist(mu=0, sigma=1)
+SQRT_2 = math.sqrt(2)
+
+
+@lru_cache(maxsize=CRITICAL_VALUE_CACHE_SIZE)
+def get_distribution(distribution, degrees_of_freedom=None, degrees_of_freedom_denominator=None):
+    """Function used to get a frozen scipy distribution, memoised so repeated tests share it.
+
+    Args:
+        distribution (str): norm, t or f
+        degrees_of_freedom (float): degrees of freedom of t, numerator degrees of freedom of f
+        degrees_of_freedom_denominator (float): denominator degrees of freedom of f
+    """
+    if distribution == "norm":
+        return norm(loc=0, scale=1)
+    elif distribution == "t":
+        return t(df=degrees_of_freedom)
+    elif distribution == "f":
+        return f(degrees_of_freedom, degrees_of_freedom_denominator)
+    raise Exception(f"Unknown distribution {distribution}, use norm, t or f.")
+
+
+def get_dist_percentile(significance_level, test_type):
+    """Function used to get the upper percentile of the critical value of a symmetric test"""
+    if test_type == "two-sided":
+        return 1 - significance_level / 2
+    elif test_type in ["left-sided", "right-sided"]:
+        return 1 - significance_level
+    raise Exception(f"Unknown test type {test_type}, use two-sided, left-sided or right-sided.")
+
+
+@lru_cache(maxsize=CRITICAL_VALUE_CACHE_SIZE)
+def get_critical_value(
+    distribution, significance_level, test_type, degrees_of_freedom=None, degrees_of_freedom_denominator=None
+):
+    """Function used to get the critical value of a test, memoised on its arguments.
+
+    The normal critical value is computed in closed form without scipy. For norm and t the positive critical value is
+    returned and left-sided tests reject below minus that value. For f the value the statistic is compared with is
+    returned, or a (lower, upper) tuple for two-sided tests.
+    """
+    if distribution == "norm":
+        return STANDARD_NORMAL.inv_cdf(get_dist_percentile(significance_level, test_type))
+    elif distribution == "t":
+        return float(get_distribution("t", degrees_of_freedom).ppf(get_dist_percentile(significance_level, test_type)))
+
+    f_dist = get_distribution("f", degrees_of_freedom, degrees_of_freedom_denominator)
+    if test_type == "two-sided":
+        return float(f_dist.ppf(significance_level / 2)), float(f_dist.ppf(1 - significance_level / 2))
+    elif test_type == "left-sided":
+        return float(f_dist.ppf(significance_level))
+    return float(f_dist.ppf(get_dist_percentile(significance_level, test_type)))
+
+
+def get_upper_tail_prob(test_statistic_value, distribution, degrees_of_freedom=None):
+    """Function used to get 1 - cdf of a test statistic for the normal or t distribution, the normal one in closed
+    form"""
+    if distribution == "norm":
+        return 0.5 * math.erfc(test_statistic_value / SQRT_2)
+    return float(stdtr(degrees_of_freedom, -test_statistic_value))
+
 
 def one_sample_t_test(
     sample_mean,
@@ -13,27 +82,19 @@ def one_sample_t_test(
     test_type,
 ):
     """Function used to output whether we should accept or reject our hypothesis test for a one sample t-test."""
-    if test_type == "two-sided":
-        dist_percentile = (1 - significance_level) + (significance_level) / 2
-    elif test_type == "left-sided":
-        dist_percentile = 1 - significance_level
-    elif test_type == "right-sided":
-        dist_percentile = 1 - significance_level
-
     # test statistic
     test_statistic_value = (sample_mean - population_mean) / (population_std**2 / sample_size) ** 0.5
 
     # find critical values
     if sample_size > 29:
         # normally distributed # CLT
-        dist = norm(loc=0, scale=1)
+        distribution, degrees_of_freedom = "norm", None
     else:
-        degrees_of_freedom = sample_size - 1
         # t test
-        dist = t(df=degrees_of_freedom)
+        distribution, degrees_of_freedom = "t", sample_size - 1
 
-    critical_region = dist.ppf(dist_percentile)
-    test_statistic_prob = 1 - dist.cdf(abs(test_statistic_value))
+    critical_region = get_critical_value(distribution, significance_level, test_type, degrees_of_freedom)
+    test_statistic_prob = get_upper_tail_prob(abs(test_statistic_value), distribution, degrees_of_freedom)
 
     # reject or accept null hypothesis
     if test_type == "two-sided":
@@ -72,13 +133,6 @@ def two_sample_t_test(
     homogeneity=True,
 ):
     """Function used to output whether we should accept or reject our hypothesis test for two sample t-test."""
-    if test_type == "two-sided":
-        dist_percentile = (1 - significance_level) + (significance_level) / 2
-    elif test_type == "left-sided":
-        dist_percentile = 1 - significance_level
-    elif test_type == "right-sided":
-        dist_percentile = 1 - significance_level
-
     # calculate test statistic value
     if homogeneity:
         # assuming variance is the same for both samples
@@ -105,14 +159,13 @@ def two_sample_t_test(
     if (sample_size1 > 29) and (sample_size2 > 29):
         # CLT
         # normal distribution
-        dist = norm(loc=0, scale=1)
+        distribution, degrees_of_freedom = "norm", None
     else:
         # t distribution
-        degrees_of_freedom = sample_size1 + sample_size2 - 2
-        dist = t(df=degrees_of_freedom)
+        distribution, degrees_of_freedom = "t", sample_size1 + sample_size2 - 2
 
-    critical_region = dist.ppf(dist_percentile)
-    test_statistic_prob = 1 - dist.cdf(abs(test_statistic_value))
+    critical_region = get_critical_value(distribution, significance_level, test_type, degrees_of_freedom)
+    test_statistic_prob = get_upper_tail_prob(abs(test_statistic_value), distribution, degrees_of_freedom)
 
     # reject or accept null hypothesis
     if test_type == "two-sided":
@@ -148,14 +201,8 @@ def f_test_variance(
     significance_level,
     test_type,
 ):
-    """Function used to output whether we should accept or reject our hypothesis test for variance F-test."""
-    if test_type == "two-sided":
-        dist_percentile = 1 - (significance_level) / 2
-    elif test_type == "left-sided":
-        dist_percentile = significance_level
-    elif test_type == "right-sided":
-        dist_percentile = 1 - significance_level
-
+    """Function used to output whether we should accept or reject our hypothesis test for variance F-test.
+    For two-sided tests critical_region is a (lower, upper) tuple."""
     # calculate test statistic value
     test_statistic_value = sample_std1**2 / sample_std2**2
 
@@ -163,13 +210,10 @@ def f_test_variance(
     # degrees of freedom
     dfn = sample_size1 - 1
     dfd = sample_size2 - 1
-    f_dist = f(dfn, dfd)
+    critical_region = get_critical_value("f", significance_level, test_type, dfn, dfd)
 
     if test_type == "two-sided":
-        critical_region_right = f_dist.ppf(dist_percentile)
-        critical_region_left = f_dist.ppf(1 - dist_percentile)
-    else:
-        critical_region = f_dist.ppf(dist_percentile)
+        critical_region_left, critical_region_right = critical_region
 
     # reject or accept null hypothesis
     if test_type == "two-sided":
@@ -200,13 +244,6 @@ def two_sample_proportion_test(
 ):
     """Function used to output whether we should accept or reject our hypothesis test for
     two_sample_proportion_test."""
-    if test_type == "two-sided":
-        dist_percentile = 1 - (significance_level) / 2
-    elif test_type == "left-sided":
-        dist_percentile = significance_level
-    elif test_type == "right-sided":
-        dist_percentile = 1 - significance_level
-
     proportion1 = sample1_counts / sample_size1
     proportion2 = sample2_counts / sample_size2
     total_proportion = (sample1_counts + sample2_counts) / (sample_size1 + sample_size2)
@@ -220,13 +257,11 @@ def two_sample_proportion_test(
     if (sample_size1 > 29) and (sample_size2 > 29):
         # CLT
         # normal distribution
-        dist = norm(loc=0, scale=1)
-        critical_region = dist.ppf(dist_percentile)
+        critical_region = get_critical_value("norm", significance_level, test_type)
     else:
         raise Exception("Sample size too small for either sample 1 or two.")
 
-    critical_region = dist.ppf(dist_percentile)
-    test_statistic_prob = 1 - dist.cdf(abs(test_statistic_value))
+    test_statistic_prob = get_upper_tail_prob(abs(test_statistic_value), "norm")
 
     # reject or accept null hypothesis
     if test_type == "two-sided":
@@ -281,3 +316,293 @@ def fisher_exact_test(sample_size1, sample1_success, sample_size2, sample2_succe
         reject_status = "Insufficient evidence to reject null hypothesis."
 
     return test_statistic_value, p_value, reject_status
+
+
+# Batched tests -----------------------------------------------------------------------------------------------------
+# The batch_* functions run many comparisons at once on numpy arrays (scalars broadcast) and return arrays of test
+# statistics, critical values and p-values with a boolean reject mask, so scanning every team pair or every player
+# against the league mean is a handful of vectorised calls rather than thousands of scalar ones.
+
+MULTIPLE_COMPARISON_METHODS = [None, "bonferroni", "bh"]
+
+
+def get_comparison_significance_level(significance_level, no_comparisons, multiple_comparison=None):
+    """Function used to get the significance level each comparison is tested at, Bonferroni divides it by the number
+    of comparisons. Benjamini-Hochberg has no fixed per comparison level so the family level is returned."""
+    if multiple_comparison not in MULTIPLE_COMPARISON_METHODS:
+        raise Exception(f"Unknown multiple comparison method {multiple_comparison}, use bonferroni or bh.")
+    if multiple_comparison == "bonferroni":
+        return significance_level / max(no_comparisons, 1)
+    return significance_level
+
+
+def adjust_p_values(p_values, multiple_comparison=None):
+    """Function used to adjust p-values for multiple comparisons.
+
+    Args:
+        p_values (np.array): raw p-values, nan entries are left out of the number of comparisons
+        multiple_comparison (str): None, "bonferroni" (family-wise error rate) or "bh" (Benjamini-Hochberg false
+            discovery rate)
+
+    Returns:
+        adjusted_p_values (np.array): p-values to compare with the family significance level
+    """
+    if multiple_comparison not in MULTIPLE_COMPARISON_METHODS:
+        raise Exception(f"Unknown multiple comparison method {multiple_comparison}, use bonferroni or bh.")
+
+    p_values = np.asarray(p_values, dtype=float)
+    if multiple_comparison is None:
+        return p_values
+
+    adjusted_p_values = np.full(p_values.shape, np.nan)
+    tested = ~np.isnan(p_values)
+    tested_p_values = p_values[tested]
+    no_comparisons = tested_p_values.size
+
+    if multiple_comparison == "bonferroni":
+        adjusted_p_values[tested] = np.minimum(tested_p_values * no_comparisons, 1)
+    else:
+        # step-up: p(i) * m / i, made monotone from the largest p-value down
+        order = np.argsort(tested_p_values)
+        ranked_p_values = tested_p_values[order] * no_comparisons / np.arange(1, no_comparisons + 1)
+        ranked_p_values = np.minimum.accumulate(ranked_p_values[::-1])[::-1]
+
+        bh_p_values = np.empty(no_comparisons)
+        bh_p_values[order] = np.minimum(ranked_p_values, 1)
+        adjusted_p_values[tested] = bh_p_values
+
+    return adjusted_p_values
+
+
+def get_reject_mask(p_values, significance_level, multiple_comparison=None):
+    """Function used to get which comparisons reject their null hypothesis, nan p-values never reject"""
+    adjusted_p_values = adjust_p_values(p_values, multiple_comparison)
+    return np.nan_to_num(adjusted_p_values, nan=1.0) < significance_level
+
+
+def get_batch_p_values(cdf_values, sf_values, test_type):
+    """Function used to get p-values from the cdf and survival function evaluated at the test statistics"""
+    if test_type == "two-sided":
+        return np.minimum(2 * np.minimum(cdf_values, sf_values), 1)
+    elif test_type == "left-sided":
+        return cdf_values
+    elif test_type == "right-sided":
+        return sf_values
+    raise Exception(f"Unknown test type {test_type}, use two-sided, left-sided or right-sided.")
+
+
+def get_batch_z_or_t_results(
+    test_statistic_values, use_normal, degrees_of_freedom, significance_level, test_type, multiple_comparison
+):
+    """Function used to get critical values, p-values and the reject mask of z or t statistics.
+
+    Like the scalar tests, comparisons where use_normal is True are tested against the standard normal (CLT) and the
+    others against a t distribution with degrees_of_freedom.
+    """
+    test_statistic_values = np.asarray(test_statistic_values, dtype=float)
+    use_normal, degrees_of_freedom = np.broadcast_arrays(use_normal, degrees_of_freedom)
+    use_normal = np.broadcast_to(use_normal, test_statistic_values.shape)
+    degrees_of_freedom = np.broadcast_to(degrees_of_freedom, test_statistic_values.shape).astype(float)
+
+    comparison_significance_level = get_comparison_significance_level(
+        significance_level, np.count_nonzero(~np.isnan(test_statistic_values)), multiple_comparison
+    )
+    # t is only evaluated where needed, its df must be positive
+    t_degrees_of_freedom = np.where(use_normal, 1, degrees_of_freedom)
+
+    # rolling window scans repeat a few degrees of freedom many times, so critical values come from the cache
+    unique_degrees_of_freedom, degrees_of_freedom_index = np.unique(t_degrees_of_freedom, return_inverse=True)
+    t_critical_regions = np.array(
+        [
+            get_critical_value("t", comparison_significance_level, test_type, float(unique_df))
+            for unique_df in unique_degrees_of_freedom
+        ]
+    )
+    critical_regions = np.where(
+        use_normal,
+        get_critical_value("norm", comparison_significance_level, test_type),
+        t_critical_regions[degrees_of_freedom_index].reshape(test_statistic_values.shape),
+    )
+
+    # special functions skip the argument checking of scipy distributions
+    cdf_values = np.where(use_normal, ndtr(test_statistic_values), stdtr(t_degrees_of_freedom, test_statistic_values))
+    sf_values = np.where(use_normal, ndtr(-test_statistic_values), stdtr(t_degrees_of_freedom, -test_statistic_values))
+
+    p_values = get_batch_p_values(cdf_values, sf_values, test_type)
+    reject_mask = get_reject_mask(p_values, significance_level, multiple_comparison)
+    return critical_regions, p_values, reject_mask
+
+
+def batch_one_sample_t_test(
+    sample_means,
+    sample_sizes,
+    population_mean,
+    population_std,
+    significance_level,
+    test_type,
+    multiple_comparison=None,
+):
+    """Function used to run one sample t-tests over arrays of samples, e.g. every player against the league mean.
+
+    Args:
+        sample_means (np.array): sample means
+        sample_sizes (np.array): sample sizes, samples above 29 use the normal distribution as in one_sample_t_test
+        population_mean (float or np.array): population mean(s)
+        population_std (float or np.array): population standard deviation(s)
+        significance_level (float): family significance level
+        test_type (str): two-sided, left-sided or right-sided
+        multiple_comparison (str): None, "bonferroni" or "bh"
+
+    Returns:
+        test_statistic_values (np.array): test statistics
+        critical_regions (np.array): critical values at the per comparison level (significance_level divided by the
+            number of comparisons for bonferroni)
+        p_values (np.array): unadjusted p-values
+        reject_mask (np.array): True where the null hypothesis is rejected after the multiple comparison correction
+    """
+    sample_means = np.asarray(sample_means, dtype=float)
+    sample_sizes = np.asarray(sample_sizes, dtype=float)
+
+    test_statistic_values = (sample_means - population_mean) / (np.asarray(population_std) ** 2 / sample_sizes) ** 0.5
+    critical_regions, p_values, reject_mask = get_batch_z_or_t_results(
+        test_statistic_values, sample_sizes > 29, sample_sizes - 1, significance_level, test_type, multiple_comparison
+    )
+    return test_statistic_values, critical_regions, p_values, reject_mask
+
+
+def batch_two_sample_t_test(
+    sample_means1,
+    sample_stds1,
+    sample_sizes1,
+    sample_means2,
+    sample_stds2,
+    sample_sizes2,
+    significance_level,
+    test_type,
+    homogeneity=True,
+    multiple_comparison=None,
+):
+    """Function used to run two sample t-tests over arrays of sample pairs, e.g. every team pair of a league.
+
+    Args follow two_sample_t_test with arrays in place of scalars, plus multiple_comparison (None, "bonferroni" or
+    "bh"). Returns test statistics, critical values, p-values and the reject mask as batch_one_sample_t_test.
+    """
+    sample_means1, sample_stds1, sample_sizes1, sample_means2, sample_stds2, sample_sizes2 = (
+        np.asarray(values, dtype=float)
+        for values in [sample_means1, sample_stds1, sample_sizes1, sample_means2, sample_stds2, sample_sizes2]
+    )
+
+    if homogeneity:
+        # pooled variance
+        sample_variance_estimation = (
+            (sample_sizes1 - 1) * sample_stds1**2 + (sample_sizes2 - 1) * sample_stds2**2
+        ) / (sample_sizes1 + sample_sizes2 - 2)
+        test_statistic_variance = sample_variance_estimation * (1 / sample_sizes1 + 1 / sample_sizes2)
+    else:
+        test_statistic_variance = sample_stds1**2 / sample_sizes1 + sample_stds2**2 / sample_sizes2
+
+    test_statistic_values = (sample_means1 - sample_means2) / test_statistic_variance**0.5
+    critical_regions, p_values, reject_mask = get_batch_z_or_t_results(
+        test_statistic_values,
+        (sample_sizes1 > 29) & (sample_sizes2 > 29),
+        sample_sizes1 + sample_sizes2 - 2,
+        significance_level,
+        test_type,
+        multiple_comparison,
+    )
+    return test_statistic_values, critical_regions, p_values, reject_mask
+
+
+def batch_two_sample_proportion_test(
+    sample_sizes1,
+    sample1_counts,
+    sample_sizes2,
+    sample2_counts,
+    significance_level,
+    test_type,
+    multiple_comparison=None,
+):
+    """Function used to run pooled two sample proportion tests over arrays of sample pairs.
+
+    Comparisons where either sample has 29 or fewer observations get nan results and are never rejected (use
+    fisher_exact_test for those), instead of raising as two_sample_proportion_test does. Returns test statistics,
+    critical values, p-values and the reject mask as batch_one_sample_t_test.
+    """
+    sample_sizes1, sample1_counts, sample_sizes2, sample2_counts = (
+        np.asarray(values, dtype=float) for values in [sample_sizes1, sample1_counts, sample_sizes2, sample2_counts]
+    )
+
+    total_proportion = (sample1_counts + sample2_counts) / (sample_sizes1 + sample_sizes2)
+    test_statistic_value_denom = (
+        total_proportion * (1 - total_proportion) * (1 / sample_sizes1 + 1 / sample_sizes2)
+    ) ** 0.5
+    test_statistic_values = (
+        sample1_counts / sample_sizes1 - sample2_counts / sample_sizes2
+    ) / test_statistic_value_denom
+    test_statistic_values = np.where((sample_sizes1 > 29) & (sample_sizes2 > 29), test_statistic_values, np.nan)
+
+    critical_regions, p_values, reject_mask = get_batch_z_or_t_results(
+        test_statistic_values, True, 1, significance_level, test_type, multiple_comparison
+    )
+    return test_statistic_values, critical_regions, p_values, reject_mask
+
+
+def batch_f_test_variance(
+    sample_stds1,
+    sample_sizes1,
+    sample_stds2,
+    sample_sizes2,
+    significance_level,
+    test_type,
+    multiple_comparison=None,
+):
+    """Function used to run variance F-tests over arrays of sample pairs.
+
+    The F distribution is not symmetric so both critical values are returned, the lower one is 0 for right-sided
+    tests and the upper one is inf for left-sided tests.
+
+    Returns:
+        test_statistic_values (np.array): variance ratios
+        critical_regions_lower (np.array): reject below this value
+        critical_regions_upper (np.array): reject above this value
+        p_values (np.array): unadjusted p-values
+        reject_mask (np.array): True where the null hypothesis is rejected after the multiple comparison correction
+    """
+    sample_stds1, sample_sizes1, sample_stds2, sample_sizes2 = (
+        np.asarray(values, dtype=float) for values in [sample_stds1, sample_sizes1, sample_stds2, sample_sizes2]
+    )
+
+    test_statistic_values = sample_stds1**2 / sample_stds2**2
+    dfn = sample_sizes1 - 1
+    dfd = sample_sizes2 - 1
+
+    comparison_significance_level = get_comparison_significance_level(
+        significance_level, np.count_nonzero(~np.isnan(test_statistic_values)), multiple_comparison
+    )
+    tail_significance_level = (
+        comparison_significance_level / 2 if test_type == "two-sided" else comparison_significance_level
+    )
+
+    # lower and upper critical values of every distinct pair of degrees of freedom, from the cache
+    dfn, dfd = np.broadcast_arrays(dfn, dfd, test_statistic_values)[:2]
+    unique_df_pairs, df_pair_index = np.unique(
+        np.stack([dfn.ravel(), dfd.ravel()], axis=1), axis=0, return_inverse=True
+    )
+    pair_critical_regions = np.array(
+        [
+            get_critical_value("f", 2 * tail_significance_level, "two-sided", float(pair_dfn), float(pair_dfd))
+            for pair_dfn, pair_dfd in unique_df_pairs
+        ]
+    ).reshape(-1, 2)
+    critical_regions_lower = pair_critical_regions[df_pair_index.ravel(), 0].reshape(test_statistic_values.shape)
+    critical_regions_upper = pair_critical_regions[df_pair_index.ravel(), 1].reshape(test_statistic_values.shape)
+    if test_type == "right-sided":
+        critical_regions_lower = np.zeros(test_statistic_values.shape)
+    elif test_type == "left-sided":
+        critical_regions_upper = np.full(test_statistic_values.shape, np.inf)
+
+    p_values = get_batch_p_values(
+        fdtr(dfn, dfd, test_statistic_values), fdtrc(dfn, dfd, test_statistic_values), test_type
+    )
+    reject_mask = get_reject_mask(p_values, significance_level, multiple_comparison)
+    return test_statistic_values, critical_regions_lower, critical_regions_upper, p_values, reject_mask
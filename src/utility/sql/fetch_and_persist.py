@@ -1,48 +1,318 @@
 """Script used to fetch and persist to db."""
 
+import io
 import os
+import threading
+import uuid
 
 import pandas as pd
 import sqlalchemy as db
-from sqlalchemy.sql import text
+from psycopg2 import sql
+from sqlalchemy.dialects.postgresql import insert
 
+COPY_CHUNK_SIZE = 100_000
+QUERY_CHUNK_SIZE = 50_000
+DB_POOL_SIZE = int(os.environ.get("POSTGRES_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("POSTGRES_MAX_OVERFLOW", 10))
+DB_POOL_PRE_PING = os.environ.get("POSTGRES_POOL_PRE_PING", "true").lower() in ["1", "true", "yes"]
 
-def create_db_engine(db_user, db_password, db_host, db_port, db_name):
+# postgres type oids of columns typed on read, text columns ending in _id become categoricals
+PG_OID_DTYPES = {
+    16: "boolean",
+    20: "Int64",
+    21: "Int64",
+    23: "Int64",
+    700: "float64",
+    701: "float64",
+    1700: "float64",
+}
+PG_TIMESTAMP_OIDS = [1114, 1184]
+PG_TEXT_OIDS = [18, 25, 1042, 1043]
+
+_db_engines = {}
+_db_engines_lock = threading.Lock()
+
+
+def create_db_engine(db_user, db_password, db_host, db_port, db_name, **engine_kwargs):
     """Function used to create a db engine"""
-    engine = db.create_engine(f"postgresql+psycopg2://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}")
+    engine = db.create_engine(
+        f"postgresql+psycopg2://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}", **engine_kwargs
+    )
     return engine
 
 
-def query_db(query_text, engine=None):
-    """Function used to query data from db."""
+def get_db_dsn():
+    """Function used to build the db connection string from the POSTGRES_* environment variables"""
+    return (
+        f"postgresql+psycopg2://{os.environ.get('POSTGRES_USER')}:{os.environ.get('POSTGRES_PASS')}"
+        f"@{os.environ.get('POSTGRES_HOST')}:{os.environ.get('POSTGRES_PORT')}/{os.environ.get('POSTGRES_DB')}"
+    )
+
+
+def get_db_engine(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_pre_ping=DB_POOL_PRE_PING):
+    """Function used to get the process wide engine for the db in the POSTGRES_* environment variables.
+
+    Engines are created once per connection string and process, so repeated queries reuse pooled connections instead
+    of connecting from scratch. Pool settings only apply when the engine is first created. Keying on the process id
+    keeps forked workers from sharing the parent's connections.
+    """
+    engine_key = (get_db_dsn(), os.getpid())
+
+    with _db_engines_lock:
+        if engine_key not in _db_engines:
+            _db_engines[engine_key] = db.create_engine(
+                engine_key[0], pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=pool_pre_ping
+            )
+        return _db_engines[engine_key]
+
+
+def dispose_db_engines():
+    """Function used to close the pooled connections of every engine created by get_db_engine"""
+    with _db_engines_lock:
+        for engine in _db_engines.values():
+            engine.dispose()
+        _db_engines.clear()
+
+
+def get_typed_df(rows, cursor_description, categorical_columns=None):
+    """Function used to build a dataframe from fetched rows, typed from the postgres column types.
+
+    Args:
+        rows (List): row tuples from the cursor
+        cursor_description (tuple): cursor description, holding the name and type oid of each column
+        categorical_columns (List): text columns to store as categoricals, None for every text column ending in _id
+
+    Returns:
+        db_table_df (pandas.DataFrame): typed dataframe, integer columns are nullable Int64
+    """
+    column_names = [column.name for column in cursor_description]
+    db_table_df = pd.DataFrame.from_records(rows, columns=column_names, coerce_float=True)
+
+    for column in cursor_description:
+        if column.type_code in PG_TIMESTAMP_OIDS:
+            db_table_df[column.name] = pd.to_datetime(db_table_df[column.name], utc=column.type_code == 1184)
+        elif column.type_code in PG_OID_DTYPES:
+            db_table_df[column.name] = db_table_df[column.name].astype(PG_OID_DTYPES[column.type_code])
+        elif column.type_code in PG_TEXT_OIDS:
+            is_categorical = (
+                column.name.endswith("_id") if categorical_columns is None else column.name in categorical_columns
+            )
+            if is_categorical:
+                db_table_df[column.name] = db_table_df[column.name].astype("category")
 
+    return db_table_df
+
+
+def iter_query_rows(query_text, engine=None, chunk_size=QUERY_CHUNK_SIZE):
+    """Function used to stream query results from a server side cursor, chunk_size rows at a time.
+
+    Yields:
+        rows, cursor_description (tuple): row tuples of the chunk and the cursor description, the first chunk is
+        yielded even when the query returns no rows
+    """
     if engine is None:
-        engine = create_db_engine(
-            db_user=os.environ.get("POSTGRES_USER"),
-            db_password=os.environ.get("POSTGRES_PASS"),
-            db_host=os.environ.get("POSTGRES_HOST"),
-            db_port=os.environ.get("POSTGRES_PORT"),
-            db_name=os.environ.get("POSTGRES_DB"),
-        )
-
-    with engine.connect().execution_options(autocommit=True) as conn:
-        query = conn.execute(text(query_text))
-
-    db_table_df = pd.DataFrame(query.fetchall())
+        engine = get_db_engine()
+
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor(name=f"query_db_{uuid.uuid4().hex[:8]}") as cursor:
+            cursor.itersize = chunk_size
+            cursor.execute(query_text)
+
+            rows = cursor.fetchmany(chunk_size)
+            yield rows, cursor.description
+            while len(rows) == chunk_size:
+                rows = cursor.fetchmany(chunk_size)
+                if rows:
+                    yield rows, cursor.description
+    finally:
+        connection.rollback()
+        connection.close()
+
+
+def iter_query_db(query_text, engine=None, chunk_size=QUERY_CHUNK_SIZE, categorical_columns=None):
+    """Function used to query data from db as a generator of typed dataframes of at most chunk_size rows.
+
+    Only one chunk is held in memory at a time. Categories are set per chunk, so categorical columns may need
+    union_categoricals if chunks are combined.
+    """
+    for rows, cursor_description in iter_query_rows(query_text, engine=engine, chunk_size=chunk_size):
+        yield get_typed_df(rows, cursor_description, categorical_columns)
+
+
+def query_db(query_text, engine=None, chunk_size=QUERY_CHUNK_SIZE, categorical_columns=None):
+    """Function used to query data from db.
+
+    Rows are streamed from a server side cursor and typed from the postgres column types, see get_typed_df.
+    """
+    rows = []
+    cursor_description = None
+    for chunk_rows, cursor_description in iter_query_rows(query_text, engine=engine, chunk_size=chunk_size):
+        rows.extend(chunk_rows)
+
+    db_table_df = get_typed_df(rows, cursor_description, categorical_columns)
     return db_table_df
 
 
-def persist_to_db(df_to_persist, table_name, schema_name, engine=None):
-    """Function used to persist data to db"""
+def get_insert_on_conflict_method(on_conflict, conflict_columns=None):
+    """Function used to create a pandas to_sql insert method that lets postgres resolve duplicate keys.
+
+    Args:
+        on_conflict (str): "do_nothing" to skip rows whose key already exists, "update" to overwrite them
+        conflict_columns (List): key columns of the conflict target, required for "update"
+    """
+    if on_conflict not in ["do_nothing", "update"]:
+        raise Exception("Input on_conflict invalid.")
+    if on_conflict == "update" and not conflict_columns:
+        raise Exception("conflict_columns needed to update rows on conflict.")
+
+    def insert_on_conflict(pandas_table, conn, keys, data_iter):
+        rows = [dict(zip(keys, row)) for row in data_iter]
+        insert_statement = insert(pandas_table.table).values(rows)
+
+        if on_conflict == "do_nothing":
+            insert_statement = insert_statement.on_conflict_do_nothing(index_elements=conflict_columns)
+        else:
+            insert_statement = insert_statement.on_conflict_do_update(
+                index_elements=conflict_columns,
+                set_={key: insert_statement.excluded[key] for key in keys if key not in conflict_columns},
+            )
+        return conn.execute(insert_statement).rowcount
+
+    return insert_on_conflict
+
+
+def persist_to_db(df_to_persist, table_name, schema_name, engine=None, on_conflict=None, conflict_columns=None):
+    """Function used to persist data to db
+
+    Args:
+        on_conflict (str): None for plain inserts, "do_nothing" or "update" to let postgres deduplicate on the key
+        conflict_columns (List): key columns used when on_conflict is "update"
+    """
 
     if engine is None:
-        engine = create_db_engine(
-            db_user=os.environ.get("POSTGRES_USER"),
-            db_password=os.environ.get("POSTGRES_PASS"),
-            db_host=os.environ.get("POSTGRES_HOST"),
-            db_port=os.environ.get("POSTGRES_PORT"),
-            db_name=os.environ.get("POSTGRES_DB"),
-        )
-
-    df_to_persist.to_sql(table_name, con=engine, schema=schema_name, if_exists="append", index=False)
+        engine = get_db_engine()
+
+    if on_conflict is None:
+        insert_method = None
+    else:
+        insert_method = get_insert_on_conflict_method(on_conflict, conflict_columns)
+
+    df_to_persist.to_sql(
+        table_name, con=engine, schema=schema_name, if_exists="append", index=False, method=insert_method
+    )
     print("Data Persisted")
+
+
+def get_copy_ready_df(df_to_persist):
+    """Function used to prepare a dataframe to be written as CSV for COPY.
+
+    Float columns holding only whole numbers (integer columns that picked up NaN) are written as integers, as
+    postgres does not accept "1.0" for integer columns in COPY.
+    """
+    copy_ready_df = df_to_persist.copy()
+    for column in copy_ready_df.select_dtypes(include=["float"]).columns:
+        non_null_values = copy_ready_df[column].dropna()
+        if (non_null_values % 1 == 0).all():
+            copy_ready_df[column] = copy_ready_df[column].astype("Int64")
+    return copy_ready_df
+
+
+def copy_df_chunks(cursor, df_to_persist, target_table, chunk_size):
+    """Function used to stream a dataframe into a table with COPY FROM STDIN, chunk_size rows at a time"""
+    copy_statement = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL '\\N')").format(
+        target_table, sql.SQL(", ").join(sql.Identifier(column) for column in df_to_persist.columns)
+    )
+
+    for chunk_start in range(0, len(df_to_persist), chunk_size):
+        chunk_end = chunk_start + chunk_size
+        csv_buffer = io.StringIO()
+        df_to_persist.iloc[chunk_start:chunk_end].to_csv(csv_buffer, index=False, header=False, na_rep="\\N")
+        csv_buffer.seek(0)
+        cursor.copy_expert(copy_statement, csv_buffer)
+
+
+def copy_to_db(
+    df_to_persist,
+    table_name,
+    schema_name,
+    engine=None,
+    chunk_size=COPY_CHUNK_SIZE,
+    on_conflict=None,
+    conflict_columns=None,
+):
+    """Function used to bulk persist data to db with postgres COPY, much faster than to_sql inserts.
+
+    With on_conflict set, rows are copied into a temporary staging table and then merged into the target table with
+    INSERT ... ON CONFLICT, in a single transaction.
+
+    Args:
+        df_to_persist (pandas.DataFrame): data to persist, column names must match the table
+        table_name (str): target table
+        schema_name (str): schema of the target table
+        engine (sqlalchemy.engine.Engine): db engine
+        chunk_size (int): number of rows sent per COPY
+        on_conflict (str): None for a plain COPY, "do_nothing" or "update" to merge through a staging table
+        conflict_columns (List): key columns of the conflict target, required for "update"
+
+    Returns:
+        no_rows (int): number of rows copied
+    """
+    if on_conflict not in [None, "do_nothing", "update"]:
+        raise Exception("Input on_conflict invalid.")
+    if on_conflict == "update" and not conflict_columns:
+        raise Exception("conflict_columns needed to update rows on conflict.")
+
+    if engine is None:
+        engine = get_db_engine()
+
+    if len(df_to_persist) == 0:
+        return 0
+
+    copy_ready_df = get_copy_ready_df(df_to_persist)
+    target_table = sql.Identifier(schema_name, table_name)
+    columns = sql.SQL(", ").join(sql.Identifier(column) for column in copy_ready_df.columns)
+
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            if on_conflict is None:
+                copy_df_chunks(cursor, copy_ready_df, target_table, chunk_size)
+            else:
+                staging_table = sql.Identifier(f"staging_{table_name}_{uuid.uuid4().hex[:8]}")
+                cursor.execute(
+                    sql.SQL("CREATE TEMP TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP").format(
+                        staging_table, target_table
+                    )
+                )
+                copy_df_chunks(cursor, copy_ready_df, staging_table, chunk_size)
+
+                conflict_target = sql.SQL("")
+                if conflict_columns:
+                    conflict_target = sql.SQL("({})").format(
+                        sql.SQL(", ").join(sql.Identifier(column) for column in conflict_columns)
+                    )
+
+                update_columns = [column for column in copy_ready_df.columns if column not in (conflict_columns or [])]
+                if on_conflict == "update" and update_columns:
+                    conflict_action = sql.SQL("DO UPDATE SET {}").format(
+                        sql.SQL(", ").join(
+                            sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(column)) for column in update_columns
+                        )
+                    )
+                else:
+                    conflict_action = sql.SQL("DO NOTHING")
+
+                cursor.execute(
+                    sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {} ON CONFLICT {} {}").format(
+                        target_table, columns, columns, staging_table, conflict_target, conflict_action
+                    )
+                )
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    return len(copy_ready_df)
@@ -0,0 +1,38 @@
+"""Random results in the results layout, shared by the tests of the football engines."""
+
+import numpy as np
+import pandas as pd
+
+from src.utility.football.results import RESULTS_COLUMNS, sort_results
+
+TEAMS = ["Arsenal", "Chelsea", "Everton", "Fulham", "Leeds", "Spurs"]
+
+
+def get_round_robin_fixtures(teams):
+    """Function used to get the (home team, away team) fixtures of a double round robin, round by round"""
+    rotating_teams = list(teams)
+    first_half_rounds = []
+    for _ in range(len(teams) - 1):
+        half_no = len(teams) // 2
+        first_half_rounds.append(list(zip(rotating_teams[:half_no], reversed(rotating_teams[half_no:]))))
+        rotating_teams = [rotating_teams[0], rotating_teams[-1]] + rotating_teams[1:-1]
+    second_half_rounds = [
+        [(away_team, home_team) for home_team, away_team in round_fixtures] for round_fixtures in first_half_rounds
+    ]
+    return first_half_rounds + second_half_rounds
+
+
+def get_results_df(seed=0, teams=TEAMS, competition="9", first_kickoff="2022-08-06 15:00"):
+    """Function used to build a season of random results, one round a week, some fixtures without xg"""
+    rng = np.random.default_rng(seed)
+    fixture_rows = []
+    for round_no, round_fixtures in enumerate(get_round_robin_fixtures(teams)):
+        kickoff = pd.Timestamp(first_kickoff) + pd.Timedelta(weeks=round_no)
+        for home_team, away_team in round_fixtures:
+            home_goals, away_goals = rng.poisson([1.5, 1.1])
+            home_xg, away_xg = rng.gamma(2.0, 0.7, size=2) if rng.random() < 0.8 else (np.nan, np.nan)
+            fixture_rows.append(
+                [competition, "2022-2023", kickoff, home_team, away_team, home_goals, away_goals, home_xg, away_xg]
+            )
+    results_df = pd.DataFrame(fixture_rows, columns=RESULTS_COLUMNS)
+    return sort_results(results_df.astype({"home_goals": float, "away_goals": float}))
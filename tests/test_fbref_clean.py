@@ -0,0 +1,93 @@
+"""Parity tests of the fbref clean functions on saved FBref pages.
+
+The expected frames in fixtures/fbref/expected were written by the clean functions before they were vectorized, so
+any change in the cleaned output of a table fails here.
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+import src.fbref.etl.clean as fbref_clean
+from src.fbref.config.fbref_config import BIG5_PLAYER_TABLE_SCHEMAS, HTML_PARSER_BACKEND
+from src.fbref.etl.page import FBrefPage
+from src.fbref.fbref_class import FBref
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "fbref")
+EXPECTED_DIR = os.path.join(FIXTURES_DIR, "expected")
+
+# table name -> (page, table id, clean function) of the season stats tables
+SEASON_TABLE_CASES = {
+    "league_table": ("season_stats.html", "results2021-202291_overall", "clean_league_table_df"),
+    "defense_table": ("season_stats.html", "stats_squads_defense_for", "clean_defense_table"),
+    "possession_table": ("season_stats.html", "stats_squads_possession_for", "clean_possession_table"),
+}
+MATCH_REPORT_URL = "https://fbref.com/en/matches/0000abcd/Arsenal-Manchester-City"
+MATCH_REPORT_TEAM_IDS = ["18bb7c10", "b8fd03ef"]
+MATCH_REPORT_STATS = ["summary", "passing", "passing_types", "defense", "possession", "misc"]
+
+
+def read_fixture_page(file_name, url=None):
+    """Function used to parse a saved page"""
+    with open(os.path.join(FIXTURES_DIR, file_name), "rb") as page_file:
+        return FBrefPage(url or file_name, page_file.read(), HTML_PARSER_BACKEND)
+
+
+def get_raw_table_df(file_name, table_id, expected_attribute_no=None):
+    """Function used to read one table of a saved page the way FBref does before cleaning"""
+    page = read_fixture_page(file_name)
+    return FBref().get_fbref_df(page.get_parsed_table(table_id), expected_attribute_no)
+
+
+def get_raw_tables():
+    """Function used to get every raw table of the saved pages
+
+    Returns:
+        raw_table_dict (dict): table name -> (clean function name, raw dataframe, extra clean arguments)
+    """
+    raw_table_dict = {}
+    for table_name, (file_name, table_id, clean_function_name) in SEASON_TABLE_CASES.items():
+        raw_table_dict[table_name] = (clean_function_name, get_raw_table_df(file_name, table_id), ())
+
+    for stat_type, table_schema in BIG5_PLAYER_TABLE_SCHEMAS.items():
+        raw_df = get_raw_table_df(f"big5_{stat_type}.html", table_schema["table_id"], expected_attribute_no=0)
+        raw_table_dict[f"player_{stat_type}"] = ("clean_player_stat_table", raw_df, (stat_type,))
+
+    # the stat tables of each team of the match report merged on their player columns
+    fixture_page = read_fixture_page("match_report.html", MATCH_REPORT_URL)
+    fixture_stat_dict = FBref().get_fixture_stats(MATCH_REPORT_URL, *MATCH_REPORT_TEAM_IDS, fixture_page=fixture_page)
+    for team_id in MATCH_REPORT_TEAM_IDS:
+        team_stat_dfs = [
+            fixture_stat_dict[stat].loc[fixture_stat_dict[stat].team_id == team_id].drop(columns="team_id")
+            for stat in MATCH_REPORT_STATS
+        ]
+        full_match_stat_df = team_stat_dfs[0]
+        for team_stat_df in team_stat_dfs[1:]:
+            full_match_stat_df = full_match_stat_df.merge(team_stat_df)
+        raw_table_dict[f"match_report_{team_id}"] = ("clean_full_match_stat_df", full_match_stat_df, ())
+    return raw_table_dict
+
+
+def get_cleaned_tables(clean_module=fbref_clean):
+    """Function used to clean every raw table of the saved pages with the clean functions of clean_module"""
+    return {
+        table_name: getattr(clean_module, clean_function_name)(raw_df, *clean_args)
+        for table_name, (clean_function_name, raw_df, clean_args) in get_raw_tables().items()
+    }
+
+
+@pytest.fixture(scope="module")
+def cleaned_tables():
+    return get_cleaned_tables()
+
+
+@pytest.mark.parametrize(
+    "table_name",
+    list(SEASON_TABLE_CASES)
+    + [f"player_{stat_type}" for stat_type in BIG5_PLAYER_TABLE_SCHEMAS]
+    + [f"match_report_{team_id}" for team_id in MATCH_REPORT_TEAM_IDS],
+)
+def test_clean_matches_expected(cleaned_tables, table_name):
+    expected_df = pd.read_parquet(os.path.join(EXPECTED_DIR, f"{table_name}.parquet"))
+    pd.testing.assert_frame_equal(cleaned_tables[table_name], expected_df)
@@ -0,0 +1,66 @@
+"""Tests of the retries of match report downloads."""
+
+import pytest
+import requests
+
+from src.fbref.etl import harvest
+
+
+class FailingFetcher:
+    """Fetcher raising the given errors in turn before returning a page"""
+
+    def __init__(self, fetch_errors):
+        self.fetch_errors = list(fetch_errors)
+        self.no_calls = 0
+
+    def fetch(self, url):
+        self.no_calls += 1
+        if self.fetch_errors:
+            raise self.fetch_errors.pop(0)
+        return b"<html></html>"
+
+
+def get_http_error(status_code):
+    """Function used to build the error raised by raise_for_status for a status code"""
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(response=response)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(harvest.time, "sleep", lambda seconds: None)
+
+
+@pytest.mark.parametrize(
+    "fetch_error",
+    [
+        requests.ConnectionError(),
+        requests.Timeout(),
+        requests.exceptions.RetryError(),
+        get_http_error(429),
+        get_http_error(503),
+    ],
+)
+def test_transient_errors_are_retried(fetch_error):
+    fetcher = FailingFetcher([fetch_error])
+
+    assert harvest.fetch_with_retries(fetcher, "url", max_attempts=3) == b"<html></html>"
+    assert fetcher.no_calls == 2
+
+
+@pytest.mark.parametrize("fetch_error", [get_http_error(404), get_http_error(403), ValueError()])
+def test_other_errors_are_raised_straight_away(fetch_error):
+    fetcher = FailingFetcher([fetch_error])
+
+    with pytest.raises(type(fetch_error)):
+        harvest.fetch_with_retries(fetcher, "url", max_attempts=3)
+    assert fetcher.no_calls == 1
+
+
+def test_last_attempt_error_is_raised():
+    fetcher = FailingFetcher([requests.Timeout()] * 3)
+
+    with pytest.raises(requests.Timeout):
+        harvest.fetch_with_retries(fetcher, "url", max_attempts=3)
+    assert fetcher.no_calls == 3
@@ -0,0 +1,51 @@
+"""Tests of the parquet lake of cleaned FBref tables."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from src.fbref.etl.lake import (
+    compact_lake_partition,
+    get_lake_partition_dir,
+    read_lake_table,
+    write_lake_table,
+)
+
+
+@pytest.fixture
+def lake_dir(tmp_path):
+    return str(tmp_path / "lake")
+
+
+def test_compact_partition_keeps_every_row(lake_dir):
+    # part-0 is one of the parts being merged and the name of the compacted file
+    for part_no in range(3):
+        fixture_df = pd.DataFrame({"fixture_id": [f"fixture{part_no}"] * 2, "minutes": [90, 45]})
+        write_lake_table(fixture_df, "match_summary", "9", "2022-2023", part_name=f"part-{part_no}", lake_dir=lake_dir)
+
+    compact_lake_partition("match_summary", "9", "2022-2023", lake_dir)
+
+    assert os.listdir(get_lake_partition_dir("match_summary", "9", "2022-2023", lake_dir)) == ["part-0.parquet"]
+    table_df = read_lake_table("match_summary", lake_dir=lake_dir)
+    assert sorted(table_df.fixture_id) == sorted(f"fixture{part_no}" for part_no in range(3) for _ in range(2))
+
+
+def test_read_seasons_with_different_column_types(lake_dir):
+    # a column is int64 in one season and double in the other, e.g. when a season has missing values
+    write_lake_table(
+        pd.DataFrame({"player_name": ["A"], "goals": [3]}), "big5_standard", "Big5", "2021-2022", lake_dir=lake_dir
+    )
+    write_lake_table(
+        pd.DataFrame({"player_name": ["B", "C"], "goals": [1.0, None]}),
+        "big5_standard",
+        "Big5",
+        "2022-2023",
+        lake_dir=lake_dir,
+    )
+
+    table_df = read_lake_table("big5_standard", lake_dir=lake_dir)
+
+    assert table_df.goals.dtype == "float64"
+    assert sorted(table_df.player_name) == ["A", "B", "C"]
+    assert table_df.goals.sum() == 4
@@ -0,0 +1,66 @@
+"""Tests of the incremental fixture sync watermark."""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.fbref.etl.db.clean import (
+    filter_fixtures_after_watermark,
+    get_fixture_watermarks,
+)
+
+COMPETITION_SEASONS_ID = 2022202391
+
+
+def get_fixtures_df(fixture_scores):
+    """Function used to build cleaned fixtures of one competition season, one a day from fixture_scores"""
+    return pd.DataFrame(
+        {
+            "fixture_id": [f"{fixture_no:08d}" for fixture_no in range(len(fixture_scores))],
+            "competition_seasons_id": COMPETITION_SEASONS_ID,
+            "kickoff": [
+                datetime.datetime(2022, 8, 1, 15) + datetime.timedelta(days=fixture_no)
+                for fixture_no in range(len(fixture_scores))
+            ],
+            "home_score": [home_score for home_score, _ in fixture_scores],
+            "away_score": [away_score for _, away_score in fixture_scores],
+        }
+    )
+
+
+def sync_fixtures(fixtures_df, watermarks_df):
+    """Function used to run one incremental sync, returning the fixtures persisted and the new watermarks"""
+    persisted_fixtures_df = filter_fixtures_after_watermark(fixtures_df, watermarks_df)
+    return persisted_fixtures_df, get_fixture_watermarks(fixtures_df)
+
+
+def test_fixture_scored_after_sync_is_synced_later():
+    # the second fixture has no score yet at the first sync while later ones do
+    first_sync_df = get_fixtures_df([(1, 0), (np.nan, np.nan), (2, 2), (0, 1)])
+    persisted_df, watermarks_df = sync_fixtures(first_sync_df, watermarks_df=pd.DataFrame())
+    assert list(persisted_df.fixture_id) == ["00000000", "00000002", "00000003"]
+
+    second_sync_df = get_fixtures_df([(1, 0), (3, 1), (2, 2), (0, 1), (1, 1)])
+    persisted_df, watermarks_df = sync_fixtures(second_sync_df, watermarks_df)
+    assert "00000001" in set(persisted_df.fixture_id)
+    assert "00000004" in set(persisted_df.fixture_id)
+
+    persisted_df, _ = sync_fixtures(second_sync_df, watermarks_df)
+    assert len(persisted_df) == 0
+
+
+def test_first_fixture_unscored_leaves_watermark_empty():
+    watermarks_df = get_fixture_watermarks(get_fixtures_df([(np.nan, np.nan), (2, 0)]))
+
+    assert pd.isna(watermarks_df.last_kickoff[0])
+    assert len(filter_fixtures_after_watermark(get_fixtures_df([(1, 1), (2, 0)]), watermarks_df)) == 2
+
+
+def test_fixtures_at_watermark_kickoff_are_not_synced_twice():
+    fixtures_df = get_fixtures_df([(1, 0), (2, 1)])
+    fixtures_df.loc[1, "kickoff"] = fixtures_df.kickoff[0]
+    watermarks_df = get_fixture_watermarks(fixtures_df)
+
+    assert set(watermarks_df.last_fixture_ids[0].split(",")) == {"00000000", "00000001"}
+    assert len(filter_fixtures_after_watermark(fixtures_df, watermarks_df)) == 0
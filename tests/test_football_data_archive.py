@@ -0,0 +1,145 @@
+"""Tests of re-ingesting football-data csvs into the partitioned archive."""
+
+import datetime
+import os
+
+import pytest
+
+from src.football_data.etl import archive
+from src.football_data.etl.archive import (
+    ingest_football_data_archive,
+    read_football_data_archive,
+)
+
+CSV_HEADER = "Div,Date,Time,HomeTeam,AwayTeam,FTHG,FTAG,FTR"
+TEAMS = ["Arsenal", "Chelsea", "Everton", "Fulham", "Leeds", "Liverpool", "Man City", "Man United", "Spurs", "Wolves"]
+
+
+def write_football_data_csv(csv_path, no_matches):
+    """Function used to write a football-data csv of no_matches matches of the 2022_2023 season, one a day"""
+    csv_lines = [CSV_HEADER]
+    for match_no in range(no_matches):
+        match_date = datetime.date(2022, 8, 1) + datetime.timedelta(days=match_no)
+        home_team = TEAMS[match_no % len(TEAMS)]
+        away_team = TEAMS[(match_no + 1 + match_no // len(TEAMS)) % len(TEAMS)]
+        csv_lines.append(f"E0,{match_date:%d/%m/%Y},15:00,{home_team},{away_team},{match_no % 4},{match_no % 3},H")
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    with open(csv_path, "w") as csv_file:
+        csv_file.write("\n".join(csv_lines) + "\n")
+
+
+def get_part_names(archive_dir):
+    """Function used to list the part files of the archive"""
+    return sorted(
+        file_name
+        for _, _, file_names in os.walk(archive_dir)
+        for file_name in file_names
+        if file_name.endswith(".parquet")
+    )
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    return str(tmp_path / "source")
+
+
+@pytest.fixture
+def archive_dir(tmp_path):
+    return str(tmp_path / "archive")
+
+
+def assert_archive_matches(archive_dir, no_matches):
+    archive_df = read_football_data_archive(archive_dir=archive_dir)
+    assert len(archive_df) == no_matches
+    assert not archive_df.duplicated(subset=["date", "hometeam", "awayteam"]).any()
+
+
+def test_reingest_grown_csv_replaces_earlier_rows(source_dir, archive_dir):
+    csv_path = os.path.join(source_dir, "2223", "E0.csv")
+    write_football_data_csv(csv_path, 100)
+    ingest_football_data_archive(source_dir, archive_dir, max_workers=1)
+    write_football_data_csv(csv_path, 200)
+    ingest_summary = ingest_football_data_archive(source_dir, archive_dir, max_workers=1)
+
+    assert ingest_summary["skipped"] == 0
+    assert len(get_part_names(archive_dir)) == 1
+    assert_archive_matches(archive_dir, 200)
+
+
+def test_reingest_unchanged_csv_is_skipped(source_dir, archive_dir):
+    write_football_data_csv(os.path.join(source_dir, "2223", "E0.csv"), 100)
+    ingest_football_data_archive(source_dir, archive_dir, max_workers=1)
+    part_names = get_part_names(archive_dir)
+    ingest_summary = ingest_football_data_archive(source_dir, archive_dir, max_workers=1)
+
+    assert ingest_summary["skipped"] == 1
+    assert get_part_names(archive_dir) == part_names
+    assert_archive_matches(archive_dir, 100)
+
+
+def test_same_file_name_in_two_directories_is_kept_twice(source_dir, archive_dir):
+    write_football_data_csv(os.path.join(source_dir, "a", "E0.csv"), 50)
+    write_football_data_csv(os.path.join(source_dir, "b", "E0.csv"), 60)
+    ingest_football_data_archive(source_dir, archive_dir, max_workers=1)
+
+    assert len(get_part_names(archive_dir)) == 2
+    assert len(read_football_data_archive(archive_dir=archive_dir)) == 110
+
+
+def test_parts_without_source_key_are_replaced(source_dir, archive_dir):
+    csv_path = os.path.join(source_dir, "2223", "E0.csv")
+    write_football_data_csv(csv_path, 100)
+    ingest_football_data_archive(source_dir, archive_dir, max_workers=1)
+
+    # rename the part the way archives named parts before they had a source key
+    (part_dir,) = {dir_path for dir_path, _, file_names in os.walk(archive_dir) if file_names}
+    (part_name,) = get_part_names(archive_dir)
+    legacy_part_name = "part-" + part_name.split("-")[2] + "-v1.parquet"
+    os.replace(os.path.join(part_dir, part_name), os.path.join(part_dir, legacy_part_name))
+
+    write_football_data_csv(csv_path, 200)
+    ingest_football_data_archive(source_dir, archive_dir, max_workers=1)
+
+    assert legacy_part_name not in get_part_names(archive_dir)
+    assert_archive_matches(archive_dir, 200)
+
+
+def test_version_bump_replaces_parts_of_changed_csv(source_dir, archive_dir, monkeypatch):
+    csv_path = os.path.join(source_dir, "2223", "E0.csv")
+    write_football_data_csv(csv_path, 100)
+    monkeypatch.setattr(archive, "FOOTBALL_DATA_ARCHIVE_VERSION", 1)
+    archive.ingest_football_data_csv(csv_path, archive_dir, source_dir)
+
+    # the csv gains rows and the archive version is bumped before the next run
+    write_football_data_csv(csv_path, 200)
+    monkeypatch.setattr(archive, "FOOTBALL_DATA_ARCHIVE_VERSION", 2)
+    source_key = archive.get_source_key(csv_path, source_dir)
+    earlier_part_paths = archive.get_ingested_parts(archive_dir)[source_key]
+    archive.ingest_football_data_csv(csv_path, archive_dir, source_dir, earlier_part_paths)
+
+    (part_name,) = get_part_names(archive_dir)
+    assert part_name.endswith("-v2.parquet")
+    assert_archive_matches(archive_dir, 200)
+
+
+def test_season_finished_in_july_stays_in_one_season(source_dir, archive_dir):
+    # the 2019/20 season was finished in July and August 2020
+    csv_path = os.path.join(source_dir, "1920", "E0.csv")
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    with open(csv_path, "w") as csv_file:
+        csv_file.write(
+            "\n".join(
+                [
+                    CSV_HEADER,
+                    "E0,09/08/2019,20:00,Liverpool,Norwich,4,1,H",
+                    "E0,07/03/2020,15:00,Arsenal,West Ham,1,0,H",
+                    "E0,26/07/2020,16:00,Man City,Norwich,5,0,H",
+                ]
+            )
+            + "\n"
+        )
+    ingest_football_data_archive(source_dir, archive_dir, max_workers=1)
+
+    archive_df = read_football_data_archive(archive_dir=archive_dir)
+    assert len(archive_df) == 3
+    assert set(archive_df.season_name) == {"2019_2020"}
@@ -0,0 +1,115 @@
+"""Tests of the layered rating replay and of applying results to team ratings incrementally."""
+
+import math
+
+import pandas as pd
+import pytest
+
+from src.utility.football.ratings import (
+    ELO_HOME_ADVANTAGE,
+    ELO_INITIAL_RATING,
+    ELO_K_FACTOR,
+    PI_GOAL_BASE,
+    PI_GOAL_SCALE,
+    PI_HOME_AWAY_RATE,
+    PI_LEARNING_RATE,
+    RATING_COLUMNS,
+    get_team_ratings,
+    update_team_ratings,
+)
+from tests.football_results import get_results_df
+
+OTHER_TEAMS = ["Burnley", "Luton", "Millwall", "Norwich", "Stoke", "Watford", "Wigan", "Swansea"]
+
+
+@pytest.fixture
+def results_df():
+    # two competitions kicking off at different times, their fixtures share layers of the replay
+    return pd.concat(
+        [
+            get_results_df(seed=1),
+            get_results_df(seed=2, teams=OTHER_TEAMS, competition="10", first_kickoff="2022-07-30 12:30"),
+        ],
+        ignore_index=True,
+    ).sort_values(["kickoff", "competition", "home_team"], kind="stable", ignore_index=True)
+
+
+def get_pi_expected_goal_difference(pi_rating):
+    return math.copysign(PI_GOAL_BASE ** (abs(pi_rating) / PI_GOAL_SCALE) - 1, pi_rating)
+
+
+def get_sequential_ratings(results_df):
+    """Function used to rate teams with one plain loop over the fixtures in kickoff order"""
+    ratings = {}
+    for home_team, away_team, home_goals, away_goals in zip(
+        results_df.home_team, results_df.away_team, results_df.home_goals, results_df.away_goals
+    ):
+        home, away = [
+            ratings.setdefault(
+                team, {"elo": ELO_INITIAL_RATING, "goal_elo": ELO_INITIAL_RATING, "pi_home": 0.0, "pi_away": 0.0}
+            )
+            for team in [home_team, away_team]
+        ]
+        goal_difference = home_goals - away_goals
+        match_score = 1.0 if goal_difference > 0 else 0.5 if goal_difference == 0 else 0.0
+        margin_multiplier = (
+            1.0 if abs(goal_difference) <= 1 else 1.5 if abs(goal_difference) == 2 else (11 + abs(goal_difference)) / 8
+        )
+
+        for method, k_factor in [("elo", ELO_K_FACTOR), ("goal_elo", ELO_K_FACTOR * margin_multiplier)]:
+            expected_score = 1 / (1 + 10 ** ((away[method] - home[method] - ELO_HOME_ADVANTAGE) / 400))
+            elo_change = k_factor * (match_score - expected_score)
+            home[method] += elo_change
+            away[method] -= elo_change
+
+        goal_difference_error = goal_difference - (
+            get_pi_expected_goal_difference(home["pi_home"]) - get_pi_expected_goal_difference(away["pi_away"])
+        )
+        pi_change = (
+            PI_LEARNING_RATE
+            * PI_GOAL_SCALE
+            * math.copysign(math.log(1 + abs(goal_difference_error), PI_GOAL_BASE), goal_difference_error)
+        )
+        home["pi_home"] += pi_change
+        home["pi_away"] += PI_HOME_AWAY_RATE * pi_change
+        away["pi_away"] -= pi_change
+        away["pi_home"] -= PI_HOME_AWAY_RATE * pi_change
+
+    return pd.DataFrame.from_dict(ratings, orient="index", columns=RATING_COLUMNS).rename_axis("team").reset_index()
+
+
+def sort_by_team(team_ratings_df):
+    return team_ratings_df.sort_values("team", ignore_index=True)
+
+
+def test_layered_replay_matches_sequential_loop(results_df):
+    team_ratings_df, match_ratings_df = get_team_ratings(results_df)
+
+    pd.testing.assert_frame_equal(
+        sort_by_team(team_ratings_df)[["team"] + RATING_COLUMNS], sort_by_team(get_sequential_ratings(results_df))
+    )
+    assert len(match_ratings_df) == len(results_df)
+    assert set(team_ratings_df.matches) == {10, 14}
+
+
+def test_update_from_first_part_matches_full_run(results_df):
+    split_kickoff = results_df.kickoff.iloc[len(results_df) // 2]
+    first_part_df = results_df.loc[results_df.kickoff < split_kickoff]
+    no_first_part_fixtures = len(first_part_df)
+
+    first_part_ratings_df, _ = get_team_ratings(first_part_df)
+    team_ratings_df, match_ratings_df = update_team_ratings(first_part_ratings_df, results_df)
+    full_team_ratings_df, full_match_ratings_df = get_team_ratings(results_df)
+
+    pd.testing.assert_frame_equal(sort_by_team(team_ratings_df), sort_by_team(full_team_ratings_df))
+    pd.testing.assert_frame_equal(
+        match_ratings_df, full_match_ratings_df.iloc[no_first_part_fixtures:].reset_index(drop=True)
+    )
+
+
+def test_reapplying_results_applies_no_fixtures(results_df):
+    team_ratings_df, _ = get_team_ratings(results_df)
+    updated_team_ratings_df, match_ratings_df = update_team_ratings(team_ratings_df, results_df)
+
+    assert len(match_ratings_df) == 0
+    pd.testing.assert_frame_equal(updated_team_ratings_df, team_ratings_df)
@@ -0,0 +1,44 @@
+"""Tests of applying results to the team form frame incrementally."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utility.football.team_form import (
+    FORM_GROUP_COLUMNS,
+    get_team_form_df,
+    update_team_form_df,
+)
+from tests.football_results import get_results_df
+
+
+def assert_form_equal(team_form_df, expected_form_df):
+    sort_columns = ["kickoff"] + FORM_GROUP_COLUMNS
+    pd.testing.assert_frame_equal(
+        team_form_df.sort_values(sort_columns, ignore_index=True)[expected_form_df.columns],
+        expected_form_df.sort_values(sort_columns, ignore_index=True),
+        check_dtype=False,
+    )
+
+
+@pytest.mark.parametrize("no_chunks", [2, 5])
+def test_chunked_updates_match_full_run(no_chunks):
+    results_df = get_results_df()
+
+    # one result of the first chunk only comes in after every other one
+    late_result_df = results_df.iloc[[4]]
+    chunk_results_df = results_df.drop(index=late_result_df.index)
+
+    team_form_df = None
+    for chunk_df in np.array_split(chunk_results_df, no_chunks):
+        team_form_df = update_team_form_df(team_form_df, chunk_df)
+    team_form_df = update_team_form_df(team_form_df, late_result_df)
+
+    assert_form_equal(team_form_df, get_team_form_df(results_df))
+
+
+def test_results_already_applied_are_ignored():
+    results_df = get_results_df()
+    team_form_df = get_team_form_df(results_df)
+
+    assert_form_equal(update_team_form_df(team_form_df, results_df), get_team_form_df(results_df))